@@ -0,0 +1,233 @@
+"""Headless batch generation: JSONL specs in, JSONL restaurants out.
+
+Run from the app directory, for example:
+
+    python batch.py specs.jsonl --output restaurants.jsonl --concurrency 8 --pdf-dir pdfs
+    cat specs.jsonl | python batch.py - --output restaurants.jsonl
+
+Each input line is a spec such as
+{"cuisine": "Thai", "style": "Food Truck", "price_range": "$"}; style and
+price_range are optional. Rows are appended to the output as they complete,
+and the output file doubles as the checkpoint: rerunning the same command
+skips specs that already have a row, so a crashed or rate-limited run only
+generates what is missing. Failed specs go to <output>.errors.jsonl and are
+retried on the next run. Every spec is generated fresh, so repeated specs
+give distinct restaurants; --reuse lets them share cached answers instead.
+With --history, restaurants are also added to the shared history, where
+the API server indexes them for search.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from chains import RestaurantConceptGenerator
+from fake_llm import FakeChatModel
+from history import HistoryStore
+from pdf_generator import RestaurantPDFGenerator, pdf_filename
+
+
+# History owner of restaurants recorded by batch runs
+BATCH_HISTORY_OWNER = "batch"
+
+
+class BatchError(ValueError):
+    """Raised for unusable input or an output file that does not match the input."""
+
+
+def read_specs(stream):
+    """Parse JSONL specs, skipping blank lines; raises BatchError naming the bad line."""
+    specs = []
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            spec = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise BatchError(f"Line {line_number}: invalid JSON ({e.msg})")
+        if not isinstance(spec, dict) or not spec.get('cuisine'):
+            raise BatchError(f"Line {line_number}: a spec needs at least a cuisine")
+        specs.append(spec)
+    return specs
+
+
+def load_checkpoint(path, specs):
+    """Return {index: restaurant} for rows already in the output file.
+
+    A final line cut off by a crash is truncated away so new rows append
+    cleanly. Raises BatchError when a row's spec differs from the input,
+    i.e. the output belongs to a different spec file.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+
+    good_end = 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                break
+            index = row['index']
+            if index >= len(specs) or row['spec'] != specs[index]:
+                raise BatchError(f"{path} does not match the input specs (row {index}); "
+                                 "use a new --output for a different spec file")
+            done[index] = row['restaurant']
+            good_end += len(line)
+
+    if good_end < os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(good_end)
+    return done
+
+
+def pdf_path(pdf_dir, index, restaurant):
+    """PDF path for a row; the index prefix keeps duplicate names apart."""
+    return os.path.join(pdf_dir, f"{index:05d}_{pdf_filename(restaurant)}")
+
+
+def _render(restaurant):
+    """Process-pool worker: PDF bytes for one restaurant."""
+    return RestaurantPDFGenerator().generate_pdf(restaurant).getvalue()
+
+
+class PDFStage:
+    """Renders PDFs in worker processes while generation keeps going."""
+
+    def __init__(self, pdf_dir, workers=None):
+        self.pdf_dir = pdf_dir
+        os.makedirs(pdf_dir, exist_ok=True)
+        self.executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+        self.pending = {}
+        self.rendered = 0
+
+    def submit(self, index, restaurant):
+        path = pdf_path(self.pdf_dir, index, restaurant)
+        if not os.path.exists(path):
+            self.pending[self.executor.submit(_render, restaurant)] = path
+
+    def collect(self, block=False):
+        """Write PDFs that have finished rendering; with block=True, wait for all of them."""
+        if not self.pending:
+            return
+        done, _ = wait(list(self.pending), timeout=None if block else 0,
+                       return_when=ALL_COMPLETED if block else FIRST_COMPLETED)
+        for future in done:
+            path = self.pending.pop(future)
+            pdf = future.result()
+            # Write then rename, so a crash never leaves a half-written PDF that resume would skip
+            with open(path + ".tmp", "wb") as f:
+                f.write(pdf)
+            os.replace(path + ".tmp", path)
+            self.rendered += 1
+
+    def close(self):
+        self.collect(block=True)
+        self.executor.shutdown()
+
+
+def run_batch(generator, specs, output, concurrency=4, force_fresh=True, pdf_dir=None, pdf_workers=None,
+              progress=None, history=None):
+    """Generate every spec not yet in the output, appending rows as they complete.
+
+    Each spec gets a fresh generation unless force_fresh is False, in which
+    case repeated specs may share a cached or in-flight answer. With a
+    HistoryStore as history, each new restaurant is also added to it under
+    the owner "batch".
+
+    Returns a summary dict with the number of rows generated, skipped,
+    failed and rendered.
+    """
+    done = load_checkpoint(output, specs)
+    todo = [index for index in range(len(specs)) if index not in done]
+    errors_path = output + ".errors.jsonl"
+
+    pdfs = PDFStage(pdf_dir, pdf_workers) if pdf_dir else None
+    summary = {'total': len(specs), 'skipped': len(done), 'generated': 0, 'failed': 0}
+    start = time.perf_counter()
+    try:
+        if pdfs:
+            # Resumed rows whose PDF did not make it to disk before the crash
+            for index, restaurant in done.items():
+                pdfs.submit(index, restaurant)
+
+        with open(output, "a") as out, open(errors_path, "w") as errors:
+            for position, result in generator.generate_many([specs[index] for index in todo],
+                                                            max_concurrency=concurrency,
+                                                            force_fresh=force_fresh):
+                index = todo[position]
+                if isinstance(result, Exception):
+                    summary['failed'] += 1
+                    errors.write(json.dumps({'index': index, 'spec': specs[index],
+                                             'error': f"{type(result).__name__}: {result}"}) + "\n")
+                    errors.flush()
+                else:
+                    summary['generated'] += 1
+                    out.write(json.dumps({'index': index, 'spec': specs[index], 'restaurant': result}) + "\n")
+                    # Flushed per row: the output is the checkpoint
+                    out.flush()
+                    if history is not None:
+                        history.add(result, BATCH_HISTORY_OWNER)
+                    if pdfs:
+                        pdfs.submit(index, result)
+
+                if pdfs:
+                    pdfs.collect()
+                if progress:
+                    progress(summary)
+    finally:
+        if pdfs:
+            pdfs.close()
+            summary['rendered'] = pdfs.rendered
+
+    if not summary['failed']:
+        os.remove(errors_path)
+    summary['seconds'] = round(time.perf_counter() - start, 2)
+    return summary
+
+
+def _print_progress(summary):
+    finished = summary['skipped'] + summary['generated'] + summary['failed']
+    print(f"\r{finished}/{summary['total']} done, {summary['failed']} failed", end="", file=sys.stderr, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate restaurants from a JSONL spec file")
+    parser.add_argument("specs", help="JSONL spec file, or - for stdin")
+    parser.add_argument("--output", "-o", required=True, help="JSONL output, also used to resume")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--reuse", action="store_true",
+                        help="let repeated specs share cached answers instead of generating each one fresh")
+    parser.add_argument("--pdf-dir", help="also render each restaurant to a PDF in this directory")
+    parser.add_argument("--pdf-workers", type=int, default=None)
+    parser.add_argument("--history", action="store_true",
+                        help="also add restaurants to the shared history, which the API server searches")
+    parser.add_argument("--fake", action="store_true", help="use fake_llm.FakeChatModel instead of Groq")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake backend seconds per call")
+    args = parser.parse_args()
+
+    try:
+        if args.specs == "-":
+            specs = read_specs(sys.stdin)
+        else:
+            with open(args.specs) as f:
+                specs = read_specs(f)
+
+        llm = FakeChatModel(latency=args.latency) if args.fake else None
+        generator = RestaurantConceptGenerator(llm=llm)
+        summary = run_batch(generator, specs, args.output, args.concurrency, not args.reuse,
+                            args.pdf_dir, args.pdf_workers, progress=_print_progress,
+                            history=HistoryStore.from_env() if args.history else None)
+    except BatchError as e:
+        parser.exit(2, f"batch: {e}\n")
+
+    print(file=sys.stderr)
+    print(json.dumps(summary))
+    if summary['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,618 @@
+"""Wall-clock benchmarks for ConceptKitchen.
+
+Run from the app directory, for example: python benchmark.py menu --runs 3
+
+The suite command runs end-to-end generation against fake_llm.FakeChatModel
+(no API key needed) and writes machine-readable results, which the compare
+command diffs between two runs:
+
+    python benchmark.py suite --output before.json
+    python benchmark.py suite --output after.json
+    python benchmark.py compare before.json after.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+from chains import RestaurantConceptGenerator
+from fake_llm import DIETARY_TAGS, DISH_NOUNS, DISH_WORDS, MENU_SECTION_COUNTS, FakeChatModel
+from metrics import Metrics
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from reportlab.platypus import PageBreak, SimpleDocTemplate
+from pdf_generator import PDFTemplate, RestaurantPDFGenerator, render_many, write_catalog, write_catalog_parts, letter
+from search import SearchIndex, parse_price
+from models import Restaurant
+
+
+def _sample_item(name, price, dietary=()):
+    return {
+        'name': name,
+        'description': "Slow-cooked, hand-finished and plated with seasonal garnish from the market",
+        'price': price,
+        'dietary': list(dietary)
+    }
+
+
+# Representative restaurant for rendering benchmarks
+SAMPLE_RESTAURANT = {
+    'concept': {
+        'name': "Saffron & Smoke",
+        'tagline': "Fire-kissed classics from the spice route",
+        'concept': "A wood-fired kitchen reimagining spice-route classics. Every plate passes through the "
+                   "open hearth, and the dining room is built around the flames.",
+        'unique_selling_points': [
+            "Open hearth cooking visible from every table",
+            "Spices ground in-house every morning",
+            "Rotating regional tasting flights"
+        ],
+        'ambiance': "Warm brick, copper lamps and low hand-drum playlists",
+        'target_audience': "Food-curious groups and date-night diners",
+        'signature_dish': "Ember-roasted lamb shoulder with saffron rice and charred citrus"
+    },
+    'menu': {
+        'appetizers': [_sample_item("Charred Okra", "$12", ["vegan"]), _sample_item("Smoked Paneer Bites", "$14"),
+                       _sample_item("Lentil Fritters", "$11", ["vegetarian"])],
+        'mains': [_sample_item("Ember Lamb Shoulder", "$34"), _sample_item("Hearth Chicken", "$28"),
+                  _sample_item("Spiced Cauliflower Steak", "$24", ["vegan", "gluten-free"]),
+                  _sample_item("Fire Prawns", "$32", ["gluten-free"])],
+        'desserts': [_sample_item("Cardamom Kulfi", "$10", ["vegetarian"]), _sample_item("Saffron Pudding", "$9")],
+        'beverages': [_sample_item("Smoked Lassi", "$7"), _sample_item("Rose Cooler", "$6", ["vegan"])]
+    },
+    'metadata': {
+        'cuisine': "Indian",
+        'style': "Casual Dining",
+        'price_range': "$$"
+    }
+}
+
+
+def _time_runs(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _summary(timings):
+    return {
+        'runs': len(timings),
+        'median_s': round(statistics.median(timings), 4),
+        'mean_s': round(statistics.mean(timings), 4),
+        'min_s': round(min(timings), 4),
+        'max_s': round(max(timings), 4)
+    }
+
+
+def bench_menu(generator, runs=3, cuisine="Italian", price_range="$$"):
+    """Compare the single-call menu against the parallel per-section menu."""
+    concept = generator.generate_complete_concept(cuisine, price_range=price_range)
+
+    results = {}
+    for mode in ("single", "parallel"):
+        timings = _time_runs(lambda: generator.generate_detailed_menu(
+            concept['name'],
+            cuisine,
+            concept['concept'],
+            price_range,
+            force_fresh=True,
+            menu_mode=mode
+        ), runs)
+        results[mode] = _summary(timings)
+
+    results['speedup'] = round(results['single']['median_s'] / results['parallel']['median_s'], 2)
+    return results
+
+
+def bench_pdf(renders=50, restaurant=None):
+    """Renders per second with the shared template vs. compiling styles on every render."""
+    restaurant = restaurant or SAMPLE_RESTAURANT
+
+    def per_render_template():
+        RestaurantPDFGenerator(template=PDFTemplate()).generate_pdf(restaurant)
+
+    def shared_template():
+        RestaurantPDFGenerator().generate_pdf(restaurant)
+
+    results = {}
+    for label, fn in (("per_render_template", per_render_template), ("shared_template", shared_template)):
+        fn()  # warm up imports and font caches
+        start = time.perf_counter()
+        for _ in range(renders):
+            fn()
+        elapsed = time.perf_counter() - start
+        results[label] = {
+            'renders': renders,
+            'renders_per_s': round(renders / elapsed, 1),
+            'ms_per_render': round(elapsed / renders * 1000, 2)
+        }
+
+    results['speedup'] = round(
+        results['shared_template']['renders_per_s'] / results['per_render_template']['renders_per_s'], 2
+    )
+    return results
+
+
+def bench_bulk(count=100, workers=None):
+    """Bulk PDF export throughput: one worker process vs. a pool."""
+    restaurants = [SAMPLE_RESTAURANT] * count
+
+    results = {}
+    for label, pool_size in (("one_worker", 1), ("pool", workers)):
+        with tempfile.TemporaryDirectory() as output_dir:
+            start = time.perf_counter()
+            render_many(restaurants, workers=pool_size, output_dir=output_dir)
+            elapsed = time.perf_counter() - start
+        results[label] = {
+            'workers': pool_size or os.cpu_count(),
+            'renders': count,
+            'seconds': round(elapsed, 3),
+            'renders_per_s': round(count / elapsed, 1)
+        }
+
+    results['speedup'] = round(results['one_worker']['seconds'] / results['pool']['seconds'], 2)
+    return results
+
+
+def _catalog_in_memory(count, path):
+    """The pre-catalog approach: every restaurant's flowables in one list, then a single build."""
+    generator = RestaurantPDFGenerator()
+    elements = []
+    for i in range(count):
+        if i:
+            elements.append(PageBreak())
+        elements.extend(generator._build_elements(SAMPLE_RESTAURANT))
+
+    doc = SimpleDocTemplate(path, pagesize=letter, rightMargin=50, leftMargin=50, topMargin=60, bottomMargin=40)
+    doc.build(elements, onFirstPage=generator._draw_decorative_line,
+              onLaterPages=generator._draw_decorative_line)
+
+
+def _catalog_streaming(count, path):
+    write_catalog((SAMPLE_RESTAURANT for _ in range(count)), path)
+
+
+def _catalog_parts(count, path):
+    write_catalog_parts((SAMPLE_RESTAURANT for _ in range(count)), os.path.dirname(path), per_part=100)
+
+
+def _peak_rss_run(mode, count):
+    """Run one catalog build in a fresh process and report its peak RSS."""
+    with tempfile.TemporaryDirectory() as output_dir:
+        path = os.path.join(output_dir, "catalog.pdf")
+        start = time.perf_counter()
+        CATALOG_MODES[mode](count, path)
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(output_dir, name)) for name in os.listdir(output_dir))
+
+    # ru_maxrss is reported in kilobytes on Linux
+    return {
+        'concepts': count,
+        'seconds': round(elapsed, 2),
+        'file_kb': size // 1024,
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+
+CATALOG_MODES = {
+    'in_memory': _catalog_in_memory,
+    'streaming': _catalog_streaming,
+    'parts': _catalog_parts
+}
+
+
+def bench_catalog(count=1000):
+    """Peak RSS of a single catalog PDF built in memory vs. streamed, and of a catalog split into parts."""
+    results = {}
+    for mode in CATALOG_MODES:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results[mode] = executor.submit(_peak_rss_run, mode, count).result()
+    return results
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def _latency_summary(latencies):
+    return {
+        'p50_s': round(percentile(latencies, 50), 4),
+        'p90_s': round(percentile(latencies, 90), 4),
+        'p99_s': round(percentile(latencies, 99), 4),
+        'max_s': round(max(latencies), 4)
+    }
+
+
+def bench_end_to_end(generator, concurrency_levels=(1, 4, 16), requests_per_level=32):
+    """generate_full_restaurant throughput and latency percentiles at several concurrency levels."""
+    specs = [("Italian", "Bistro", "$$"), ("Thai", "Casual Dining", "$"),
+             ("Japanese", "Fine Dining", "$$$$"), ("Mexican", "Food Truck", "$")]
+
+    def one_request(i):
+        cuisine, style, price_range = specs[i % len(specs)]
+        start = time.perf_counter()
+        generator.generate_full_restaurant(cuisine, style, price_range, force_fresh=True)
+        return time.perf_counter() - start
+
+    results = {}
+    for concurrency in concurrency_levels:
+        latencies = []
+        errors = 0
+        tracemalloc.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(one_request, i) for i in range(requests_per_level)]
+            for future in futures:
+                try:
+                    latencies.append(future.result())
+                except Exception:
+                    errors += 1
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[f"concurrency_{concurrency}"] = dict(
+            concurrency=concurrency,
+            requests=requests_per_level,
+            errors=errors,
+            throughput_rps=round(len(latencies) / elapsed, 2),
+            traced_peak_mb=round(peak / 1024 / 1024, 2),
+            **(_latency_summary(latencies) if latencies else {})
+        )
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(latency=0.2, jitter=0.05, seed=0, concurrency_levels=(1, 4, 16),
+              requests_per_level=32, renders=50):
+    """Run the fake-backend suite and return a machine-readable result document."""
+    fake = FakeChatModel(latency=latency, jitter=jitter, seed=seed)
+    generator = RestaurantConceptGenerator(cache=False, llm=fake)
+
+    results = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(timespec="seconds"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'backend': {'latency_s': latency, 'jitter_s': jitter, 'seed': seed}
+        },
+        'end_to_end': bench_end_to_end(generator, concurrency_levels, requests_per_level),
+        'pdf': bench_pdf(renders),
+        'tokens': bench_tokens(
+            lambda **kwargs: RestaurantConceptGenerator(cache=False, llm=FakeChatModel(seed=seed), **kwargs), 2
+        )
+    }
+
+    # ru_maxrss is reported in kilobytes on Linux
+    results['memory'] = {'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+    return results
+
+
+def _flatten(document, prefix=""):
+    flat = {}
+    for key, value in document.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare_results(before, after):
+    """Numeric deltas between two suite result documents."""
+    old, new = _flatten(before), _flatten(after)
+    rows = {}
+    for path in sorted(set(old) & set(new)):
+        if path.startswith("meta."):
+            continue
+        change = None
+        if old[path]:
+            change = round((new[path] - old[path]) / old[path] * 100, 1)
+        rows[path] = {'before': old[path], 'after': new[path], 'change_pct': change}
+    return rows
+
+
+SEARCH_CUISINES = ["Thai", "Italian", "Mexican", "Japanese", "Indian", "French", "Korean", "Greek"]
+SEARCH_STYLES = ["Casual Dining", "Fine Dining", "Food Truck", "Cafe", "Bistro"]
+SEARCH_SETTINGS = ["rooftop", "garden", "harbour", "warehouse", "market", "courtyard", "riverside", "basement"]
+
+
+def _search_corpus(items, seed=0):
+    """Synthetic restaurants with at least `items` menu items in total."""
+    rng = random.Random(seed)
+    restaurants = []
+    count = 0
+    while count < items:
+        cuisine = rng.choice(SEARCH_CUISINES)
+        style = rng.choice(SEARCH_STYLES)
+        setting = rng.choice(SEARCH_SETTINGS)
+        menu = {
+            section: [{
+                'name': f"{rng.choice(DISH_WORDS)} {cuisine} {rng.choice(DISH_NOUNS)}",
+                'description': f"{rng.choice(DISH_WORDS)} {cuisine.lower()} plate from our {setting} kitchen",
+                'price': f"${rng.randint(5, 45)}",
+                'dietary': list(rng.choice(DIETARY_TAGS))
+            } for _ in range(size)]
+            for section, size in MENU_SECTION_COUNTS.items()
+        }
+        count += sum(len(section) for section in menu.values())
+        restaurants.append({
+            'concept': {
+                'name': f"The {rng.choice(DISH_WORDS)} {rng.choice(DISH_NOUNS)} #{len(restaurants)}",
+                'tagline': f"{cuisine} cooking from a {setting} room",
+                'concept': f"A {style.lower()} {cuisine} restaurant with a {setting} dining room and shared plates.",
+                'unique_selling_points': [f"{rng.choice(DISH_WORDS)} tasting flights"],
+                'ambiance': f"Relaxed {setting} seating",
+                'target_audience': "Groups and date nights",
+                'signature_dish': menu['mains'][0]['name']
+            },
+            'menu': menu,
+            'metadata': {'cuisine': cuisine, 'style': style, 'price_range': rng.choice(["$", "$$", "$$$"])}
+        })
+    return restaurants
+
+
+def _scan_vegan_thai_mains(restaurants, max_price=20):
+    """Linear-scan baseline for the indexed query."""
+    return [
+        item for restaurant in restaurants if restaurant['metadata']['cuisine'] == "Thai"
+        for item in restaurant['menu']['mains']
+        if "vegan" in item['dietary'] and parse_price(item['price']) <= max_price
+    ]
+
+
+def bench_search(items=100000, runs=50, seed=0):
+    """Search index build time, per-query latency and incremental adds on a synthetic corpus."""
+    restaurants = _search_corpus(items, seed)
+    index = SearchIndex()
+    start = time.perf_counter()
+    for restaurant in restaurants[:-100]:
+        index.add(restaurant)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for restaurant in restaurants[-100:]:
+        index.add(restaurant)
+    add_ms = (time.perf_counter() - start) / 100 * 1000
+
+    queries = {
+        'vegan_thai_mains_under_20': lambda: index.search_items(dietary="vegan", section="mains", max_price=20,
+                                                                cuisine="Thai", limit=None),
+        'concepts_mentioning_rooftop': lambda: index.search_concepts("rooftop"),
+        'items_text': lambda: index.search_items("smoked dumplings"),
+        'items_price_band': lambda: index.search_items(min_price=10, max_price=12),
+        'scan_baseline_vegan_thai_mains': lambda: _scan_vegan_thai_mains(restaurants)
+    }
+    results = {
+        'restaurants': len(index),
+        'items': index.item_count,
+        'build_s': round(build, 2),
+        'add_ms': round(add_ms, 3),
+        'queries': {}
+    }
+    for label, query in queries.items():
+        timings = []
+        for _ in range(runs):
+            query_start = time.perf_counter()
+            matched = len(query())
+            timings.append(time.perf_counter() - query_start)
+        results['queries'][label] = {
+            'results': matched,
+            'median_ms': round(statistics.median(timings) * 1000, 3),
+            'p99_ms': round(percentile(timings, 99) * 1000, 3)
+        }
+    return results
+
+
+def _retained_bytes(build):
+    """Bytes still allocated by the object build() returns."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del value
+    return retained
+
+
+def bench_models(count=2000, runs=3, seed=0):
+    """Memory and serialization speed of typed models vs. the nested restaurant dicts."""
+    restaurants = _search_corpus(count * 11, seed)[:count]
+    dict_json = [json.dumps(restaurant) for restaurant in restaurants]
+    models = [Restaurant.from_dict(restaurant) for restaurant in restaurants]
+    model_json = [model.to_json() for model in models]
+    model_bytes = [model.to_bytes() for model in models]
+
+    # Decoded fresh, so both sides own all their strings as they would after loading from disk
+    dict_memory = _retained_bytes(lambda: [json.loads(text) for text in dict_json])
+    model_memory = _retained_bytes(lambda: [Restaurant.from_bytes(data) for data in model_bytes])
+
+    def per_restaurant_us(fn, items):
+        best = min(_time_runs(lambda: [fn(item) for item in items], runs))
+        return round(best / len(items) * 1e6, 2)
+
+    return {
+        'restaurants': count,
+        'memory_bytes_per_restaurant': {
+            'dict': dict_memory // count,
+            'model': model_memory // count,
+            'saving': round(1 - model_memory / dict_memory, 3)
+        },
+        'encoded_bytes_per_restaurant': {
+            'dict_json': sum(len(text.encode("utf-8")) for text in dict_json) // count,
+            'model_json': sum(len(text.encode("utf-8")) for text in model_json) // count,
+            'model_binary': sum(len(data) for data in model_bytes) // count
+        },
+        'encode_us': {
+            'dict_json': per_restaurant_us(json.dumps, restaurants),
+            'model_json': per_restaurant_us(Restaurant.to_json, models),
+            'model_binary': per_restaurant_us(Restaurant.to_bytes, models)
+        },
+        'decode_us': {
+            'dict_json': per_restaurant_us(json.loads, dict_json),
+            'model_json': per_restaurant_us(Restaurant.from_json, model_json),
+            'model_binary': per_restaurant_us(Restaurant.from_bytes, model_bytes)
+        },
+        'convert_us': {
+            'from_dict': per_restaurant_us(Restaurant.from_dict, restaurants),
+            'to_dict': per_restaurant_us(Restaurant.to_dict, models)
+        }
+    }
+
+
+def _add_backend_args(parser):
+    parser.add_argument("--fake", action="store_true", help="use the fake LLM backend instead of Groq")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake backend latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="fake backend jitter in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def _make_generator(args, **kwargs):
+    llm = FakeChatModel(latency=args.latency, jitter=args.jitter, seed=args.seed) if args.fake else None
+    return RestaurantConceptGenerator(cache=False, llm=llm, **kwargs)
+
+
+def _token_totals(metrics):
+    totals = {'input': 0, 'output': 0}
+    for counter in metrics.snapshot()['counters']:
+        if counter['name'] == 'tokens_total':
+            totals[counter['labels']['direction']] += counter['value']
+    return totals
+
+
+def bench_tokens(make_generator, runs, cuisine="Italian", style="Bistro", price_range="$$"):
+    """Tokens per full-restaurant request for each prompt style.
+
+    With the fake backend input tokens are estimated from prompt length and
+    replies are canned, so only the input side is meaningful; use the real
+    backend to measure output savings too.
+    """
+    results = {}
+    for prompt_style in ("verbose", "compact"):
+        metrics = Metrics()
+        generator = make_generator(prompt_style=prompt_style, metrics=metrics)
+        for _ in range(runs):
+            generator.generate_full_restaurant(cuisine, style, price_range, force_fresh=True)
+        totals = _token_totals(metrics)
+        results[prompt_style] = {
+            'runs': runs,
+            'input_tokens_per_request': round(totals['input'] / runs, 1),
+            'output_tokens_per_request': round(totals['output'] / runs, 1)
+        }
+
+    for direction in ('input', 'output'):
+        before = results['verbose'][f'{direction}_tokens_per_request']
+        after = results['compact'][f'{direction}_tokens_per_request']
+        results[f'{direction}_savings_pct'] = round((before - after) / before * 100, 1) if before else None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ConceptKitchen benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    menu_parser = subparsers.add_parser("menu", help="single-call vs parallel per-section menu")
+    menu_parser.add_argument("--runs", type=int, default=3)
+    menu_parser.add_argument("--cuisine", default="Italian")
+    menu_parser.add_argument("--price-range", default="$$")
+    _add_backend_args(menu_parser)
+
+    e2e_parser = subparsers.add_parser("e2e", help="end-to-end generation throughput and latency")
+    e2e_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    e2e_parser.add_argument("--requests", type=int, default=32)
+    _add_backend_args(e2e_parser)
+
+    tokens_parser = subparsers.add_parser("tokens", help="tokens per request, verbose vs compact prompts")
+    tokens_parser.add_argument("--runs", type=int, default=3)
+    _add_backend_args(tokens_parser)
+
+    suite_parser = subparsers.add_parser("suite", help="full fake-backend suite written to a JSON file")
+    suite_parser.add_argument("--output", default="bench_results.json")
+    suite_parser.add_argument("--latency", type=float, default=0.2)
+    suite_parser.add_argument("--jitter", type=float, default=0.05)
+    suite_parser.add_argument("--seed", type=int, default=0)
+    suite_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    suite_parser.add_argument("--requests", type=int, default=32)
+    suite_parser.add_argument("--renders", type=int, default=50)
+
+    compare_parser = subparsers.add_parser("compare", help="diff two suite result files")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+
+    pdf_parser = subparsers.add_parser("pdf", help="PDF renders per second")
+    pdf_parser.add_argument("--renders", type=int, default=50)
+
+    bulk_parser = subparsers.add_parser("bulk", help="multi-process bulk PDF export")
+    bulk_parser.add_argument("--count", type=int, default=100)
+    bulk_parser.add_argument("--workers", type=int, default=None)
+
+    catalog_parser = subparsers.add_parser("catalog", help="peak RSS of catalog PDF writing")
+    catalog_parser.add_argument("--count", type=int, default=1000)
+
+    search_parser = subparsers.add_parser("search", help="search index queries on a synthetic corpus")
+    search_parser.add_argument("--items", type=int, default=100000)
+    search_parser.add_argument("--runs", type=int, default=50)
+
+    models_parser = subparsers.add_parser("models", help="typed models vs. dicts: memory and serialization")
+    models_parser.add_argument("--count", type=int, default=2000)
+
+    args = parser.parse_args()
+
+    if args.command == "menu":
+        results = bench_menu(_make_generator(args), args.runs, args.cuisine, args.price_range)
+    elif args.command == "e2e":
+        results = bench_end_to_end(_make_generator(args), args.concurrency, args.requests)
+    elif args.command == "tokens":
+        results = bench_tokens(lambda **kwargs: _make_generator(args, **kwargs), args.runs)
+    elif args.command == "suite":
+        results = run_suite(args.latency, args.jitter, args.seed, args.concurrency, args.requests, args.renders)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    elif args.command == "compare":
+        with open(args.before) as f:
+            before = json.load(f)
+        with open(args.after) as f:
+            after = json.load(f)
+        results = compare_results(before, after)
+    elif args.command == "pdf":
+        results = bench_pdf(args.renders)
+    elif args.command == "bulk":
+        results = bench_bulk(args.count, args.workers)
+    elif args.command == "catalog":
+        results = bench_catalog(args.count)
+    elif args.command == "models":
+        results = bench_models(args.count)
+    elif args.command == "search":
+        results = bench_search(args.items, args.runs)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Disk hits whose access times are written together, rather than one UPDATE and commit per hit
+ACCESS_FLUSH_BATCH = 64
+
+
+class ResponseCache:
+    """Two-level cache for raw LLM completions: an in-process LRU in front of SQLite."""
+
+    def __init__(self, path=None, ttl=None, max_memory_entries=256, max_disk_entries=10000):
+        # path=None keeps the cache purely in memory
+        self.path = path
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._db = None
+        self._disk_count = 0
+        # key -> last access time of disk hits not yet written back
+        self._accessed = {}
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)"
+            )
+            self._db.commit()
+            self._disk_count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @classmethod
+    def from_env(cls):
+        """Build the default cache from environment variables, or None when disabled."""
+        if os.getenv("CONCEPTKITCHEN_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+            return None
+
+        ttl = os.getenv("CONCEPTKITCHEN_CACHE_TTL", "86400")
+        return cls(
+            path=os.getenv("CONCEPTKITCHEN_CACHE_PATH", ".conceptkitchen_cache.db"),
+            ttl=float(ttl) if ttl else None,
+            max_memory_entries=int(os.getenv("CONCEPTKITCHEN_CACHE_MEMORY_ENTRIES", "256")),
+            max_disk_entries=int(os.getenv("CONCEPTKITCHEN_CACHE_DISK_ENTRIES", "10000"))
+        )
+
+    @staticmethod
+    def make_key(prompt, model_name, temperature):
+        """Content-address an entry by the rendered prompt, model and temperature."""
+        payload = json.dumps([model_name, temperature, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key):
+        """Return the cached completion for key, or None on a miss."""
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    return value
+                del self._memory[key]
+
+            if self._db is None:
+                return None
+
+            row = self._db.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_at = row
+            if self._expired(created_at, now):
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                self._disk_count -= 1
+                return None
+
+            self._accessed[key] = now
+            if len(self._accessed) >= ACCESS_FLUSH_BATCH:
+                self._flush_accessed(commit=True)
+            self._remember(key, value, created_at)
+            return value
+
+    def _flush_accessed(self, commit=False):
+        # Access times only order evictions, so a failed write just drops them
+        accessed, self._accessed = self._accessed, {}
+        try:
+            self._db.executemany("UPDATE responses SET accessed_at = ? WHERE key = ?",
+                                 [(at, key) for key, at in accessed.items()])
+            if commit:
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.debug("Dropped %d cache access times: %s", len(accessed), e)
+
+    def set(self, key, value):
+        """Store a completion in both levels, evicting the least recently used entries.
+
+        A disk write that fails (database locked or read-only) is logged, and
+        the completion is still kept in memory.
+        """
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, value, now)
+
+            if self._db is None:
+                return
+            try:
+                self._store(key, value, now)
+            except sqlite3.Error as e:
+                self._db.rollback()
+                logger.warning("Could not write to the response cache at %s: %s", self.path, e)
+
+    def _store(self, key, value, now):
+        self._flush_accessed()
+        existed = self._db.execute(
+            "SELECT 1 FROM responses WHERE key = ?", (key,)
+        ).fetchone() is not None
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, value, now, now)
+        )
+        count = self._disk_count if existed else self._disk_count + 1
+
+        # Trim the on-disk store back to its size limit
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+            count -= overflow
+        self._db.commit()
+        self._disk_count = count
+
+    def _remember(self, key, value, created_at):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry from both levels."""
+        with self._lock:
+            self._memory.clear()
+            self._accessed.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+                self._disk_count = 0
@@ -0,0 +1,100 @@
+import threading
+from difflib import SequenceMatcher
+from collections import deque
+
+# Soft length limits; longer fields still count, but rank lower
+LENGTH_LIMITS = {
+    'name': 40,
+    'tagline': 90,
+    'concept': 450,
+    'signature_dish': 160
+}
+
+# Weights of the ranking score, summing to 1
+RANK_WEIGHTS = {
+    'novelty': 0.5,
+    'completeness': 0.3,
+    'length': 0.2
+}
+
+
+def similarity(a, b):
+    """0..1 similarity of two short strings, ignoring case."""
+    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+
+
+def _length_score(concept):
+    over = [field for field, limit in LENGTH_LIMITS.items() if len(concept.get(field, "")) > limit]
+    return 1 - len(over) / len(LENGTH_LIMITS)
+
+
+def _completeness_score(concept):
+    points = concept.get('unique_selling_points') or []
+    return min(len(points), 3) / 3
+
+
+def rank_candidates(candidates, history=()):
+    """Order validated concepts best first.
+
+    Novelty is measured against the names in ``history`` and against the
+    candidates already ranked above, so near-duplicates sink to the bottom.
+    """
+    remaining = list(candidates)
+    seen = list(history)
+    ranked = []
+    while remaining:
+        def score(concept):
+            novelty = 1 - max((similarity(concept['name'], name) for name in seen), default=0)
+            return (RANK_WEIGHTS['novelty'] * novelty
+                    + RANK_WEIGHTS['completeness'] * _completeness_score(concept)
+                    + RANK_WEIGHTS['length'] * _length_score(concept))
+
+        best = max(remaining, key=score)
+        remaining.remove(best)
+        ranked.append(best)
+        seen.append(best['name'])
+    return ranked
+
+
+class CandidateStore:
+    """Spare concept candidates per (cuisine, style, price range), each handed out once.
+
+    Also remembers the names of recently served concepts so new candidates
+    can be ranked for novelty against them.
+    """
+
+    def __init__(self, max_per_combo=8, history_size=200):
+        self.max_per_combo = max_per_combo
+        self._lock = threading.Lock()
+        self._spares = {}
+        self._requested = set()
+        self.history = deque(maxlen=history_size)
+
+    def take(self, combo):
+        """Pop the best spare candidate for a combination, or None."""
+        with self._lock:
+            spares = self._spares.get(combo)
+            if not spares:
+                return None
+            concept = spares.popleft()
+            self.history.append(concept['name'])
+            return concept
+
+    def put(self, combo, candidates):
+        with self._lock:
+            self._requested.add(combo)
+            spares = self._spares.setdefault(combo, deque(maxlen=self.max_per_combo))
+            spares.extend(candidates)
+
+    def served(self, concept):
+        with self._lock:
+            self.history.append(concept['name'])
+
+    def requested_before(self, combo):
+        """Whether candidates were already requested for this combination."""
+        with self._lock:
+            return combo in self._requested
+
+    def available(self, combo):
+        with self._lock:
+            return len(self._spares.get(combo, ()))
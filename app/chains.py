@@ -1,64 +1,415 @@
 import os
 import json
-from langchain_groq import ChatGroq
-from langchain_core.prompts import PromptTemplate
+import time
+import asyncio
+import functools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from prompts import PROMPT_STYLES, build_prompts
 from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
-from langchain_core.runnables import RunnableParallel
+from langchain_core.exceptions import OutputParserException
+from langchain_core.outputs import Generation
+from langchain_core.runnables import RunnableParallel, RunnableLambda
 from dotenv import load_dotenv
+from cache import ResponseCache
+from candidates import CandidateStore, rank_candidates
+from coalesce import LeaderCancelled, SingleFlight
+from hedging import Hedger
+from clients import DEFAULT_MODEL, FAST_MODEL, get_llm
+from metrics import get_metrics, token_usage
+from models import Concept, Restaurant
+from ratelimit import current_scheduling, estimate_tokens, get_rate_scheduler, scheduling
+from schema import SchemaError, clean_concept, clean_menu, clean_name_items, clean_section, repair_json
 
 load_dotenv()
 
+# Menu sections: title, item count, price guideline keys, item label, description hint
+MENU_SECTIONS = {
+    'appetizers': ("appetizers", 3, ('app_min', 'app_max'), "Dish name", "Enticing 10-15 word description"),
+    'mains': ("main courses", 4, ('main_min', 'main_max'), "Dish name", "Enticing 10-15 word description"),
+    'desserts': ("desserts", 2, ('dessert_min', 'dessert_max'), "Dish name", "Enticing 10-15 word description"),
+    'beverages': ("beverages", 2, None, "Drink name", "Brief description")
+}
 
-class RestaurantConceptGenerator:
-    def __init__(self):
-        self.llm = ChatGroq(
-            model_name="llama-3.3-70b-versatile",
-            temperature=0.7,
-            groq_api_key=os.getenv("GROQ_API_KEY")
-        )
-        self.json_parser = JsonOutputParser()
 
-    def generate_complete_concept(self, cuisine, style="Casual Dining", price_range="$$"):
-        """Generate a comprehensive restaurant concept with all business details."""
-
-        concept_prompt = PromptTemplate(
-            input_variables=['cuisine', 'style', 'price_range'],
-            template="""Create a unique and compelling restaurant concept.
-
-            Cuisine: {cuisine}
-            Style: {style}
-            Price Range: {price_range} ($ = budget, $$ = moderate, $$$ = upscale, $$$$ = luxury)
-
-            Return a JSON object with EXACTLY this structure:
-            {{
-                "name": "Creative restaurant name",
-                "tagline": "Memorable tagline that captures the essence",
-                "concept": "2-3 sentence description of the restaurant's unique concept and atmosphere",
-                "unique_selling_points": [
-                    "First unique aspect",
-                    "Second unique aspect", 
-                    "Third unique aspect"
-                ],
-                "ambiance": "Detailed description of interior design, lighting, music, and overall vibe",
-                "target_audience": "Description of ideal customers",
-                "signature_dish": "Name and brief description of the restaurant's most famous dish"
-            }}
-
-            Be creative, specific, and ensure all content is relevant to {cuisine} cuisine.
-            Return ONLY valid JSON, no additional text."""
-        )
+async def _off_loop(fn, *args):
+    """Run a blocking call (e.g. SQLite cache access) in a thread, keeping the caller's context."""
+    call = functools.partial(contextvars.copy_context().run, fn, *args)
+    return await asyncio.get_event_loop().run_in_executor(None, call)
+
+
+class PendingRestaurant:
+    """A restaurant still being generated in the background.
+
+    ``snapshot()`` has the same shape as generate_full_restaurant's result
+    but holds only what has finished so far: the concept once it is done,
+    and each menu section as it lands.
+    """
+
+    def __init__(self, cuisine, style, price_range):
+        self.cuisine = cuisine
+        self.style = style
+        self.price_range = price_range
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._concept = {}
+        self._menu = {}
+        self._error = None
+
+    def _set_concept(self, concept):
+        with self._lock:
+            self._concept = concept
+
+    def _set_section(self, section, items):
+        with self._lock:
+            self._menu[section] = items
+
+    def _fail(self, error):
+        with self._lock:
+            self._error = error
 
-        concept_chain = concept_prompt | self.llm | self.json_parser
-        concept = concept_chain.invoke({
+    @property
+    def complete(self):
+        return self._done.is_set()
+
+    @property
+    def error(self):
+        return self._error
+
+    def missing_sections(self):
+        with self._lock:
+            return [section for section in MENU_SECTIONS if section not in self._menu]
+
+    def wait(self, timeout=None):
+        """Wait for the background work to end; returns whether it has."""
+        return self._done.wait(timeout)
+
+    def snapshot(self):
+        with self._lock:
+            menu = {section: self._menu[section] for section in MENU_SECTIONS if section in self._menu}
+            return RestaurantConceptGenerator._combine(self._concept, menu, self.cuisine, self.style,
+                                                       self.price_range)
+
+    def result(self, timeout=None):
+        """The complete restaurant; raises the generation error, or TimeoutError if still running."""
+        if not self.wait(timeout):
+            raise TimeoutError("Restaurant generation is still running")
+        if self._error is not None:
+            raise self._error
+        return self.snapshot()
+
+
+# Runs deadline-bounded generations after their callers have moved on
+_background = ThreadPoolExecutor(max_workers=int(os.getenv("CONCEPTKITCHEN_BACKGROUND_THREADS", "8")),
+                                 thread_name_prefix="conceptkitchen-background")
+
+
+class RestaurantConceptGenerator:
+    def __init__(self, cache=None, menu_mode=None, metrics=None, llm=None, coalesce=None, scheduler=None,
+                 hedger=None, prompt_style=None, candidates=None):
+        # Shared, connection-pooled client rather than a fresh ChatGroq per generator;
+        # any other chat model (e.g. fake_llm.FakeChatModel) can be passed in instead
+        self.llm = llm or get_llm(DEFAULT_MODEL, temperature=0.7)
+
+        # "verbose" prompts carry example JSON; "compact" ones describe the shape once and use JSON mode
+        self.prompt_style = prompt_style or os.getenv("CONCEPTKITCHEN_PROMPT_STYLE", "verbose")
+        if self.prompt_style not in PROMPT_STYLES:
+            raise ValueError(f"Unknown prompt style: {self.prompt_style}")
+        self.prompts = build_prompts(self.prompt_style, MENU_SECTIONS)
+        self.model = self.llm
+        if self.prompt_style == "compact":
+            self.model = self.llm.bind(response_format={"type": "json_object"})
+        self.json_parser = JsonOutputParser()
+        self.metrics = metrics or get_metrics()
+
+        # Response cache: None uses the env-configured default, False disables caching
+        if cache is None:
+            cache = ResponseCache.from_env()
+        self.cache = cache or None
+
+        # "single" asks for the whole menu in one completion, "parallel" fans out per section
+        self.menu_mode = menu_mode or os.getenv("CONCEPTKITCHEN_MENU_MODE", "single")
+
+        # Identical concurrent requests share one LLM call unless force_fresh asks for a new variant
+        if coalesce is None:
+            coalesce = os.getenv("CONCEPTKITCHEN_COALESCE", "1").lower() not in ("0", "false", "no")
+        self.inflight = SingleFlight() if coalesce else None
+
+        # Groq RPM/TPM budgets are shared process-wide; None uses them only for the default Groq client,
+        # False disables rate limiting
+        if scheduler is None:
+            scheduler = get_rate_scheduler(self.llm.model_name) if llm is None else None
+        self.scheduler = scheduler or None
+
+        # Retries transient errors and hedges calls slower than the recent tail latency
+        self.hedger = hedger or Hedger(metrics=self.metrics)
+
+        # With more than one candidate, each concept call asks for several ideas at once,
+        # serves the best and keeps the rest for the next click
+        self.candidate_count = candidates or int(os.getenv("CONCEPTKITCHEN_CONCEPT_CANDIDATES", "1"))
+        self.candidates = CandidateStore()
+
+    def _request_key(self, prompt_value):
+        return ResponseCache.make_key(prompt_value.to_string(), self.llm.model_name, self.llm.temperature)
+
+    def _cache_key(self, prompt_value):
+        if self.cache is None:
+            return None
+        return self._request_key(prompt_value)
+
+    def _flight_key(self, prompt_value, force_fresh):
+        """Key that identical in-flight requests coalesce on, or None when they must not."""
+        if self.inflight is None or force_fresh:
+            return None
+        return self._request_key(prompt_value)
+
+    def _coalesced(self, flight_key, call, label):
+        if flight_key is None:
+            return call()
+        text, shared = self.inflight.do(flight_key, call)
+        if shared:
+            self.metrics.inc('coalesced_requests_total', stage=label)
+        return text
+
+    async def _acoalesced(self, flight_key, acall, label):
+        if flight_key is None:
+            return await acall()
+        text, shared = await self.inflight.ado(flight_key, acall)
+        if shared:
+            self.metrics.inc('coalesced_requests_total', stage=label)
+        return text
+
+    def _render(self, prompt, inputs, label):
+        """Render the prompt; returns (prompt_value, cache_key)."""
+        with self.metrics.stage(f"{label}.format"):
+            prompt_value = prompt.invoke(inputs)
+        return prompt_value, self._cache_key(prompt_value)
+
+    def _lookup(self, key, label, force_fresh=False):
+        if key is None or force_fresh:
+            return None
+        cached = self.cache.get(key)
+        self.metrics.inc('cache_lookups_total', stage=label, result="hit" if cached is not None else "miss")
+        return cached
+
+    def _prepare(self, prompt, inputs, label, force_fresh=False):
+        """Render the prompt and look it up in the cache; returns (prompt_value, key, cached_text)."""
+        prompt_value, key = self._render(prompt, inputs, label)
+        return prompt_value, key, self._lookup(key, label, force_fresh)
+
+    def _reserve(self, prompt_value):
+        """Wait for rate-limit budget for a call; returns the tokens reserved, or None."""
+        if self.scheduler is None:
+            return None
+        estimate = estimate_tokens(prompt_value.to_string())
+        self.scheduler.acquire(estimate)
+        return estimate
+
+    async def _areserve(self, prompt_value):
+        if self.scheduler is None:
+            return None
+        estimate = estimate_tokens(prompt_value.to_string())
+        await self.scheduler.aacquire(estimate)
+        return estimate
+
+    def _record_llm_call(self, record, message, reserved, prompt_value):
+        """Record a call's usage and settle every budget its attempts reserved.
+
+        The answer settles one reservation; the others belong to retries and hedges that failed or
+        lost, which sent the prompt but whose replies never counted, so they keep only its tokens.
+        """
+        record['model'] = self.llm.model_name
+        record['input_tokens'], record['output_tokens'] = token_usage(message)
+        reserved = [tokens for tokens in reserved if tokens is not None]
+        if reserved and record['input_tokens'] is not None:
+            self.scheduler.settle(reserved.pop(), record['input_tokens'] + (record['output_tokens'] or 0))
+        self._release(reserved, prompt_value)
+
+    def _release(self, reserved, prompt_value):
+        """Give back the reply part of reservations whose attempts never answered."""
+        sent = estimate_tokens(prompt_value.to_string(), output_tokens=0)
+        for tokens in reserved:
+            if tokens is not None:
+                self.scheduler.settle(tokens, sent)
+
+    def _may_hedge(self, prompt_value, reserved):
+        """Callable charging a hedge's budget, noted in `reserved`, if it is free right now; None without a scheduler."""
+        if self.scheduler is None:
+            return None
+        estimate = estimate_tokens(prompt_value.to_string())
+
+        def may_hedge():
+            if not self.scheduler.try_acquire(estimate):
+                return False
+            reserved.append(estimate)
+            return True
+        return may_hedge
+
+    def _call_llm(self, prompt_value, label):
+        # Every attempt, retry or hedge, is a real request and needs its own budget. Budget is
+        # reserved outside the hedged region, so queueing never counts as slow model latency
+        reserved = []
+
+        def reserve():
+            reserved.append(self._reserve(prompt_value))
+
+        with self.metrics.stage(f"{label}.llm") as record:
+            try:
+                message = self.hedger.call(lambda: self.model.invoke(prompt_value), label,
+                                           reserve=reserve, may_hedge=self._may_hedge(prompt_value, reserved))
+            except BaseException:
+                self._release(reserved, prompt_value)
+                raise
+            self._record_llm_call(record, message, reserved, prompt_value)
+        return message.content
+
+    async def _acall_llm(self, prompt_value, label):
+        reserved = []
+
+        async def reserve():
+            reserved.append(await self._areserve(prompt_value))
+
+        with self.metrics.stage(f"{label}.llm") as record:
+            try:
+                message = await self.hedger.acall(lambda: self.model.ainvoke(prompt_value), label,
+                                                  reserve=reserve, may_hedge=self._may_hedge(prompt_value, reserved))
+            except BaseException:
+                self._release(reserved, prompt_value)
+                raise
+            self._record_llm_call(record, message, reserved, prompt_value)
+        return message.content
+
+    def _parse(self, text, label, validate=None):
+        """Parse a JSON reply, repairing common defects locally, then validate it if asked.
+
+        Raises SchemaError when the reply cannot be used even after repair.
+        """
+        with self.metrics.stage(f"{label}.parse"):
+            try:
+                result = self.json_parser.parse(text)
+            except OutputParserException:
+                try:
+                    result = repair_json(text)
+                except ValueError as e:
+                    self.metrics.inc('json_repairs_total', stage=label, result="failed")
+                    raise SchemaError(f"Unusable {label} reply: {e}", sections=[label.split(".")[-1]]) from e
+                self.metrics.inc('json_repairs_total', stage=label, result="repaired")
+
+            if validate is None:
+                return result
+            try:
+                return validate(result)
+            except SchemaError:
+                self.metrics.inc('schema_failures_total', stage=label)
+                raise
+
+    def _finish(self, text, key, label, validate=None):
+        """Parse a fresh completion and cache it once it has parsed and validated cleanly."""
+        result = self._parse(text, label, validate)
+        if key is not None:
+            self.cache.set(key, text)
+        return result
+
+    def _run(self, prompt, inputs, force_fresh=False, label="llm", validate=None):
+        """Render a prompt, answer it from the cache when possible and parse the JSON reply."""
+        prompt_value, key, cached = self._prepare(prompt, inputs, label, force_fresh)
+        if cached is not None:
+            return self._parse(cached, label, validate)
+
+        flight_key = self._flight_key(prompt_value, force_fresh)
+        text = self._coalesced(flight_key, lambda: self._call_llm(prompt_value, label), label)
+        return self._finish(text, key, label, validate)
+
+    async def _arun(self, prompt, inputs, force_fresh=False, label="llm", validate=None):
+        """Async twin of _run; cache reads and writes run off the event loop."""
+        prompt_value, key = self._render(prompt, inputs, label)
+        cached = await _off_loop(self._lookup, key, label, force_fresh) if key is not None else None
+        if cached is not None:
+            return self._parse(cached, label, validate)
+
+        flight_key = self._flight_key(prompt_value, force_fresh)
+        text = await self._acoalesced(flight_key, lambda: self._acall_llm(prompt_value, label), label)
+        result = self._parse(text, label, validate)
+        if key is not None:
+            await _off_loop(self.cache.set, key, text)
+        return result
+
+    def _stream(self, prompt, inputs, force_fresh=False, label="llm", validate=None):
+        """Like _run, but yield partially parsed JSON as tokens arrive; the last value is complete."""
+        prompt_value, key, cached = self._prepare(prompt, inputs, label, force_fresh)
+        if cached is not None:
+            yield self._parse(cached, label, validate)
+            return
+
+        # Followers of an identical in-flight request wait for its text rather than streaming their own
+        flight_key = self._flight_key(prompt_value, force_fresh)
+        future = None
+        while flight_key is not None:
+            future, leader = self.inflight.begin(flight_key)
+            if leader:
+                break
+            try:
+                text = future.result()
+            except LeaderCancelled:
+                # The leader gave up: take over, or wait for whoever did
+                continue
+            self.metrics.inc('coalesced_requests_total', stage=label)
+            yield self._parse(text, label, validate)
+            return
+
+        message = None
+        last = None
+        reserved = []
+        try:
+            with self.metrics.stage(f"{label}.llm") as record:
+                # Streams are not hedged, but are retried while nothing has been shown yet
+                attempt = 0
+                while True:
+                    reserved.append(self._reserve(prompt_value))
+                    try:
+                        for chunk in self.model.stream(prompt_value):
+                            message = chunk if message is None else message + chunk
+                            partial = self.json_parser.parse_result([Generation(text=message.content)],
+                                                                    partial=True)
+                            if partial is not None and partial != last:
+                                last = partial
+                                yield partial
+                        break
+                    except Exception as e:
+                        if message is not None or not self.hedger.should_retry(e, attempt, label):
+                            raise
+                    time.sleep(self.hedger.backoff(attempt))
+                    attempt += 1
+                self._record_llm_call(record, message, reserved, prompt_value)
+        except GeneratorExit:
+            # Consumer stopped reading before the reply was complete; a waiting caller makes the call itself
+            self._release(reserved, prompt_value)
+            if future is not None:
+                self.inflight.finish(flight_key, future, exception=LeaderCancelled())
+            raise
+        except BaseException as e:
+            self._release(reserved, prompt_value)
+            if future is not None:
+                self.inflight.finish(flight_key, future, exception=e)
+            raise
+
+        text = message.content if message is not None else ""
+        if future is not None:
+            self.inflight.finish(flight_key, future, text)
+        yield self._finish(text, key, label, validate)
+
+    def _concept_request(self, cuisine, style, price_range):
+        """Pick the concept prompt and build its inputs."""
+        return self.prompts['concept'], {
             "cuisine": cuisine,
             "style": style,
             "price_range": price_range
-        })
-
-        return concept
+        }
 
-    def generate_detailed_menu(self, restaurant_name, cuisine, concept, price_range):
-        """Generate a detailed menu with prices and descriptions."""
+    @staticmethod
+    def _price_guidelines(price_range):
+        """Work out the per-section price bands for a price range."""
 
         # Price multipliers based on range
         price_multipliers = {
@@ -70,78 +421,265 @@ class RestaurantConceptGenerator:
         multiplier = price_multipliers.get(price_range, 2)
         base = int(8 * multiplier)
 
-        # Create the menu prompt with properly formatted price ranges
-        menu_prompt = PromptTemplate(
-            input_variables=['name', 'cuisine', 'concept',
-                             'app_min', 'app_max', 'main_min', 'main_max',
-                             'dessert_min', 'dessert_max'],
-            template="""Create a detailed menu for this restaurant:
-
-            Restaurant: {name}
-            Cuisine: {cuisine}
-            Concept: {concept}
-            Price Guidelines: 
-            - Appetizers ${app_min}-${app_max}
-            - Mains ${main_min}-${main_max}
-            - Desserts ${dessert_min}-${dessert_max}
-
-            Return a JSON object with EXACTLY this structure:
-            {{
-                "appetizers": [
-                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": ["vegetarian/vegan/gluten-free if applicable"]}},
-                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}},
-                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}}
-                ],
-                "mains": [
-                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}},
-                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}},
-                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}},
-                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}}
-                ],
-                "desserts": [
-                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}},
-                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}}
-                ],
-                "beverages": [
-                    {{"name": "Drink name", "description": "Brief description", "price": "$XX", "dietary": []}},
-                    {{"name": "Drink name", "description": "Brief description", "price": "$XX", "dietary": []}}
-                ]
-            }}
-
-            Make all items authentic to {cuisine} cuisine. Return ONLY valid JSON."""
-        )
-
-        # Now invoke with all the variables properly defined
-        menu_chain = menu_prompt | self.llm | self.json_parser
-        menu = menu_chain.invoke({
-            'name': restaurant_name,
-            'cuisine': cuisine,
-            'concept': concept,
+        return {
             'app_min': base,
             'app_max': base * 2,
             'main_min': base * 3,
             'main_max': base * 5,
             'dessert_min': base,
             'dessert_max': base * 2
-        })
+        }
 
-        return menu
+    def _menu_request(self, restaurant_name, cuisine, concept, price_range):
+        """Pick the menu prompt and build its inputs."""
+        inputs = {
+            'name': restaurant_name,
+            'cuisine': cuisine,
+            'concept': concept
+        }
+        inputs.update(self._price_guidelines(price_range))
+        return self.prompts['menu'], inputs
 
-    def generate_full_restaurant(self, cuisine, style="Casual Dining", price_range="$$"):
-        """Generate everything: concept + detailed menu."""
+    def _section_request(self, section, restaurant_name, cuisine, concept, price_range):
+        """Build the prompt and inputs for a single menu section."""
+        title, count, price_keys, item_label, description_hint = MENU_SECTIONS[section]
 
-        # Generate concept first
-        concept = self.generate_complete_concept(cuisine, style, price_range)
+        price_guideline = "Priced to match the rest of the menu"
+        if price_keys:
+            guidelines = self._price_guidelines(price_range)
+            price_guideline = f"${guidelines[price_keys[0]]}-${guidelines[price_keys[1]]}"
 
-        # Then generate menu based on concept
-        menu = self.generate_detailed_menu(
-            concept['name'],
-            cuisine,
-            concept['concept'],
-            price_range
-        )
+        return self.prompts['section'], {
+            'name': restaurant_name,
+            'cuisine': cuisine,
+            'concept': concept,
+            'section': section,
+            'title': title,
+            'count': count,
+            'price_guideline': price_guideline,
+            'item_label': item_label,
+            'description_hint': description_hint
+        }
 
-        # Combine everything
+    def _section_specs(self, price_range):
+        """Expected item count and price band of every menu section, for validation."""
+        guidelines = self._price_guidelines(price_range)
+        return {
+            section: (count, (guidelines[price_keys[0]], guidelines[price_keys[1]]) if price_keys else None)
+            for section, (_, count, price_keys, _, _) in MENU_SECTIONS.items()
+        }
+
+    def _rerequested(self, error, label):
+        self.metrics.inc('llm_rerequests_total', stage=label, reason=type(error).__name__)
+
+    def _section_runnable(self, section, restaurant_name, cuisine, concept, price_range, force_fresh=False):
+        """Wrap one menu section as a runnable returning its validated list of items.
+
+        A reply that fails validation even after local repair is requested once more.
+        """
+        prompt, inputs = self._section_request(section, restaurant_name, cuisine, concept, price_range)
+        count, band = self._section_specs(price_range)[section]
+        label = f"menu.{section}"
+
+        def validate(result):
+            return clean_section(section, result, count, band)
+
+        def run_section(_):
+            try:
+                return self._run(prompt, inputs, force_fresh=force_fresh, label=label, validate=validate)
+            except SchemaError as e:
+                self._rerequested(e, label)
+                return self._run(prompt, inputs, force_fresh=True, label=label, validate=validate)
+
+        async def arun_section(_):
+            try:
+                return await self._arun(prompt, inputs, force_fresh=force_fresh, label=label, validate=validate)
+            except SchemaError as e:
+                self._rerequested(e, label)
+                return await self._arun(prompt, inputs, force_fresh=True, label=label, validate=validate)
+
+        return RunnableLambda(run_section, afunc=arun_section)
+
+    def _parallel_menu(self, restaurant_name, cuisine, concept, price_range, force_fresh=False, sections=None):
+        """Fan the menu (or just the given sections) out into one call per section, merged by RunnableParallel."""
+        return RunnableParallel({
+            section: self._section_runnable(section, restaurant_name, cuisine, concept,
+                                            price_range, force_fresh=force_fresh)
+            for section in (sections or MENU_SECTIONS)
+        })
+
+    def _menu_validator(self, price_range):
+        specs = self._section_specs(price_range)
+        return lambda menu: clean_menu(menu, specs)
+
+    def _repair_menu(self, error, restaurant_name, cuisine, concept, price_range, force_fresh=False):
+        """Complete a menu that failed validation by re-requesting only its failing sections."""
+        for section in error.sections:
+            self._rerequested(error, f"menu.{section}")
+        menu = dict(error.value or {})
+        menu.update(self._parallel_menu(restaurant_name, cuisine, concept, price_range,
+                                        force_fresh=force_fresh, sections=error.sections).invoke(None))
+        return {section: menu[section] for section in MENU_SECTIONS}
+
+    async def _arepair_menu(self, error, restaurant_name, cuisine, concept, price_range, force_fresh=False):
+        for section in error.sections:
+            self._rerequested(error, f"menu.{section}")
+        menu = dict(error.value or {})
+        menu.update(await self._parallel_menu(restaurant_name, cuisine, concept, price_range,
+                                              force_fresh=force_fresh, sections=error.sections).ainvoke(None))
+        return {section: menu[section] for section in MENU_SECTIONS}
+
+    def _candidates_request(self, cuisine, style, price_range):
+        """Pick the multi-candidate concept prompt and build its inputs."""
+        return self.prompts['candidates'], {
+            "count": self.candidate_count,
+            "cuisine": cuisine,
+            "style": style,
+            "price_range": price_range
+        }
+
+    def _clean_candidates(self, result):
+        """Validate each candidate, dropping the unusable ones; raises SchemaError if none are left."""
+        concepts = result.get('concepts') if isinstance(result, dict) else result
+        valid = []
+        for concept in concepts if isinstance(concepts, list) else []:
+            try:
+                valid.append(clean_concept(concept))
+            except SchemaError:
+                continue
+        self.metrics.inc('concept_candidates_total', len(valid), result="valid")
+        if not valid:
+            raise SchemaError("No usable concept candidates", sections=['concept'])
+        return valid
+
+    def generate_concept_candidates(self, cuisine, style="Casual Dining", price_range="$$", force_fresh=False,
+                                    history=()):
+        """Ask for candidate_count concepts in one completion and return them ranked best first.
+
+        Candidates are ranked on novelty against ``history`` and recently
+        served names, on field completeness and on length limits.
+        """
+        prompt, inputs = self._candidates_request(cuisine, style, price_range)
+        try:
+            valid = self._run(prompt, inputs, force_fresh=force_fresh, label="concept",
+                              validate=self._clean_candidates)
+        except SchemaError as e:
+            self._rerequested(e, "concept")
+            valid = self._run(prompt, inputs, force_fresh=True, label="concept", validate=self._clean_candidates)
+        return rank_candidates(valid, list(history) + list(self.candidates.history))
+
+    async def agenerate_concept_candidates(self, cuisine, style="Casual Dining", price_range="$$",
+                                           force_fresh=False, history=()):
+        """Async version of generate_concept_candidates."""
+        prompt, inputs = self._candidates_request(cuisine, style, price_range)
+        try:
+            valid = await self._arun(prompt, inputs, force_fresh=force_fresh, label="concept",
+                                     validate=self._clean_candidates)
+        except SchemaError as e:
+            self._rerequested(e, "concept")
+            valid = await self._arun(prompt, inputs, force_fresh=True, label="concept",
+                                     validate=self._clean_candidates)
+        return rank_candidates(valid, list(history) + list(self.candidates.history))
+
+    def _serve_candidate(self, combo, ranked):
+        best, spares = ranked[0], ranked[1:]
+        self.candidates.put(combo, spares)
+        self.candidates.served(best)
+        return best
+
+    def _stored_candidate(self, combo, force_fresh):
+        if force_fresh:
+            return None
+        concept = self.candidates.take(combo)
+        self.metrics.inc('concept_candidate_requests_total', result="stored" if concept else "generated")
+        return concept
+
+    def _next_candidate(self, cuisine, style, price_range, force_fresh=False):
+        combo = (cuisine, style, price_range)
+        concept = self._stored_candidate(combo, force_fresh)
+        if concept is not None:
+            return concept
+        # A repeat request would only get the cached list back, so ask for new ideas instead
+        fresh = force_fresh or self.candidates.requested_before(combo)
+        return self._serve_candidate(combo, self.generate_concept_candidates(cuisine, style, price_range,
+                                                                             force_fresh=fresh))
+
+    async def _anext_candidate(self, cuisine, style, price_range, force_fresh=False):
+        combo = (cuisine, style, price_range)
+        concept = self._stored_candidate(combo, force_fresh)
+        if concept is not None:
+            return concept
+        fresh = force_fresh or self.candidates.requested_before(combo)
+        return self._serve_candidate(combo, await self.agenerate_concept_candidates(cuisine, style, price_range,
+                                                                                    force_fresh=fresh))
+
+    def generate_complete_concept(self, cuisine, style="Casual Dining", price_range="$$", force_fresh=False):
+        """Generate a comprehensive restaurant concept with all business details.
+
+        In multi-candidate mode a stored spare candidate is served when there
+        is one, so a "next idea" needs no concept call at all.
+        """
+        if self.candidate_count > 1:
+            return self._next_candidate(cuisine, style, price_range, force_fresh)
+
+        prompt, inputs = self._concept_request(cuisine, style, price_range)
+        try:
+            return self._run(prompt, inputs, force_fresh=force_fresh, label="concept", validate=clean_concept)
+        except SchemaError as e:
+            self._rerequested(e, "concept")
+            return self._run(prompt, inputs, force_fresh=True, label="concept", validate=clean_concept)
+
+    async def agenerate_complete_concept(self, cuisine, style="Casual Dining", price_range="$$", force_fresh=False):
+        """Async version of generate_complete_concept."""
+        if self.candidate_count > 1:
+            return await self._anext_candidate(cuisine, style, price_range, force_fresh)
+
+        prompt, inputs = self._concept_request(cuisine, style, price_range)
+        try:
+            return await self._arun(prompt, inputs, force_fresh=force_fresh, label="concept",
+                                    validate=clean_concept)
+        except SchemaError as e:
+            self._rerequested(e, "concept")
+            return await self._arun(prompt, inputs, force_fresh=True, label="concept", validate=clean_concept)
+
+    def generate_detailed_menu(self, restaurant_name, cuisine, concept, price_range,
+                               force_fresh=False, menu_mode=None):
+        """Generate a detailed menu with prices and descriptions.
+
+        menu_mode="parallel" requests each section separately and concurrently;
+        "single" (the default unless configured otherwise) uses one completion.
+        Either way, only sections that fail validation are requested again.
+        concept may also be a models.Concept.
+        """
+        concept = _concept_text(concept)
+        if (menu_mode or self.menu_mode) == "parallel":
+            return self._parallel_menu(restaurant_name, cuisine, concept, price_range,
+                                       force_fresh=force_fresh).invoke(None)
+
+        prompt, inputs = self._menu_request(restaurant_name, cuisine, concept, price_range)
+        try:
+            return self._run(prompt, inputs, force_fresh=force_fresh, label="menu",
+                             validate=self._menu_validator(price_range))
+        except SchemaError as e:
+            return self._repair_menu(e, restaurant_name, cuisine, concept, price_range, force_fresh)
+
+    async def agenerate_detailed_menu(self, restaurant_name, cuisine, concept, price_range,
+                                      force_fresh=False, menu_mode=None):
+        """Async version of generate_detailed_menu."""
+        concept = _concept_text(concept)
+        if (menu_mode or self.menu_mode) == "parallel":
+            return await self._parallel_menu(restaurant_name, cuisine, concept, price_range,
+                                             force_fresh=force_fresh).ainvoke(None)
+
+        prompt, inputs = self._menu_request(restaurant_name, cuisine, concept, price_range)
+        try:
+            return await self._arun(prompt, inputs, force_fresh=force_fresh, label="menu",
+                                    validate=self._menu_validator(price_range))
+        except SchemaError as e:
+            return await self._arepair_menu(e, restaurant_name, cuisine, concept, price_range, force_fresh)
+
+    @staticmethod
+    def _combine(concept, menu, cuisine, style, price_range):
         return {
             'concept': concept,
             'menu': menu,
@@ -152,44 +690,243 @@ class RestaurantConceptGenerator:
             }
         }
 
+    def generate_full_restaurant(self, cuisine, style="Casual Dining", price_range="$$", force_fresh=False):
+        """Generate everything: concept + detailed menu."""
 
-# Keep backward compatibility
-def generate_restaurant_name_items(cuisine):
-    """Legacy function for compatibility."""
-    generator = RestaurantConceptGenerator()
-    result = generator.generate_full_restaurant(cuisine)
+        with self.metrics.request("full_restaurant"):
+            # Generate concept first
+            concept = self.generate_complete_concept(cuisine, style, price_range, force_fresh=force_fresh)
+
+            # Then generate menu based on concept
+            menu = self.generate_detailed_menu(
+                concept['name'],
+                cuisine,
+                concept['concept'],
+                price_range,
+                force_fresh=force_fresh
+            )
+
+        # Combine everything
+        return self._combine(concept, menu, cuisine, style, price_range)
+
+    async def agenerate_full_restaurant(self, cuisine, style="Casual Dining", price_range="$$", force_fresh=False):
+        """Async version of generate_full_restaurant."""
+        with self.metrics.request("full_restaurant"):
+            concept = await self.agenerate_complete_concept(cuisine, style, price_range, force_fresh=force_fresh)
+            menu = await self.agenerate_detailed_menu(
+                concept['name'],
+                cuisine,
+                concept['concept'],
+                price_range,
+                force_fresh=force_fresh
+            )
+        return self._combine(concept, menu, cuisine, style, price_range)
+
+    def _fill_pending(self, pending, force_fresh=False):
+        """Generate into a PendingRestaurant: the concept, then every menu section concurrently."""
+        try:
+            with self.metrics.request("full_restaurant"):
+                concept = self.generate_complete_concept(pending.cuisine, pending.style, pending.price_range,
+                                                         force_fresh=force_fresh)
+                pending._set_concept(concept)
+
+                # One call per section so each can be shown as soon as it is ready
+                sections = list(MENU_SECTIONS)
+                runnables = [
+                    self._section_runnable(section, concept['name'], pending.cuisine, concept['concept'],
+                                           pending.price_range, force_fresh=force_fresh)
+                    for section in sections
+                ]
+                run_section = RunnableLambda(lambda index: runnables[index].invoke(None))
+                for index, items in run_section.batch_as_completed(list(range(len(sections)))):
+                    pending._set_section(sections[index], items)
+        except Exception as e:
+            pending._fail(e)
+        finally:
+            pending._done.set()
+
+    def start_full_restaurant(self, cuisine, style="Casual Dining", price_range="$$", force_fresh=False):
+        """Start generating a restaurant in the background and return its PendingRestaurant."""
+        pending = PendingRestaurant(cuisine, style, price_range)
+        _background.submit(contextvars.copy_context().run, self._fill_pending, pending, force_fresh)
+        return pending
+
+    def generate_within(self, time_budget, cuisine, style="Casual Dining", price_range="$$", force_fresh=False):
+        """Generate a restaurant, but return after at most time_budget seconds.
+
+        Returns a PendingRestaurant; when the budget runs out first, its
+        snapshot() holds whatever finished in time and the rest keeps
+        generating in the background.
+        """
+        pending = self.start_full_restaurant(cuisine, style, price_range, force_fresh=force_fresh)
+        pending.wait(time_budget)
+        return pending
+
+    def stream_full_restaurant(self, cuisine, style="Casual Dining", price_range="$$", force_fresh=False):
+        """Generate everything, yielding progressively filled-in restaurant snapshots.
+
+        Every snapshot has the same shape as generate_full_restaurant's result;
+        the concept fills in first, then the menu. The last snapshot is complete.
+        The menu is streamed from a single completion regardless of menu_mode.
+        """
+        start = time.perf_counter()
+        first_content = True
+
+        concept = {}
+        if self.candidate_count > 1:
+            # Candidates are ranked as a set, so the concept arrives whole rather than streamed
+            concept = self.generate_complete_concept(cuisine, style, price_range, force_fresh=force_fresh)
+            self.metrics.observe('stream_first_content_seconds', time.perf_counter() - start)
+            yield self._combine(concept, {}, cuisine, style, price_range)
+        else:
+            concept_prompt, concept_inputs = self._concept_request(cuisine, style, price_range)
+            try:
+                for concept in self._stream(concept_prompt, concept_inputs, force_fresh=force_fresh,
+                                            label="concept", validate=clean_concept):
+                    if first_content:
+                        self.metrics.observe('stream_first_content_seconds', time.perf_counter() - start)
+                        first_content = False
+                    yield self._combine(concept, {}, cuisine, style, price_range)
+            except SchemaError as e:
+                self._rerequested(e, "concept")
+                concept = self._run(concept_prompt, concept_inputs, force_fresh=True, label="concept",
+                                    validate=clean_concept)
+                yield self._combine(concept, {}, cuisine, style, price_range)
+
+        menu_prompt, menu_inputs = self._menu_request(concept['name'], cuisine, concept['concept'], price_range)
+        try:
+            for menu in self._stream(menu_prompt, menu_inputs, force_fresh=force_fresh, label="menu",
+                                     validate=self._menu_validator(price_range)):
+                yield self._combine(concept, menu, cuisine, style, price_range)
+        except SchemaError as e:
+            menu = self._repair_menu(e, concept['name'], cuisine, concept['concept'], price_range, force_fresh)
+            yield self._combine(concept, menu, cuisine, style, price_range)
+
+        self.metrics.observe('request_duration_seconds', time.perf_counter() - start, request="stream_full_restaurant")
+
+    def generate_name_items(self, cuisine, count=7, force_fresh=False):
+        """Minimal single call: a restaurant name, tagline and up to count main course names."""
+        inputs = {'cuisine': cuisine, 'count': count}
+        validate = lambda result: clean_name_items(result, count)
+        try:
+            return self._run(self.prompts['name_items'], inputs, force_fresh=force_fresh, label="name_items",
+                             validate=validate)
+        except SchemaError as e:
+            self._rerequested(e, "name_items")
+            return self._run(self.prompts['name_items'], inputs, force_fresh=True, label="name_items",
+                             validate=validate)
+
+    def _spec_runnable(self, force_fresh=False):
+        """Wrap full-restaurant generation as a runnable taking a spec dict."""
+        # Batch work queues behind interactive requests, within the caller's session
+        _, session = current_scheduling()
+
+        def run_spec(spec):
+            with scheduling("batch", session):
+                return self.generate_full_restaurant(force_fresh=force_fresh, **_spec_kwargs(spec))
+
+        async def arun_spec(spec):
+            with scheduling("batch", session):
+                return await self.agenerate_full_restaurant(force_fresh=force_fresh, **_spec_kwargs(spec))
+
+        return RunnableLambda(run_spec, afunc=arun_spec)
+
+    def generate_many(self, specs, max_concurrency=4, force_fresh=True):
+        """Generate restaurants for many specs, yielding (index, result) pairs as they complete.
+
+        Bulk runs want distinct concepts, so by default every spec bypasses the
+        cache and in-flight coalescing; pass force_fresh=False to let repeated
+        specs share one answer. A spec that fails yields its exception as the
+        result, so one bad spec never cancels the rest of the batch.
+        """
+        return self._spec_runnable(force_fresh).batch_as_completed(
+            list(specs),
+            config={'max_concurrency': max_concurrency},
+            return_exceptions=True
+        )
+
+    def agenerate_many(self, specs, max_concurrency=4, force_fresh=True):
+        """Async version of generate_many; returns an async iterator of (index, result) pairs."""
+        return self._spec_runnable(force_fresh).abatch_as_completed(
+            list(specs),
+            config={'max_concurrency': max_concurrency},
+            return_exceptions=True
+        )
+
+
+def _concept_text(concept):
+    return concept.concept if isinstance(concept, Concept) else concept
+
+
+def _spec_kwargs(spec):
+    """Normalise a spec dict, (cuisine, style, price_range) tuple or models.Restaurant into keyword arguments."""
+    if isinstance(spec, Restaurant):
+        return {'cuisine': spec.cuisine, 'style': spec.style, 'price_range': spec.price_range}
+    if isinstance(spec, dict):
+        kwargs = {'cuisine': spec['cuisine']}
+        if spec.get('style'):
+            kwargs['style'] = spec['style']
+        if spec.get('price_range'):
+            kwargs['price_range'] = spec['price_range']
+        return kwargs
+    return dict(zip(('cuisine', 'style', 'price_range'), spec))
+
+
+_shared_generator = None
+_shared_generator_lock = threading.Lock()
 
-    # Extract simple format for old code
-    menu_items = []
-    for item in result['menu']['mains'][:7]:
-        menu_items.append(item['name'])
 
+def get_shared_generator():
+    """Return the process-wide generator used by the module-level entry points."""
+    global _shared_generator
+    if _shared_generator is None:
+        with _shared_generator_lock:
+            if _shared_generator is None:
+                _shared_generator = RestaurantConceptGenerator()
+    return _shared_generator
+
+
+_fast_generator = None
+
+
+def get_fast_generator():
+    """Return the process-wide generator on the fast model tier (GROQ_FAST_MODEL), if one is set."""
+    global _fast_generator
+    if FAST_MODEL == DEFAULT_MODEL:
+        return get_shared_generator()
+    if _fast_generator is None:
+        with _shared_generator_lock:
+            if _fast_generator is None:
+                _fast_generator = RestaurantConceptGenerator(
+                    llm=get_llm(FAST_MODEL, temperature=0.7),
+                    scheduler=get_rate_scheduler(FAST_MODEL)
+                )
+    return _fast_generator
+
+
+# Keep backward compatibility: one small call on the fast tier instead of the full pipeline
+def generate_restaurant_name_items(cuisine):
+    """Legacy function for compatibility."""
+    result = get_fast_generator().generate_name_items(cuisine)
     return {
-        'restaurant_name': result['concept']['name'],
-        'menu_items': ", ".join(menu_items)
+        'restaurant_name': result['name'],
+        'menu_items': ", ".join(result['menu_items'])
     }
 
 
 def generate_restaurant_name_items_parallel(cuisine):
-    """Legacy function for compatibility with parallel generation."""
-    generator = RestaurantConceptGenerator()
-    result = generator.generate_full_restaurant(cuisine)
-
-    # Extract with tagline for compatibility
-    menu_items = []
-    for item in result['menu']['mains'][:7]:
-        menu_items.append(item['name'])
-
+    """Legacy function for compatibility; same single call, with the tagline included."""
+    result = get_fast_generator().generate_name_items(cuisine)
     return {
-        'restaurant_name': result['concept']['name'],
-        'tagline': result['concept']['tagline'],
-        'menu_items': ", ".join(menu_items)
+        'restaurant_name': result['name'],
+        'tagline': result['tagline'],
+        'menu_items': ", ".join(result['menu_items'])
     }
 
 
 if __name__ == "__main__":
     # Test the new comprehensive generator
-    generator = RestaurantConceptGenerator()
+    generator = get_shared_generator()
 
     print("Testing comprehensive concept generation...")
     print("=" * 50)
@@ -0,0 +1,174 @@
+import os
+import weakref
+import asyncio
+import threading
+import httpx
+from langchain_groq import ChatGroq
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+# Opt-in smaller, faster tier for lightweight calls (e.g. llama-3.1-8b-instant); unset means DEFAULT_MODEL
+FAST_MODEL = os.getenv("GROQ_FAST_MODEL") or DEFAULT_MODEL
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """Async transport with a connection pool per event loop, since pooled connections cannot cross loops."""
+
+    def __init__(self, limits):
+        self.limits = limits
+        self._lock = threading.Lock()
+        # Dropped with their loop
+        self._transports = weakref.WeakKeyDictionary()
+
+    def _transport(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = self._transports[loop] = httpx.AsyncHTTPTransport(limits=self.limits)
+            return transport
+
+    async def handle_async_request(self, request):
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self):
+        """Close the running loop's connections."""
+        with self._lock:
+            transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+    def close_all(self):
+        """Close every loop's connections, each on its own loop."""
+        with self._lock:
+            transports = list(self._transports.items())
+            self._transports.clear()
+        for loop, transport in transports:
+            if loop.is_closed():
+                # Nothing can run on it any more; the sockets close once the transport is collected
+                continue
+            if not loop.is_running():
+                loop.run_until_complete(transport.aclose())
+            elif _running_loop() is loop:
+                loop.create_task(transport.aclose())
+            else:
+                asyncio.run_coroutine_threadsafe(transport.aclose(), loop)
+
+
+class ClientPool:
+    """Process-wide keep-alive HTTP connection pool and the ChatGroq clients built on it.
+
+    Every ChatGroq handed out shares the same httpx clients, so TLS and
+    connection setup are paid once per connection rather than once per
+    generator. Instances are cached per (model, temperature) and are safe
+    to use from many threads.
+    """
+
+    def __init__(self, max_connections=None, max_keepalive_connections=None,
+                 keepalive_expiry=None, timeout=None):
+        self.max_connections = max_connections or int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+        self.max_keepalive_connections = (
+            max_keepalive_connections or int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "10"))
+        )
+        self.keepalive_expiry = keepalive_expiry or float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "60"))
+        self.timeout = timeout or float(os.getenv("GROQ_TIMEOUT", "60"))
+
+        self._lock = threading.Lock()
+        self._http_client = None
+        self._async_http_client = None
+        self._async_transport = None
+        self._llms = {}
+
+    def _limits(self):
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def http_client(self):
+        """The shared synchronous httpx client."""
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(limits=self._limits(), timeout=self.timeout)
+            return self._http_client
+
+    def async_http_client(self):
+        """The shared asynchronous httpx client.
+
+        Its connections are pooled per event loop, so it can be used from
+        any number of loops (the server's, asyncio.run in scripts and tests).
+        """
+        with self._lock:
+            if self._async_http_client is None:
+                self._async_transport = _PerLoopTransport(self._limits())
+                self._async_http_client = httpx.AsyncClient(transport=self._async_transport, timeout=self.timeout)
+            return self._async_http_client
+
+    def get_llm(self, model_name=DEFAULT_MODEL, temperature=0.7):
+        """Return the shared ChatGroq for a model and temperature, creating it on first use."""
+        key = (model_name, temperature)
+        llm = self._llms.get(key)
+        if llm is not None:
+            return llm
+
+        http_client = self.http_client()
+        async_http_client = self.async_http_client()
+
+        with self._lock:
+            if key not in self._llms:
+                self._llms[key] = ChatGroq(
+                    model_name=model_name,
+                    temperature=temperature,
+                    groq_api_key=os.getenv("GROQ_API_KEY"),
+                    http_client=http_client,
+                    http_async_client=async_http_client,
+                    # Retries are done by hedging.Hedger with jittered backoff
+                    max_retries=0
+                )
+            return self._llms[key]
+
+    def close(self):
+        """Close the pooled connections, sync and async; later calls reopen them.
+
+        Async connections are closed on their own event loop: straight away
+        when that loop is idle, otherwise by a task scheduled on it.
+        """
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            if self._async_transport is not None:
+                self._async_transport.close_all()
+            self._http_client = None
+            self._async_http_client = None
+            self._async_transport = None
+            self._llms = {}
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_client_pool():
+    """Return the process-wide ClientPool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ClientPool()
+    return _pool
+
+
+def get_llm(model_name=DEFAULT_MODEL, temperature=0.7):
+    """Shortcut for get_client_pool().get_llm(...)."""
+    return get_client_pool().get_llm(model_name, temperature)
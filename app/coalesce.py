@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class LeaderCancelled(Exception):
+    """The leader of a shared call was cancelled before it finished; a follower takes over."""
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers asking for the same key.
+
+    The first caller for a key becomes the leader and runs the call; callers
+    arriving while it runs wait for the leader's result (or exception)
+    instead of making their own. Sync and async callers share the same
+    ``concurrent.futures.Future``, so a thread and an event loop can
+    coalesce with each other. Keys are forgotten as soon as the call ends.
+    When an async leader is cancelled, a waiting caller runs the call
+    itself instead of inheriting the cancellation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def begin(self, key):
+        """Return (future, is_leader); the leader must call finish() when done."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def finish(self, key, future, result=None, exception=None):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn):
+        """Run fn() unless an identical call is in flight; returns (result, shared)."""
+        while True:
+            future, leader = self.begin(key)
+            if leader:
+                break
+            try:
+                return future.result(), True
+            except LeaderCancelled:
+                continue
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, future, exception=e)
+            raise
+        self.finish(key, future, result)
+        return result, False
+
+    async def ado(self, key, afn):
+        """Async twin of do(); afn is a coroutine function."""
+        while True:
+            future, leader = self.begin(key)
+            if leader:
+                break
+            try:
+                return await asyncio.wrap_future(future), True
+            except LeaderCancelled:
+                continue
+
+        try:
+            result = await afn()
+        except asyncio.CancelledError:
+            self.finish(key, future, exception=LeaderCancelled())
+            raise
+        except BaseException as e:
+            self.finish(key, future, exception=e)
+            raise
+        self.finish(key, future, result)
+        return result, False
+
+    def __len__(self):
+        with self._lock:
+            return len(self._inflight)
@@ -0,0 +1,68 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pdf_generator import RestaurantPDFGenerator
+
+
+def restaurant_fingerprint(restaurant):
+    """Stable content hash of a restaurant dict."""
+    payload = json.dumps(restaurant, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_pdf(restaurant):
+    return RestaurantPDFGenerator().generate_pdf(restaurant).getvalue()
+
+
+def render_json(restaurant):
+    return json.dumps(restaurant, indent=2).encode("utf-8")
+
+
+RENDERERS = {
+    'pdf': render_pdf,
+    'json': render_json
+}
+
+
+class ExportCache:
+    """Bounded, cross-session cache of rendered exports keyed by content hash.
+
+    Exports are rendered lazily on a background thread the first time they
+    are requested; identical restaurants share the same rendered bytes.
+    """
+
+    def __init__(self, max_entries=64, workers=2):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export")
+
+    def request(self, restaurant, kind, fingerprint=None):
+        """Return a future for the rendered export, starting the render if needed."""
+        key = (fingerprint or restaurant_fingerprint(restaurant), kind)
+
+        with self._lock:
+            future = self._entries.get(key)
+            # Failed renders are retried rather than served from the cache
+            if future is not None and not (future.done() and future.exception() is not None):
+                self._entries.move_to_end(key)
+                return future
+
+            future = self._executor.submit(RENDERERS[kind], restaurant)
+            self._entries[key] = future
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return future
+
+    def get(self, restaurant, kind, fingerprint=None):
+        """Return the rendered bytes if they are already available, else None."""
+        key = (fingerprint or restaurant_fingerprint(restaurant), kind)
+
+        with self._lock:
+            future = self._entries.get(key)
+            if future is None or not future.done() or future.exception() is not None:
+                return None
+            self._entries.move_to_end(key)
+            return future.result()
@@ -0,0 +1,176 @@
+"""Deterministic stand-in for ChatGroq used by benchmarks and local testing.
+
+FakeChatModel answers the prompts built in chains.py with canned JSON of
+the right shape, after a configurable latency plus jitter, without any
+network access or API key. Replies depend only on the seed, the prompt
+and how many times this model has seen that prompt, so two models with
+the same seed answer the same sequence of calls identically.
+"""
+import re
+import json
+import time
+import random
+import asyncio
+import threading
+from collections import Counter
+from pydantic import PrivateAttr
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+MENU_SECTION_COUNTS = {
+    'appetizers': 3,
+    'mains': 4,
+    'desserts': 2,
+    'beverages': 2
+}
+
+DISH_WORDS = ["Ember", "Saffron", "Smoked", "Citrus", "Garden", "Hearth", "Golden", "Wild", "Charred", "Velvet"]
+DISH_NOUNS = ["Dumplings", "Skewers", "Risotto", "Tart", "Curry", "Noodles", "Flatbread", "Stew", "Sorbet", "Cooler"]
+DIETARY_TAGS = [[], [], ["vegetarian"], ["vegan"], ["gluten-free"], ["vegan", "gluten-free"]]
+
+
+def _estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def _field(prompt, label, default):
+    match = re.search(rf"{label}:\s*(.+)", prompt)
+    return match.group(1).strip() if match else default
+
+
+def _menu_item(rng, cuisine, price_min, price_max):
+    return {
+        'name': f"{rng.choice(DISH_WORDS)} {cuisine} {rng.choice(DISH_NOUNS)}",
+        'description': f"House-made {cuisine.lower()} favourite finished with seasonal herbs and a bright glaze",
+        'price': f"${rng.randint(price_min, max(price_min, price_max))}",
+        'dietary': list(rng.choice(DIETARY_TAGS))
+    }
+
+
+def _price_band(prompt, label, default):
+    match = re.search(rf"{label}\s*\$(\d+)-\$(\d+)", prompt)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    return default
+
+
+def _concept(rng, cuisine):
+    name = f"The {rng.choice(DISH_WORDS)} {rng.choice(['Table', 'Lantern', 'Courtyard', 'Kitchen', 'Spoon'])}"
+    return {
+        'name': name,
+        'tagline': f"{cuisine} cooking with a story on every plate",
+        'concept': f"{name} brings {cuisine} home cooking into a relaxed modern room. "
+                   f"Dishes are built around market produce and shared plates.",
+        'unique_selling_points': [
+            "Open kitchen with a chef's counter",
+            "Seasonal menu that changes every month",
+            "Regional drinks pairings for every dish"
+        ],
+        'ambiance': "Warm timber, soft pendant lighting and an easy-going soundtrack",
+        'target_audience': "Neighbourhood regulars, small groups and curious food lovers",
+        'signature_dish': f"{rng.choice(DISH_WORDS)} {cuisine} {rng.choice(DISH_NOUNS)} for the table"
+    }
+
+
+def canned_response(prompt, rng):
+    """Build a JSON reply shaped like the one the prompt asks for."""
+    cuisine = _field(prompt, "Cuisine", "Fusion").split()[0]
+
+    # The menu sections named in the prompt tell us which reply shape is wanted
+    sections = [section for section in MENU_SECTION_COUNTS if f'"{section}"' in prompt]
+
+    if len(sections) == 1:
+        section = sections[0]
+        count_match = re.search(r"exactly (\d+) items", prompt, re.IGNORECASE)
+        count = int(count_match.group(1)) if count_match else MENU_SECTION_COUNTS[section]
+        price_min, price_max = _price_band(prompt, "Price Guideline:", (8, 16))
+        return json.dumps({section: [_menu_item(rng, cuisine, price_min, price_max) for _ in range(count)]})
+
+    if sections:
+        bands = {
+            'appetizers': _price_band(prompt, "Appetizers", (8, 16)),
+            'mains': _price_band(prompt, "Mains", (24, 40)),
+            'desserts': _price_band(prompt, "Desserts", (8, 16)),
+            'beverages': (4, 10)
+        }
+        return json.dumps({
+            section: [_menu_item(rng, cuisine, *bands[section]) for _ in range(count)]
+            for section, count in MENU_SECTION_COUNTS.items()
+        })
+
+    # Legacy name + menu items reply
+    if '"menu_items"' in prompt:
+        count_match = re.search(r"exactly (\d+) main course names", prompt, re.IGNORECASE)
+        concept = _concept(rng, cuisine)
+        return json.dumps({
+            'name': concept['name'],
+            'tagline': concept['tagline'],
+            'menu_items': [_menu_item(rng, cuisine, 20, 30)['name']
+                           for _ in range(int(count_match.group(1)) if count_match else 7)]
+        })
+
+    # Several concepts in one reply
+    if '"concepts"' in prompt:
+        count_match = re.search(r"exactly (\d+) concepts", prompt, re.IGNORECASE)
+        count = int(count_match.group(1)) if count_match else 3
+        return json.dumps({'concepts': [_concept(rng, cuisine) for _ in range(count)]})
+
+    return json.dumps(_concept(rng, cuisine))
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model returning canned JSON after latency + uniform jitter (seconds)."""
+
+    model_name: str = "fake-llm"
+    temperature: float = 0.7
+    latency: float = 0.0
+    jitter: float = 0.0
+    seed: int = 0
+    chunk_size: int = 24
+
+    # Calls seen per prompt, so a repeated prompt gets a new but reproducible reply
+    _prompt_calls: Counter = PrivateAttr(default_factory=Counter)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self):
+        return "conceptkitchen-fake"
+
+    def _prompt_text(self, messages):
+        return "\n".join(str(message.content) for message in messages)
+
+    def _reply(self, messages):
+        """Return (reply text, delay, usage) for a call."""
+        prompt = self._prompt_text(messages)
+        with self._lock:
+            call = self._prompt_calls[prompt]
+            self._prompt_calls[prompt] += 1
+        rng = random.Random(f"{self.seed}:{prompt}:{call}")
+        text = canned_response(prompt, rng)
+        delay = max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+        usage = {
+            'input_tokens': _estimate_tokens(prompt),
+            'output_tokens': _estimate_tokens(text),
+            'total_tokens': _estimate_tokens(prompt) + _estimate_tokens(text)
+        }
+        return text, delay, usage
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        text, delay, usage = self._reply(messages)
+        time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        text, delay, usage = self._reply(messages)
+        await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        text, delay, usage = self._reply(messages)
+        pieces = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        for index, piece in enumerate(pieces):
+            time.sleep(delay / len(pieces))
+            # Usage rides on the final chunk, as with the real provider
+            chunk_usage = usage if index == len(pieces) - 1 else None
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece, usage_metadata=chunk_usage))
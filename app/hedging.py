@@ -0,0 +1,205 @@
+import os
+import time
+import random
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import groq
+import httpx
+from metrics import get_metrics
+
+# Errors worth another attempt: rate limits, timeouts, dropped connections and 5xx responses
+TRANSIENT_ERRORS = (
+    groq.RateLimitError,
+    groq.APITimeoutError,
+    groq.APIConnectionError,
+    groq.InternalServerError,
+    httpx.TimeoutException,
+    httpx.NetworkError
+)
+TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Threads running hedged synchronous attempts; losers finish here in the background
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("CONCEPTKITCHEN_HEDGE_THREADS", "32")),
+                               thread_name_prefix="hedge")
+
+
+def is_transient(error):
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    return getattr(error, 'status_code', None) in TRANSIENT_STATUS_CODES
+
+
+class LatencyWindow:
+    """Rolling window of recent call latencies per stage."""
+
+    def __init__(self, size=200):
+        self.size = size
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def add(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.size)
+            samples.append(seconds)
+
+    def percentile(self, stage, pct, min_samples=1):
+        """Nearest-rank percentile of the window, or None with fewer than min_samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(stage, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        rank = min(len(samples) - 1, int(round(pct / 100 * len(samples) + 0.5)) - 1)
+        return samples[max(0, rank)]
+
+
+class Hedger:
+    """Retries transient failures with jittered exponential backoff and hedges slow calls.
+
+    Once a stage has ``min_samples`` latencies in the window, an attempt
+    still running after the window's ``percentile`` gets one duplicate,
+    and whichever finishes first wins. A percentile of 0 turns hedging
+    off. Retries use "full jitter": a random sleep of up to
+    ``backoff_base * 2 ** attempt`` seconds, capped at ``backoff_max``.
+
+    ``reserve`` runs before every attempt, outside the timed region, so
+    waiting for rate-limit budget never looks like model latency;
+    ``may_hedge`` says whether a duplicate may be sent right now.
+    """
+
+    def __init__(self, percentile=None, min_samples=None, max_retries=None,
+                 backoff_base=None, backoff_max=30.0, window=None, metrics=None):
+        self.percentile = percentile if percentile is not None else \
+            float(os.getenv("CONCEPTKITCHEN_HEDGE_PERCENTILE", "95"))
+        self.min_samples = min_samples if min_samples is not None else \
+            int(os.getenv("CONCEPTKITCHEN_HEDGE_MIN_SAMPLES", "20"))
+        self.max_retries = max_retries if max_retries is not None else \
+            int(os.getenv("CONCEPTKITCHEN_MAX_RETRIES", "3"))
+        self.backoff_base = backoff_base if backoff_base is not None else \
+            float(os.getenv("CONCEPTKITCHEN_RETRY_BACKOFF", "0.5"))
+        self.backoff_max = backoff_max
+        self.window = window or LatencyWindow()
+        self.metrics = metrics or get_metrics()
+
+    def hedge_delay(self, stage):
+        """Seconds to wait before hedging a stage's call, or None when not hedging."""
+        if not self.percentile:
+            return None
+        return self.window.percentile(stage, self.percentile, self.min_samples)
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def should_retry(self, error, attempt, stage):
+        """Whether to retry after a failed attempt; counts the retry when it happens."""
+        if attempt >= self.max_retries or not is_transient(error):
+            return False
+        self.metrics.inc('llm_retries_total', stage=stage, error=type(error).__name__)
+        return True
+
+    def _timed(self, fn, stage):
+        start = time.perf_counter()
+        result = fn()
+        self.window.add(stage, time.perf_counter() - start)
+        return result
+
+    def _skip_hedge(self, may_hedge, stage):
+        if may_hedge is None or may_hedge():
+            return False
+        # No spare budget: a duplicate would only add load while calls are already queueing
+        self.metrics.inc('llm_hedges_total', stage=stage, outcome="skipped")
+        return True
+
+    def _attempt(self, fn, stage, may_hedge=None):
+        delay = self.hedge_delay(stage)
+        if delay is None:
+            return self._timed(fn, stage)
+
+        # Each attempt carries the caller's context (metrics trace, scheduling priority)
+        primary = _executor.submit(contextvars.copy_context().run, self._timed, fn, stage)
+        done, _ = wait([primary], timeout=delay)
+        if done or self._skip_hedge(may_hedge, stage):
+            return primary.result()
+
+        hedge = _executor.submit(contextvars.copy_context().run, self._timed, fn, stage)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self.metrics.inc('llm_hedges_total', stage=stage,
+                                     outcome="won" if future is hedge else "lost")
+                    return future.result()
+                error = future.exception()
+        self.metrics.inc('llm_hedges_total', stage=stage, outcome="failed")
+        raise error
+
+    def call(self, fn, stage, reserve=None, may_hedge=None):
+        """Run fn() with hedging and retries."""
+        attempt = 0
+        while True:
+            if reserve is not None:
+                reserve()
+            try:
+                return self._attempt(fn, stage, may_hedge)
+            except Exception as e:
+                if not self.should_retry(e, attempt, stage):
+                    raise
+            time.sleep(self.backoff(attempt))
+            attempt += 1
+
+    async def _atimed(self, afn, stage):
+        start = time.perf_counter()
+        result = await afn()
+        self.window.add(stage, time.perf_counter() - start)
+        return result
+
+    async def _aattempt(self, afn, stage, may_hedge=None):
+        delay = self.hedge_delay(stage)
+        if delay is None:
+            return await self._atimed(afn, stage)
+
+        primary = asyncio.ensure_future(self._atimed(afn, stage))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+        if self._skip_hedge(may_hedge, stage):
+            return await primary
+
+        hedge = asyncio.ensure_future(self._atimed(afn, stage))
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.metrics.inc('llm_hedges_total', stage=stage,
+                                         outcome="won" if task is hedge else "lost")
+                        return task.result()
+                    error = task.exception()
+        finally:
+            # Unlike threads, the losing coroutine can be cancelled
+            for task in pending:
+                task.cancel()
+        self.metrics.inc('llm_hedges_total', stage=stage, outcome="failed")
+        raise error
+
+    async def acall(self, afn, stage, reserve=None, may_hedge=None):
+        """Async version of call; afn and reserve are coroutine functions."""
+        attempt = 0
+        while True:
+            if reserve is not None:
+                await reserve()
+            try:
+                return await self._aattempt(afn, stage, may_hedge)
+            except Exception as e:
+                if not self.should_retry(e, attempt, stage):
+                    raise
+            await asyncio.sleep(self.backoff(attempt))
+            attempt += 1
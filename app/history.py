@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+
+# Columns of the light index rows returned by list(), in order
+INDEX_COLUMNS = ('id', 'created_at', 'name', 'cuisine', 'style', 'price_range')
+
+# Fields list() and count() can filter on
+FILTER_COLUMNS = ('cuisine', 'style', 'price_range')
+
+
+class HistoryStore:
+    """Persistent history of generated restaurants in SQLite.
+
+    Each restaurant is stored once as zlib-compressed JSON next to small
+    indexed columns, so listing and paging only read the light columns and
+    a full document is decompressed only when it is opened. Entries belong
+    to an owner (one browser's history). Retention is unbounded unless
+    ``max_entries`` per owner or ``max_age`` seconds are set, in which case
+    older entries are pruned as new ones are added.
+    """
+
+    def __init__(self, path=":memory:", max_entries=None, max_age=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            # Readers do not block the writer, and deleted pages are returned to the OS
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                owner TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                name TEXT NOT NULL,
+                cuisine TEXT,
+                style TEXT,
+                price_range TEXT,
+                document BLOB NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_history_owner_created ON history (owner, created_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_history_created ON history (created_at)")
+        for column in ('name',) + FILTER_COLUMNS:
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS idx_history_{column} ON history (owner, {column})")
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        """Build the default store from environment variables."""
+        max_entries = os.getenv("CONCEPTKITCHEN_HISTORY_MAX_ENTRIES", "")
+        max_age_days = os.getenv("CONCEPTKITCHEN_HISTORY_MAX_AGE_DAYS", "")
+        return cls(
+            path=os.getenv("CONCEPTKITCHEN_HISTORY_PATH", ".conceptkitchen_history.db"),
+            max_entries=int(max_entries) if max_entries else None,
+            max_age=float(max_age_days) * 86400 if max_age_days else None
+        )
+
+    @staticmethod
+    def _where(owner, filters):
+        unknown = set(filters) - set(FILTER_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot filter history on {', '.join(sorted(unknown))}")
+        clauses = ["owner = ?"]
+        params = [owner]
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return " AND ".join(clauses), params
+
+    def add(self, restaurant, owner, created_at=None):
+        """Store a finished restaurant; returns its id."""
+        metadata = restaurant.get('metadata') or {}
+        document = zlib.compress(json.dumps(restaurant, separators=(",", ":")).encode("utf-8"))
+
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO history (owner, created_at, name, cuisine, style, price_range, document) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (owner, created_at or time.time(), restaurant['concept']['name'], metadata.get('cuisine'),
+                 metadata.get('style'), metadata.get('price_range'), document)
+            )
+            self._prune(owner)
+            self._db.commit()
+            return cursor.lastrowid
+
+    def list(self, owner, limit=20, offset=0, **filters):
+        """Index rows (no documents), newest first, optionally filtered by cuisine, style or price_range."""
+        where, params = self._where(owner, filters)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(INDEX_COLUMNS)} FROM history WHERE {where} "
+                "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(zip(INDEX_COLUMNS, row)) for row in rows]
+
+    def count(self, owner, **filters):
+        where, params = self._where(owner, filters)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM history WHERE {where}", params).fetchone()[0]
+
+    def get(self, entry_id, owner=None):
+        """Load one full restaurant, or None; with owner set, only from that owner's history."""
+        query = "SELECT document FROM history WHERE id = ?"
+        params = [entry_id]
+        if owner is not None:
+            query += " AND owner = ?"
+            params.append(owner)
+        with self._lock:
+            row = self._db.execute(query, params).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def documents(self, after_id=0):
+        """(id, restaurant) pairs of every owner's entries after after_id, in id order."""
+        with self._lock:
+            rows = self._db.execute("SELECT id, document FROM history WHERE id > ? ORDER BY id",
+                                    (after_id,)).fetchall()
+        return [(entry_id, json.loads(zlib.decompress(document).decode("utf-8"))) for entry_id, document in rows]
+
+    def ids(self):
+        """Ids of every owner's entries."""
+        with self._lock:
+            return {row[0] for row in self._db.execute("SELECT id FROM history")}
+
+    def clear(self, owner):
+        """Delete one owner's history; returns the number of entries removed."""
+        with self._lock:
+            removed = self._db.execute("DELETE FROM history WHERE owner = ?", (owner,)).rowcount
+            self._reclaim()
+            self._db.commit()
+            return removed
+
+    def _prune(self, owner):
+        # Called under the lock, inside the add() transaction
+        if self.max_age is not None:
+            self._db.execute("DELETE FROM history WHERE created_at < ?", (time.time() - self.max_age,))
+        if self.max_entries is not None:
+            self._db.execute(
+                "DELETE FROM history WHERE owner = ? AND id NOT IN "
+                "(SELECT id FROM history WHERE owner = ? ORDER BY created_at DESC, id DESC LIMIT ?)",
+                (owner, owner, self.max_entries)
+            )
+
+    def _reclaim(self):
+        if self.path != ":memory:":
+            self._db.execute("PRAGMA incremental_vacuum")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
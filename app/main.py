@@ -1,8 +1,15 @@
 import streamlit as st
-from chains import RestaurantConceptGenerator
-from pdf_generator import RestaurantPDFGenerator
-import json
+from chains import get_shared_generator
+from exports import ExportCache, restaurant_fingerprint
+from history import HistoryStore
+from models import as_dict
+from metrics import get_metrics
+from pool import pool_from_env
+from ratelimit import QueueTimeout, scheduling
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import os
+import time
+import uuid
 from datetime import datetime
 
 # Page configuration
@@ -15,8 +22,14 @@ st.set_page_config(
 # Initialize session state
 if 'current_restaurant' not in st.session_state:
     st.session_state.current_restaurant = None
-if 'restaurant_history' not in st.session_state:
-    st.session_state.restaurant_history = []
+if 'history_owner' not in st.session_state:
+    # Kept in the URL so a browser finds its history again after a reload or a server restart
+    st.session_state.history_owner = st.query_params.get("history") or uuid.uuid4().hex
+    st.query_params["history"] = st.session_state.history_owner
+if 'history_page' not in st.session_state:
+    st.session_state.history_page = 0
+if 'pending_restaurant' not in st.session_state:
+    st.session_state.pending_restaurant = None
 
 # Demo restaurant data for users without API key
 DEMO_RESTAURANT = {
@@ -73,10 +86,116 @@ DEMO_RESTAURANT = {
 }
 
 
+# Menu sections as shown in the app
+MENU_TABS = [
+    ('appetizers', "Appetizers"),
+    ('mains', "Main Courses"),
+    ('desserts', "Desserts"),
+    ('beverages', "Beverages")
+]
+
+# Minimum time between redraws while a concept streams in
+STREAM_REFRESH_SECONDS = 0.1
+
+# Optional page-load budget: show what is ready after this many seconds and fill in the rest later
+TIME_BUDGET = float(os.getenv("CONCEPTKITCHEN_TIME_BUDGET", "0")) or None
+
+# Past concepts listed per sidebar page
+HISTORY_PAGE_SIZE = 5
+
+# How long each rerun waits on a restaurant that is still finishing in the background
+PENDING_POLL_SECONDS = 1.0
+
+
 # Initialize generator
 @st.cache_resource
 def get_generator():
-    return RestaurantConceptGenerator()
+    return get_shared_generator()
+
+
+@st.cache_resource
+def get_concept_pool():
+    # None unless CONCEPTKITCHEN_POOL_SIZE is set
+    return pool_from_env(get_generator())
+
+
+@st.cache_resource
+def get_history():
+    return HistoryStore.from_env()
+
+
+@st.cache_resource
+def get_export_cache():
+    return ExportCache(max_entries=int(os.getenv("CONCEPTKITCHEN_EXPORT_CACHE_ENTRIES", "64")))
+
+
+def current_fingerprint(restaurant):
+    """Content hash of the displayed restaurant, computed once per restaurant per session."""
+    cached = st.session_state.get('export_fingerprint')
+    if cached is not None and cached[0] is restaurant:
+        return cached[1]
+
+    fingerprint = restaurant_fingerprint(restaurant)
+    st.session_state.export_fingerprint = (restaurant, fingerprint)
+    return fingerprint
+
+
+def export_button(restaurant, fingerprint, kind, label, file_name, mime):
+    """Offer a download once the export is rendered, rendering it only when asked for."""
+    export_cache = get_export_cache()
+    data = export_cache.get(restaurant, kind, fingerprint)
+
+    if data is None and st.button(f"⚙️ Prepare {label}", key=f"prepare_{kind}"):
+        with st.spinner(f"Rendering {label}..."):
+            data = export_cache.request(restaurant, kind, fingerprint).result()
+
+    if data is not None:
+        icon = "📑" if kind == 'pdf' else "📄"
+        st.download_button(
+            label=f"{icon} Download as {label}",
+            data=data,
+            file_name=file_name,
+            mime=mime
+        )
+
+
+def remember_restaurant(result):
+    """Add a finished restaurant to this browser's persistent history."""
+    get_history().add(as_dict(result), st.session_state.history_owner)
+    st.session_state.history_page = 0
+
+
+def render_menu_items(items, show_dietary=True):
+    """Render a list of menu items; tolerates items that are still streaming in."""
+    for item in items:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.markdown(f"**{item.get('name', '')}** - {item.get('price', '')}")
+            if item.get('description'):
+                st.caption(item['description'])
+            if show_dietary and item.get('dietary'):
+                st.caption(f"🌱 {', '.join(item['dietary'])}")
+
+
+def render_preview(restaurant):
+    """Render whatever parts of a streaming restaurant have arrived so far."""
+    concept = restaurant['concept']
+    menu = restaurant['menu']
+
+    if concept.get('name'):
+        st.header(f"✨ {concept['name']}")
+    if concept.get('tagline'):
+        st.caption(f"*{concept['tagline']}*")
+    if concept.get('concept'):
+        st.markdown("### 📖 Concept")
+        st.write(concept['concept'])
+
+    if menu:
+        st.markdown("### 🍽️ Menu")
+        for section_key, section_title in MENU_TABS:
+            if menu.get(section_key):
+                st.markdown(f"**{section_title}**")
+                render_menu_items(menu[section_key], show_dietary=(section_key != 'beverages'))
 
 
 # Custom CSS
@@ -145,6 +264,12 @@ with st.sidebar:
         help="$ = Budget, $$ = Moderate, $$$ = Upscale, $$$$ = Luxury"
     )
 
+    force_fresh = st.checkbox(
+        "🔁 Always generate fresh",
+        value=False,
+        help="Skip cached concepts and ask the model for a brand new one"
+    )
+
     # Generate button (disabled in demo mode without API key)
     generate_btn = st.button(
         "✨ Generate Concept",
@@ -156,56 +281,122 @@ with st.sidebar:
     if not api_key_available and generate_btn:
         st.error("API key required for generation. Use demo mode instead.")
 
-    # History section
-    if st.session_state.restaurant_history:
+    # History section: one page of light index rows; a full restaurant is loaded only when opened
+    history = get_history()
+    history_owner = st.session_state.history_owner
+    history_total = history.count(history_owner)
+    if history_total:
         st.markdown("---")
         st.markdown("### 📚 Recent Concepts")
 
-        # Show last 5 restaurants
-        for item in reversed(st.session_state.restaurant_history[-5:]):
-            timestamp_str = item['timestamp'].strftime("%I:%M %p")
+        pages = (history_total + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+        page = min(st.session_state.history_page, pages - 1)
+        for item in history.list(history_owner, limit=HISTORY_PAGE_SIZE, offset=page * HISTORY_PAGE_SIZE):
+            timestamp_str = datetime.fromtimestamp(item['created_at']).strftime("%b %d, %I:%M %p")
             button_label = f"🍽️ {item['name'][:20]}... - {timestamp_str}"
 
-            if st.button(button_label, key=f"history_{item['timestamp']}"):
-                st.session_state.current_restaurant = item['data']
+            if st.button(button_label, key=f"history_{item['id']}"):
+                st.session_state.pending_restaurant = None
+                st.session_state.current_restaurant = history.get(item['id'], owner=history_owner)
+                st.rerun()
+
+        if pages > 1:
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            if prev_col.button("◀", key="history_prev", disabled=page == 0):
+                st.session_state.history_page = page - 1
+                st.rerun()
+            page_col.caption(f"Page {page + 1} of {pages}")
+            if next_col.button("▶", key="history_next", disabled=page >= pages - 1):
+                st.session_state.history_page = page + 1
                 st.rerun()
 
         # Clear history button
         st.markdown("---")
         if st.button("🗑️ Clear History", use_container_width=True):
-            st.session_state.restaurant_history = []
+            history.clear(history_owner)
+            st.session_state.history_page = 0
+            st.session_state.pending_restaurant = None
             st.session_state.current_restaurant = None
             st.rerun()
 
+# "Next idea" regenerates the current brief; in multi-candidate mode its concept is a stored spare
+next_idea = st.session_state.pop('next_idea', None)
+if next_idea:
+    cuisine, style, price_range = next_idea['cuisine'], next_idea['style'], next_idea['price_range']
+
 # Main content - Generation
-if generate_btn and api_key_available:
+if (generate_btn or next_idea) and api_key_available:
     generator = get_generator()
 
+    concept_pool = get_concept_pool()
+
     with st.spinner("🎨 Crafting your unique restaurant concept..."):
         try:
-            result = generator.generate_full_restaurant(cuisine, style, price_range)
-            st.session_state.current_restaurant = result
-
-            # Add to history
-            st.session_state.restaurant_history.append({
-                'timestamp': datetime.now(),
-                'name': result['concept']['name'],
-                'cuisine': cuisine,
-                'data': result
-            })
-
-            # Keep only last 10 restaurants
-            if len(st.session_state.restaurant_history) > 10:
-                st.session_state.restaurant_history.pop(0)
+            # A pre-warmed concept is served straight away; take() also records demand for refills
+            result = None
+            if concept_pool is not None and not force_fresh:
+                result = concept_pool.take(cuisine, style, price_range)
+
+            # Interactive calls jump ahead of batch work and queue fairly against other sessions
+            session_ctx = get_script_run_ctx()
+            session_id = session_ctx.session_id if session_ctx is not None else None
+
+            if result is None and TIME_BUDGET:
+                # Show whatever is ready within the budget; the rest finishes in the background
+                with scheduling("interactive", session_id):
+                    pending = generator.generate_within(TIME_BUDGET, cuisine, style, price_range,
+                                                        force_fresh=force_fresh)
+                if pending.complete:
+                    result = pending.result()
+                else:
+                    st.session_state.pending_restaurant = pending
+
+            elif result is None:
+                # Stream the concept and menu in so the page fills up as tokens arrive
+                preview = st.empty()
+                last_draw = 0
+                with scheduling("interactive", session_id), get_metrics().request("ui_generate"):
+                    for result in generator.stream_full_restaurant(cuisine, style, price_range,
+                                                                   force_fresh=force_fresh):
+                        now = time.monotonic()
+                        if now - last_draw >= STREAM_REFRESH_SECONDS:
+                            with preview.container():
+                                render_preview(result)
+                            last_draw = now
+                preview.empty()
+
+            if result is not None:
+                st.session_state.pending_restaurant = None
+                st.session_state.current_restaurant = result
+                remember_restaurant(result)
+
+        except QueueTimeout:
+            st.warning("⏳ ConceptKitchen is very busy right now. Please try again in a minute.")
+            st.stop()
 
         except Exception as e:
             st.error(f"Error generating concept: {str(e)}")
             st.info("Please check your API key and try again.")
             st.stop()
 
+# Pick up a restaurant that missed the time budget once more of it is ready
+pending = st.session_state.pending_restaurant
+if pending is not None and pending.complete:
+    st.session_state.pending_restaurant = None
+    if pending.error is not None:
+        st.error(f"Error generating concept: {str(pending.error)}")
+        st.session_state.current_restaurant = None
+    else:
+        st.session_state.current_restaurant = pending.result()
+        remember_restaurant(st.session_state.current_restaurant)
+    pending = None
+elif pending is not None:
+    snapshot = pending.snapshot()
+    st.session_state.current_restaurant = snapshot if snapshot['concept'] else None
+
 # Display the restaurant
 if st.session_state.current_restaurant:
-    restaurant = st.session_state.current_restaurant
+    restaurant = as_dict(st.session_state.current_restaurant)
     concept = restaurant['concept']
     menu = restaurant['menu']
 
@@ -245,72 +436,45 @@ if st.session_state.current_restaurant:
     # Menu Section
     st.markdown("### 🍽️ Menu")
 
-    tab1, tab2, tab3, tab4 = st.tabs(["Appetizers", "Main Courses", "Desserts", "Beverages"])
-
-    with tab1:
-        for item in menu.get('appetizers', []):
-            col1, col2 = st.columns([4, 1])
-            with col1:
-                st.markdown(f"**{item['name']}** - {item['price']}")
-                st.caption(item['description'])
-                if item.get('dietary'):
-                    st.caption(f"🌱 {', '.join(item['dietary'])}")
-
-    with tab2:
-        for item in menu.get('mains', []):
-            col1, col2 = st.columns([4, 1])
-            with col1:
-                st.markdown(f"**{item['name']}** - {item['price']}")
-                st.caption(item['description'])
-                if item.get('dietary'):
-                    st.caption(f"🌱 {', '.join(item['dietary'])}")
-
-    with tab3:
-        for item in menu.get('desserts', []):
-            col1, col2 = st.columns([4, 1])
-            with col1:
-                st.markdown(f"**{item['name']}** - {item['price']}")
-                st.caption(item['description'])
-                if item.get('dietary'):
-                    st.caption(f"🌱 {', '.join(item['dietary'])}")
-
-    with tab4:
-        for item in menu.get('beverages', []):
-            col1, col2 = st.columns([4, 1])
-            with col1:
-                st.markdown(f"**{item['name']}** - {item['price']}")
-                st.caption(item['description'])
-
-    # Export Options
-    st.markdown("### 💾 Export Options")
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        # PDF Export
-        pdf_generator = RestaurantPDFGenerator()
-        pdf_buffer = pdf_generator.generate_pdf(restaurant)
-
-        st.download_button(
-            label="📑 Download as PDF",
-            data=pdf_buffer,
-            file_name=f"{concept['name'].replace(' ', '_')}_concept.pdf",
-            mime="application/pdf"
-        )
-
-    with col2:
-        # JSON Export
-        json_str = json.dumps(restaurant, indent=2)
-        st.download_button(
-            label="📄 Download as JSON",
-            data=json_str,
-            file_name=f"{concept['name'].replace(' ', '_')}_concept.json",
-            mime="application/json"
-        )
+    tabs = st.tabs([section_title for _, section_title in MENU_TABS])
+
+    for tab, (section_key, _) in zip(tabs, MENU_TABS):
+        with tab:
+            render_menu_items(menu.get(section_key, []), show_dietary=(section_key != 'beverages'))
+
+    if pending is not None:
+        # Exports wait until the restaurant is complete
+        waiting_for = pending.missing_sections()
+        st.info(f"⏳ Still preparing: {', '.join(waiting_for) if waiting_for else 'final touches'}...")
+
+    else:
+        # Export Options
+        st.markdown("### 💾 Export Options")
+        col1, col2, col3 = st.columns(3)
+
+        # Exports are rendered on demand and shared across sessions by content hash
+        fingerprint = current_fingerprint(restaurant)
+        file_stem = f"{concept['name'].replace(' ', '_')}_concept"
+
+        with col1:
+            # PDF Export
+            export_button(restaurant, fingerprint, 'pdf', "PDF", f"{file_stem}.pdf", "application/pdf")
+
+        with col2:
+            # JSON Export
+            export_button(restaurant, fingerprint, 'json', "JSON", f"{file_stem}.json", "application/json")
+
+        with col3:
+            if get_generator().candidate_count > 1 and api_key_available:
+                if st.button("💡 Next Idea"):
+                    st.session_state.next_idea = restaurant['metadata']
+                    st.rerun()
+            if st.button("🔄 Generate New Concept"):
+                st.session_state.current_restaurant = None
+                st.rerun()
 
-    with col3:
-        if st.button("🔄 Generate New Concept"):
-            st.session_state.current_restaurant = None
-            st.rerun()
+elif pending is not None:
+    st.info("⏳ Crafting your unique restaurant concept...")
 
 else:
     # Welcome screen
@@ -326,4 +490,30 @@ else:
     with col2:
         st.metric("Restaurant Styles", "7")
     with col3:
-        st.metric("Unique Concepts", "∞")
\ No newline at end of file
+        st.metric("Unique Concepts", "∞")
+
+# Debug panel with per-stage timings, tokens and the Prometheus view of all metrics
+if os.getenv("CONCEPTKITCHEN_DEBUG", "").lower() in ("1", "true", "yes"):
+    with st.sidebar:
+        st.markdown("---")
+        with st.expander("🔍 Debug Metrics"):
+            metrics = get_metrics()
+            if metrics.recent:
+                last_request = metrics.recent[-1]
+                st.caption(f"Last request: {last_request['request']} in {last_request['duration_s']:.2f}s")
+                st.dataframe([
+                    {
+                        'stage': record['stage'],
+                        'ms': round(record['duration_s'] * 1000, 1),
+                        'input tokens': record.get('input_tokens'),
+                        'output tokens': record.get('output_tokens'),
+                        'error': record['error']
+                    }
+                    for record in last_request['stages']
+                ], use_container_width=True)
+            st.code(metrics.export('prometheus'), language="text")
+
+# Keep redrawing while a restaurant that missed the time budget finishes in the background
+if pending is not None:
+    pending.wait(PENDING_POLL_SECONDS)
+    st.rerun()
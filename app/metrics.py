@@ -0,0 +1,232 @@
+import json
+import time
+import bisect
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# USD per million (input, output) tokens, used for cost estimates
+TOKEN_PRICES_PER_MILLION = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08)
+}
+
+# Stage records of the request currently being served, if any
+_current_trace = contextvars.ContextVar("conceptkitchen_trace", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus style."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            running += count
+            cumulative.append([bound, running])
+        return {'buckets': cumulative, 'sum': self.sum, 'count': self.count}
+
+
+class Metrics:
+    """Thread-safe registry of per-stage latency histograms, token and cost counters.
+
+    Stages are timed with ``stage()``; wrapping a call in ``request()``
+    additionally collects its stage records into a per-request trace that
+    is kept in ``recent`` for debugging.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, token_prices=None, recent_requests=50):
+        self.buckets = buckets
+        self.token_prices = token_prices if token_prices is not None else TOKEN_PRICES_PER_MILLION
+        self.recent = deque(maxlen=recent_requests)
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, value, **labels):
+        """Add an observation to a histogram."""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        """Increase a counter."""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def record_tokens(self, stage, model, input_tokens, output_tokens):
+        """Count tokens used by a stage and the estimated cost."""
+        self.inc('tokens_total', input_tokens, stage=stage, direction="input")
+        self.inc('tokens_total', output_tokens, stage=stage, direction="output")
+
+        prices = self.token_prices.get(model)
+        if prices:
+            cost = (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+            self.inc('cost_usd_total', cost, model=model)
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage; yields a record the caller can annotate with tokens and model."""
+        record = {'stage': name, 'error': None}
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = type(e).__name__
+            self.inc('stage_errors_total', stage=name, error=record['error'])
+            raise
+        finally:
+            record['duration_s'] = time.perf_counter() - start
+            self.observe('stage_duration_seconds', record['duration_s'], stage=name)
+            if record.get('input_tokens') is not None:
+                self.record_tokens(name, record.get('model'), record['input_tokens'], record.get('output_tokens') or 0)
+
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.append(record)
+
+    @contextmanager
+    def request(self, name):
+        """Time a whole request and collect the stage records made while it runs."""
+        trace = []
+        token = _current_trace.set(trace)
+        entry = {'request': name, 'started_at': time.time(), 'stages': trace, 'error': None}
+        start = time.perf_counter()
+        try:
+            yield trace
+        except Exception as e:
+            entry['error'] = type(e).__name__
+            self.inc('request_errors_total', request=name, error=entry['error'])
+            raise
+        finally:
+            _current_trace.reset(token)
+            entry['duration_s'] = time.perf_counter() - start
+            self.observe('request_duration_seconds', entry['duration_s'], request=name)
+            with self._lock:
+                self.recent.append(entry)
+
+    def snapshot(self):
+        """Plain-data view of every histogram and counter."""
+        with self._lock:
+            histograms = [
+                dict(name=name, labels=dict(labels), **histogram.snapshot())
+                for (name, labels), histogram in self._histograms.items()
+            ]
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in self._counters.items()
+            ]
+        return {'histograms': histograms, 'counters': counters}
+
+    def export(self, exporter):
+        """Render the current snapshot with an exporter (see EXPORTERS)."""
+        if isinstance(exporter, str):
+            exporter = EXPORTERS[exporter]
+        return exporter.export(self.snapshot())
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.recent.clear()
+
+
+class JsonExporter:
+    content_type = "application/json"
+
+    def export(self, snapshot):
+        return json.dumps(snapshot, indent=2, default=str)
+
+
+class PrometheusExporter:
+    """Prometheus text exposition format."""
+
+    content_type = "text/plain; version=0.0.4"
+
+    def __init__(self, prefix="conceptkitchen_"):
+        self.prefix = prefix
+
+    @staticmethod
+    def _labels(labels, extra=None):
+        items = list(labels.items()) + (extra or [])
+        if not items:
+            return ""
+        rendered = ",".join(
+            '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+            for key, value in items
+        )
+        return "{" + rendered + "}"
+
+    def export(self, snapshot):
+        lines = []
+        typed = set()
+
+        # Each metric family has to be contiguous in the exposition
+        for counter in sorted(snapshot['counters'], key=lambda c: c['name']):
+            name = self.prefix + counter['name']
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{self._labels(counter['labels'])} {counter['value']}")
+
+        for histogram in sorted(snapshot['histograms'], key=lambda h: h['name']):
+            name = self.prefix + histogram['name']
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            for bound, count in histogram['buckets']:
+                le = bound if bound == "+Inf" else repr(float(bound))
+                lines.append(f"{name}_bucket{self._labels(histogram['labels'], [('le', le)])} {count}")
+            lines.append(f"{name}_sum{self._labels(histogram['labels'])} {histogram['sum']}")
+            lines.append(f"{name}_count{self._labels(histogram['labels'])} {histogram['count']}")
+
+        return "\n".join(lines) + "\n"
+
+
+EXPORTERS = {
+    'json': JsonExporter(),
+    'prometheus': PrometheusExporter()
+}
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Return the process-wide metrics registry."""
+    return _metrics
+
+
+def token_usage(message):
+    """Extract (input_tokens, output_tokens) from an LLM message, or (None, None)."""
+    usage = getattr(message, 'usage_metadata', None)
+    if usage:
+        return usage.get('input_tokens'), usage.get('output_tokens')
+
+    token_usage = (getattr(message, 'response_metadata', None) or {}).get('token_usage') or {}
+    if token_usage:
+        return token_usage.get('prompt_tokens'), token_usage.get('completion_tokens')
+    return None, None
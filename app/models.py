@@ -0,0 +1,319 @@
+"""Compact typed models for restaurants, as an alternative to the nested dicts.
+
+Prices are integer cents, with any price text not in the "$18" or
+"$18.50" form kept as given, and dietary tags are interned strings in
+their original order, with the well-known ones also set as bitflags for
+quick filtering. to_dict() and from_dict() convert to and from the dict
+shape built in chains.py, which stays the interchange format; the models
+add compact JSON (nested lists) and a binary encoding. All of these
+round-trip without loss, except that numeric prices come back as "$N"
+strings.
+"""
+import re
+import sys
+import json
+import struct
+from array import array
+
+# Bit per well-known dietary tag
+DIETARY_FLAGS = {
+    'vegetarian': 1,
+    'vegan': 2,
+    'gluten-free': 4,
+    'dairy-free': 8,
+    'nut-free': 16,
+    'halal': 32,
+    'kosher': 64,
+    'spicy': 128
+}
+
+CONCEPT_FIELDS = ('name', 'tagline', 'concept', 'ambiance', 'target_audience', 'signature_dish')
+METADATA_FIELDS = ('cuisine', 'style', 'price_range')
+
+# Binary layout: magic and version, int count, little-endian int32s, then NUL-separated UTF-8 strings
+BINARY_MAGIC = b"CK\x02"
+_HEADER = struct.Struct("<3sI")
+_PRICE_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_BIG_ENDIAN = sys.byteorder == "big"
+_NO_PRICE = -1
+_PRICE_TEXT = -2
+
+# Bit of each tag spelling seen so far, as decoding the same few tags is the common case
+_TAG_BITS = {}
+_TAG_BITS_SIZE = 4096
+
+
+def parse_cents(price):
+    """Integer cents of a price such as "$18" or 18.5, or None."""
+    if isinstance(price, (int, float)) and not isinstance(price, bool):
+        return int(round(price * 100))
+    match = _PRICE_NUMBER.search(price) if isinstance(price, str) else None
+    return int(round(float(match.group()) * 100)) if match else None
+
+
+def format_cents(cents):
+    """"$18" for whole dollars, "$18.50" otherwise; None stays None."""
+    if cents is None:
+        return None
+    dollars, remainder = divmod(cents, 100)
+    return f"${dollars}" if not remainder else f"${dollars}.{remainder:02d}"
+
+
+def split_price(price):
+    """(cents, None) for a number or a "$18"/"$18.50" price, otherwise (None, the price text as given)."""
+    if isinstance(price, (int, float)) and not isinstance(price, bool):
+        return parse_cents(price), None
+    if not isinstance(price, str):
+        return None, None
+    cents = parse_cents(price)
+    if cents is not None and format_cents(cents) == price:
+        return cents, None
+    return None, price
+
+
+def _tag_bit(tag):
+    bit = _TAG_BITS.get(tag)
+    if bit is None:
+        bit = DIETARY_FLAGS.get(tag.strip().lower(), 0)
+        if len(_TAG_BITS) < _TAG_BITS_SIZE:
+            _TAG_BITS[tag] = bit
+    return bit
+
+
+def dietary_flags(tags):
+    """Bitflags of the well-known tags among tags."""
+    flags = 0
+    for tag in tags:
+        flags |= _tag_bit(tag)
+    return flags
+
+
+class MenuItem:
+    __slots__ = ('name', 'description', 'price_cents', 'price_text', 'tags', 'dietary')
+
+    def __init__(self, name, description="", price_cents=None, tags=(), price_text=None):
+        self.name = name
+        self.description = description
+        self.price_cents = price_cents
+        # Price text that is not a plain amount, such as "$XX" or "market price"
+        self.price_text = price_text
+        self.tags = tuple(map(sys.intern, map(str, tags))) if tags else ()
+        self.dietary = dietary_flags(self.tags) if tags else 0
+
+    @classmethod
+    def from_dict(cls, item):
+        cents, text = split_price(item.get('price'))
+        return cls(item.get('name', ""), item.get('description') or "", cents, item.get('dietary') or (), text)
+
+    @property
+    def price(self):
+        return format_cents(self.price_cents) if self.price_cents is not None else self.price_text
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'description': self.description,
+            'price': self.price,
+            'dietary': list(self.tags)
+        }
+
+    def has(self, tag):
+        bit = DIETARY_FLAGS.get(tag)
+        return bool(self.dietary & bit) if bit else tag in self.tags
+
+    def __eq__(self, other):
+        return isinstance(other, MenuItem) and all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self):
+        return f"MenuItem({self.name!r}, {self.price})"
+
+
+class Menu:
+    """Menu sections in order, each a tuple of MenuItems."""
+
+    __slots__ = ('sections',)
+
+    def __init__(self, sections=None):
+        self.sections = sections or {}
+
+    @classmethod
+    def from_dict(cls, menu):
+        return cls({section: tuple(MenuItem.from_dict(item) for item in items) for section, items in menu.items()})
+
+    def to_dict(self):
+        return {section: [item.to_dict() for item in items] for section, items in self.sections.items()}
+
+    def __eq__(self, other):
+        return isinstance(other, Menu) and self.sections == other.sections
+
+
+class Concept:
+    __slots__ = CONCEPT_FIELDS + ('unique_selling_points',)
+
+    def __init__(self, name, tagline="", concept="", ambiance="", target_audience="", signature_dish="",
+                 unique_selling_points=()):
+        self.name = name
+        self.tagline = tagline
+        self.concept = concept
+        self.ambiance = ambiance
+        self.target_audience = target_audience
+        self.signature_dish = signature_dish
+        self.unique_selling_points = tuple(unique_selling_points)
+
+    @classmethod
+    def from_dict(cls, concept):
+        return cls(*(concept.get(field) or "" for field in CONCEPT_FIELDS),
+                   unique_selling_points=concept.get('unique_selling_points') or ())
+
+    def to_dict(self):
+        concept = {field: getattr(self, field) for field in CONCEPT_FIELDS}
+        concept['unique_selling_points'] = list(self.unique_selling_points)
+        return concept
+
+    def __eq__(self, other):
+        return isinstance(other, Concept) and all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+
+class Restaurant:
+    __slots__ = ('concept', 'menu') + METADATA_FIELDS
+
+    def __init__(self, concept, menu=None, cuisine="", style="", price_range=""):
+        self.concept = concept
+        self.menu = menu or Menu()
+        self.cuisine = sys.intern(cuisine)
+        self.style = sys.intern(style)
+        self.price_range = sys.intern(price_range)
+
+    @classmethod
+    def from_dict(cls, restaurant):
+        metadata = restaurant.get('metadata') or {}
+        return cls(Concept.from_dict(restaurant['concept']), Menu.from_dict(restaurant.get('menu') or {}),
+                   *(metadata.get(field) or "" for field in METADATA_FIELDS))
+
+    def to_dict(self):
+        return {
+            'concept': self.concept.to_dict(),
+            'menu': self.menu.to_dict(),
+            'metadata': {field: getattr(self, field) for field in METADATA_FIELDS}
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, Restaurant) and all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self):
+        return f"Restaurant({self.concept.name!r}, {self.cuisine!r})"
+
+    # Compact JSON: positional lists instead of keyed objects
+
+    def to_list(self):
+        concept = self.concept
+        return [
+            [getattr(concept, field) for field in CONCEPT_FIELDS] + [list(concept.unique_selling_points)],
+            # A price is int cents, price text or null
+            [[section, [[item.name, item.description,
+                         item.price_text if item.price_cents is None else item.price_cents, list(item.tags)]
+                        for item in items]]
+             for section, items in self.menu.sections.items()],
+            [self.cuisine, self.style, self.price_range]
+        ]
+
+    @classmethod
+    def from_list(cls, value):
+        concept, menu, metadata = value
+        sections = {
+            section: tuple(MenuItem(name, description, price, tags) if not isinstance(price, str)
+                           else MenuItem(name, description, None, tags, price)
+                           for name, description, price, tags in items)
+            for section, items in menu
+        }
+        return cls(Concept(*concept[:-1], unique_selling_points=concept[-1]), Menu(sections), *metadata)
+
+    def to_json(self):
+        return json.dumps(self.to_list(), separators=(",", ":"), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_list(json.loads(text))
+
+    # Binary: one int array for counts and prices, and one string blob for all text. An item is
+    # (price, tag count) in the ints, where price -1 means none and -2 price text, and its name,
+    # description, price text if any, then one string per tag
+
+    def to_bytes(self):
+        concept = self.concept
+        strings = [getattr(concept, field) for field in CONCEPT_FIELDS]
+        strings.extend(concept.unique_selling_points)
+        strings.extend((self.cuisine, self.style, self.price_range))
+        ints = [len(concept.unique_selling_points), len(self.menu.sections)]
+        for section, items in self.menu.sections.items():
+            strings.append(section)
+            ints.append(len(items))
+            for item in items:
+                strings.extend((item.name, item.description))
+                if item.price_cents is not None:
+                    ints.append(item.price_cents)
+                elif item.price_text is not None:
+                    ints.append(_PRICE_TEXT)
+                    strings.append(item.price_text)
+                else:
+                    ints.append(_NO_PRICE)
+                ints.append(len(item.tags))
+                strings.extend(item.tags)
+
+        text = "\0".join(strings)
+        if text.count("\0") != len(strings) - 1:
+            raise ValueError("Restaurant text cannot contain NUL characters")
+        numbers = array("i", ints)
+        if _BIG_ENDIAN:
+            numbers.byteswap()
+        return _HEADER.pack(BINARY_MAGIC, len(ints)) + numbers.tobytes() + text.encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, count = _HEADER.unpack_from(data)
+        if magic != BINARY_MAGIC:
+            raise ValueError("Not an encoded restaurant")
+        start = _HEADER.size
+        end = start + count * 4
+        numbers = array("i")
+        numbers.frombytes(data[start:end])
+        if _BIG_ENDIAN:
+            numbers.byteswap()
+        strings = bytes(data[end:]).decode("utf-8").split("\0")
+
+        usp_count, section_count = numbers[0], numbers[1]
+        concept = Concept(*strings[:6], unique_selling_points=strings[6:6 + usp_count])
+        at = 6 + usp_count
+        cuisine, style, price_range = strings[at:at + 3]
+        at += 3
+
+        n = 2
+        sections = {}
+        for _ in range(section_count):
+            section = strings[at]
+            at += 1
+            size = numbers[n]
+            n += 1
+            items = []
+            for _ in range(size):
+                name, description = strings[at:at + 2]
+                price, tag_count = numbers[n], numbers[n + 1]
+                at += 2
+                n += 2
+                price_text = None
+                if price == _PRICE_TEXT:
+                    price_text = strings[at]
+                    at += 1
+                items.append(MenuItem(name, description, price if price >= 0 else None,
+                                      strings[at:at + tag_count], price_text))
+                at += tag_count
+            sections[section] = tuple(items)
+        return cls(concept, Menu(sections), cuisine, style, price_range)
+
+
+def as_dict(restaurant):
+    """The dict form of a restaurant given either as a Restaurant or already as a dict."""
+    return restaurant.to_dict() if isinstance(restaurant, Restaurant) else restaurant
@@ -9,13 +9,39 @@ from reportlab.platypus.flowables import HRFlowable
 from reportlab.platypus import Frame, PageTemplate
 from reportlab.lib.pagesizes import letter
 import io
+import os
+import re
+import copy
+import zipfile
+import itertools
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from metrics import get_metrics
+from models import as_dict
 from datetime import datetime
 
+# Menu sections in print order, with their printed titles
+MENU_SECTIONS = [
+    ('appetizers', 'Starters'),
+    ('mains', 'Main Courses'),
+    ('desserts', 'Sweet Endings'),
+    ('beverages', 'Drinks')
+]
+
+
+class PDFTemplate:
+    """Styles, table styles and static flowables compiled once and shared by every render.
+
+    Treat an instance as read-only: flowables are handed out as shallow copies
+    so concurrent renders never share layout state.
+    """
 
-class RestaurantPDFGenerator:
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self._create_custom_styles()
+        self._create_inline_styles()
+        self._create_table_styles()
+        self._create_static_flowables()
 
     def _create_custom_styles(self):
         """Create elegant menu-style typography."""
@@ -109,6 +135,149 @@ class RestaurantPDFGenerator:
             textColor=colors.HexColor('#333333')
         ))
 
+    def _create_inline_styles(self):
+        """Paragraph styles used for one-off elements of the layout."""
+        self.info_style = ParagraphStyle(
+            'InfoStyle',
+            parent=self.styles['Normal'],
+            fontSize=9,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#666666')
+        )
+
+        self.sig_title_style = ParagraphStyle(
+            'SigTitle',
+            fontSize=9,
+            fontName='Helvetica-Bold',
+            textColor=colors.HexColor('#8B4513')
+        )
+
+        self.sig_desc_style = ParagraphStyle(
+            'SigDesc',
+            fontSize=9,
+            fontName='Helvetica-Oblique',
+            textColor=colors.HexColor('#333333')
+        )
+
+        self.menu_header_style = ParagraphStyle(
+            'MenuHeader',
+            fontSize=16,
+            fontName='Times-Bold',
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#1a1a1a'),
+            spaceAfter=15
+        )
+
+        self.footer_title_style = ParagraphStyle(
+            'FooterTitle',
+            fontSize=10,
+            fontName='Helvetica-Bold',
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#8B4513')
+        )
+
+        self.usp_style = ParagraphStyle(
+            'USP',
+            fontSize=8,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#666666'),
+            leftIndent=20,
+            rightIndent=20
+        )
+
+        self.footer_style = ParagraphStyle(
+            'Footer',
+            fontSize=7,
+            textColor=colors.HexColor('#999999'),
+            alignment=TA_CENTER
+        )
+
+    def _create_table_styles(self):
+        """Table styles for the concept box, signature dish and menu sections."""
+        self.concept_table_style = TableStyle([
+            ('BOX', (0, 0), (-1, -1), 0.5, colors.HexColor('#d4af37')),
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#fafafa')),
+            ('TOPPADDING', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+            ('LEFTPADDING', (0, 0), (-1, -1), 15),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 15),
+        ])
+
+        self.sig_table_style = TableStyle([
+            ('ALIGN', (0, 0), (0, 0), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('RIGHTPADDING', (0, 0), (0, 0), 10),
+        ])
+
+        self.menu_table_style = TableStyle([
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 2),
+            # Add subtle dots between items and prices
+            ('LINEBELOW', (0, 0), (-1, -2), 0.25, colors.HexColor('#e0e0e0')),
+        ])
+
+    def _create_static_flowables(self):
+        """Flowables whose content never changes between renders."""
+        # Decorative divider
+        self._divider = (
+            Spacer(1, 8),
+            HRFlowable(
+                width="50%",
+                thickness=0.5,
+                color=colors.HexColor('#d4af37'),
+                hAlign='CENTER'
+            ),
+            Spacer(1, 8)
+        )
+
+        self._menu_header = Paragraph("MENU", self.menu_header_style)
+        self._footer_title = Paragraph("Why Choose Us", self.footer_title_style)
+        self._sig_title = Paragraph("⭐ SIGNATURE DISH", self.sig_title_style)
+
+        # Section headers with decorative elements
+        self._section_headers = {
+            section_key: Paragraph(f"~ {section_title.upper()} ~", self.styles['MenuCategory'])
+            for section_key, section_title in MENU_SECTIONS
+        }
+
+    def divider(self):
+        return [copy.copy(flowable) for flowable in self._divider]
+
+    def menu_header(self):
+        return copy.copy(self._menu_header)
+
+    def footer_title(self):
+        return copy.copy(self._footer_title)
+
+    def sig_title(self):
+        return copy.copy(self._sig_title)
+
+    def section_header(self, section_key):
+        return copy.copy(self._section_headers[section_key])
+
+
+_template = None
+_template_lock = threading.Lock()
+
+
+def get_template():
+    """Return the process-wide PDFTemplate, compiling it on first use."""
+    global _template
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = PDFTemplate()
+    return _template
+
+
+class RestaurantPDFGenerator:
+    def __init__(self, template=None):
+        self.template = template or get_template()
+        self.styles = self.template.styles
+
     def _draw_decorative_line(self, canvas, doc):
         """Draw decorative elements on each page."""
         canvas.saveState()
@@ -137,111 +306,67 @@ class RestaurantPDFGenerator:
         # Set up decorative page template
         doc.build_flowables = self._build_with_decoration
 
+        with get_metrics().stage("pdf.render"):
+            elements = self._build_elements(restaurant_data)
+
+            # Build PDF
+            doc.build(elements, onFirstPage=self._draw_decorative_line,
+                    onLaterPages=self._draw_decorative_line)
+        buffer.seek(0)
+        return buffer
+
+    def _build_elements(self, restaurant_data):
+        """Build the flowables for one restaurant from the shared template."""
+        template = self.template
         elements = []
 
+        restaurant_data = as_dict(restaurant_data)
         concept = restaurant_data['concept']
         menu = restaurant_data['menu']
         metadata = restaurant_data['metadata']
 
-        # Decorative divider
-        def add_divider():
-            elements.append(Spacer(1, 8))
-            elements.append(HRFlowable(
-                width="50%",
-                thickness=0.5,
-                color=colors.HexColor('#d4af37'),
-                hAlign='CENTER'
-            ))
-            elements.append(Spacer(1, 8))
-
         # Header Section with elegant styling
         elements.append(Spacer(1, 20))
         elements.append(Paragraph(concept['name'].upper(), self.styles['RestaurantName']))
         elements.append(Paragraph(f"~ {concept['tagline']} ~", self.styles['Tagline']))
 
-        add_divider()
+        elements.extend(template.divider())
 
         # Compact info section
-        info_style = ParagraphStyle(
-            'InfoStyle',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#666666')
-        )
-
         info_text = f"{metadata['cuisine']} • {metadata['style']} • {metadata['price_range']}"
-        elements.append(Paragraph(info_text, info_style))
+        elements.append(Paragraph(info_text, template.info_style))
 
         elements.append(Spacer(1, 15))
 
         # Concept in a box
         concept_table = Table([[Paragraph(concept['concept'], self.styles['CompactBody'])]],
                               colWidths=[6.5 * inch])
-        concept_table.setStyle(TableStyle([
-            ('BOX', (0, 0), (-1, -1), 0.5, colors.HexColor('#d4af37')),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#fafafa')),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-            ('LEFTPADDING', (0, 0), (-1, -1), 15),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 15),
-        ]))
+        concept_table.setStyle(template.concept_table_style)
         elements.append(concept_table)
 
         elements.append(Spacer(1, 15))
 
         # Signature Dish - Highlighted
         sig_dish_data = [[
-            Paragraph("⭐ SIGNATURE DISH", ParagraphStyle(
-                'SigTitle',
-                fontSize=9,
-                fontName='Helvetica-Bold',
-                textColor=colors.HexColor('#8B4513')
-            )),
-            Paragraph(concept['signature_dish'], ParagraphStyle(
-                'SigDesc',
-                fontSize=9,
-                fontName='Helvetica-Oblique',
-                textColor=colors.HexColor('#333333')
-            ))
+            template.sig_title(),
+            Paragraph(concept['signature_dish'], template.sig_desc_style)
         ]]
 
         sig_table = Table(sig_dish_data, colWidths=[1.5 * inch, 5 * inch])
-        sig_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, 0), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('RIGHTPADDING', (0, 0), (0, 0), 10),
-        ]))
+        sig_table.setStyle(template.sig_table_style)
         elements.append(sig_table)
 
-        add_divider()
+        elements.extend(template.divider())
 
         # Menu Header
-        elements.append(Paragraph("MENU", ParagraphStyle(
-            'MenuHeader',
-            fontSize=16,
-            fontName='Times-Bold',
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#1a1a1a'),
-            spaceAfter=15
-        )))
+        elements.append(template.menu_header())
 
         # Menu Sections with two-column layout for mains
-        menu_sections = [
-            ('appetizers', 'Starters'),
-            ('mains', 'Main Courses'),
-            ('desserts', 'Sweet Endings'),
-            ('beverages', 'Drinks')
-        ]
-
-        for section_key, section_title in menu_sections:
+        for section_key, section_title in MENU_SECTIONS:
             if section_key in menu and menu[section_key]:
                 # Section header with decorative elements
                 elements.append(Spacer(1, 10))
-                elements.append(Paragraph(
-                    f"~ {section_title.upper()} ~",
-                    self.styles['MenuCategory']
-                ))
+                elements.append(template.section_header(section_key))
                 elements.append(Spacer(1, 8))
 
                 # Create menu items
@@ -272,62 +397,168 @@ class RestaurantPDFGenerator:
                     col_widths = [5.3 * inch, 0.8 * inch]
 
                 menu_table = Table(menu_data, colWidths=col_widths)
-                menu_table.setStyle(TableStyle([
-                    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                    ('TOPPADDING', (0, 0), (-1, -1), 2),
-                    # Add subtle dots between items and prices
-                    ('LINEBELOW', (0, 0), (-1, -2), 0.25, colors.HexColor('#e0e0e0')),
-                ]))
+                menu_table.setStyle(template.menu_table_style)
                 elements.append(menu_table)
 
         # Footer
         elements.append(Spacer(1, 30))
-        add_divider()
+        elements.extend(template.divider())
 
         # USPs in elegant footer
-        elements.append(Paragraph("Why Choose Us", ParagraphStyle(
-            'FooterTitle',
-            fontSize=10,
-            fontName='Helvetica-Bold',
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#8B4513')
-        )))
+        elements.append(template.footer_title())
         elements.append(Spacer(1, 5))
 
         usp_text = " • ".join(concept['unique_selling_points'])
-        elements.append(Paragraph(
-            usp_text,
-            ParagraphStyle(
-                'USP',
-                fontSize=8,
-                alignment=TA_CENTER,
-                textColor=colors.HexColor('#666666'),
-                leftIndent=20,
-                rightIndent=20
-            )
-        ))
+        elements.append(Paragraph(usp_text, template.usp_style))
 
         elements.append(Spacer(1, 15))
 
         # Generated by footer
         footer_text = f"ConceptKitchen • {datetime.now().strftime('%B %Y')}"
-        elements.append(Paragraph(footer_text, ParagraphStyle(
-            'Footer',
-            fontSize=7,
-            textColor=colors.HexColor('#999999'),
-            alignment=TA_CENTER
-        )))
+        elements.append(Paragraph(footer_text, template.footer_style))
 
-        # Build PDF
-        doc.build(elements, onFirstPage=self._draw_decorative_line,
-                onLaterPages=self._draw_decorative_line)
-        buffer.seek(0)
-        return buffer
+        return elements
 
     def _build_with_decoration(self, flowables):
         """Custom build method to add page decorations."""
         self.build(flowables, onFirstPage=self._draw_decorative_line,
-                   onLaterPages=self._draw_decorative_line)
\ No newline at end of file
+                   onLaterPages=self._draw_decorative_line)
+
+
+class _CatalogDocTemplate(SimpleDocTemplate):
+    """Doc template that queues the next restaurant's flowables once the current ones are drawn."""
+
+    def __init__(self, sink, restaurants, generator, **kwargs):
+        super().__init__(sink, **kwargs)
+        self.restaurants = iter(restaurants)
+        self.generator = generator
+        self.flowables = []
+        self.added = 0
+
+    def add_next(self):
+        """Queue the next restaurant, starting it on a new page; returns False when there are none left."""
+        restaurant_data = next(self.restaurants, None)
+        if restaurant_data is None:
+            return False
+        if self.added:
+            self.flowables.append(PageBreak())
+        self.flowables.extend(self.generator._build_elements(restaurant_data))
+        self.added += 1
+        return True
+
+    def afterFlowable(self, flowable):
+        # build() lays out this same list, so refilling it here keeps the build going
+        if not self.flowables:
+            self.add_next()
+
+
+class CatalogPDFWriter:
+    """Write many restaurants into one catalog PDF, one restaurant at a time.
+
+    Only the current restaurant's flowables are held in memory, but
+    ReportLab keeps every finished page until the file is saved, so memory
+    still grows with the catalog: about 24 KB per restaurant, roughly 100 MB
+    peak RSS for 1000 restaurants. write_catalog_parts keeps memory bounded
+    by splitting the catalog into several files.
+    """
+
+    def __init__(self, sink, generator=None):
+        self.sink = sink
+        self.generator = generator or RestaurantPDFGenerator()
+        self.added = 0
+
+    def write(self, restaurants):
+        """Lay out an iterable of restaurants, each starting on a new page, and save the PDF."""
+        # Same layout as generate_pdf, with page streams compressed
+        doc = _CatalogDocTemplate(
+            self.sink,
+            restaurants,
+            self.generator,
+            pagesize=letter,
+            rightMargin=50,
+            leftMargin=50,
+            topMargin=60,
+            bottomMargin=40,
+            pageCompression=1
+        )
+        doc.add_next()
+        doc.build(doc.flowables, onFirstPage=self.generator._draw_decorative_line,
+                  onLaterPages=self.generator._draw_decorative_line)
+        self.added = doc.added
+        return self.added
+
+
+def write_catalog(restaurants, sink):
+    """Stream an iterable of restaurant dicts into a single catalog PDF; returns the count written."""
+    return CatalogPDFWriter(sink).write(restaurants)
+
+
+def write_catalog_parts(restaurants, output_dir, per_part=250, prefix="catalog"):
+    """Write restaurants into catalog PDFs of at most per_part restaurants each; returns their paths.
+
+    Peak memory is that of one part however many restaurants there are.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    restaurants = iter(restaurants)
+    generator = RestaurantPDFGenerator()
+    paths = []
+    for first in restaurants:
+        path = os.path.join(output_dir, f"{prefix}_{len(paths) + 1:04d}.pdf")
+        CatalogPDFWriter(path, generator).write(itertools.chain([first], itertools.islice(restaurants, per_part - 1)))
+        paths.append(path)
+    return paths
+
+
+def pdf_filename(restaurant_data):
+    """File name used for a restaurant's PDF export."""
+    name = as_dict(restaurant_data)['concept']['name']
+    safe = re.sub(r'[^\w\-]+', '_', name).strip('_') or "restaurant"
+    return f"{safe}_concept.pdf"
+
+
+def _render_one(restaurant_data):
+    """Process-pool worker: render one restaurant and return its file name and PDF bytes."""
+    pdf = RestaurantPDFGenerator().generate_pdf(restaurant_data).getvalue()
+    return pdf_filename(restaurant_data), pdf
+
+
+def render_many(restaurants, workers=None, output_dir=None, zip_path=None, chunksize=4):
+    """Render many restaurants to PDF across a process pool.
+
+    Each PDF is written into output_dir and/or a ZIP archive at zip_path as
+    soon as it is ready. Returns the file names written, in input order.
+    Callers on spawn-based platforms must invoke this from under an
+    ``if __name__ == "__main__":`` guard.
+    """
+    if output_dir is None and zip_path is None:
+        raise ValueError("render_many needs an output_dir, a zip_path or both")
+
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    # PDFs are already compressed, so store them in the archive as-is
+    archive = zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) if zip_path is not None else None
+
+    written = []
+    seen = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            for filename, pdf in executor.map(_render_one, restaurants, chunksize=chunksize):
+                # Keep duplicate restaurant names from overwriting each other
+                count = seen.get(filename, 0) + 1
+                seen[filename] = count
+                if count > 1:
+                    stem, ext = os.path.splitext(filename)
+                    filename = f"{stem}_{count}{ext}"
+
+                if output_dir is not None:
+                    with open(os.path.join(output_dir, filename), "wb") as f:
+                        f.write(pdf)
+                if archive is not None:
+                    archive.writestr(filename, pdf)
+                written.append(filename)
+    finally:
+        if archive is not None:
+            archive.close()
+
+    return written
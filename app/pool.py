@@ -0,0 +1,121 @@
+import os
+import time
+import threading
+from collections import Counter, deque
+from metrics import get_metrics
+from ratelimit import scheduling
+
+
+class ConceptPool:
+    """Background stock of ready-made restaurants per (cuisine, style, price range).
+
+    ``take()`` hands out a pooled restaurant immediately, removing it so
+    every concept is served only once, and records the demand for that
+    combination. A single daemon worker keeps up to ``size`` unseen
+    restaurants for the ``max_combos`` most requested combinations,
+    refilling the most popular ones first. Pooled restaurants are always
+    generated with ``force_fresh`` so they never repeat a cached answer.
+    """
+
+    def __init__(self, generator, size=2, max_combos=20, retry_delay=30, metrics=None):
+        self.generator = generator
+        self.size = size
+        self.max_combos = max_combos
+        self.retry_delay = retry_delay
+        self.metrics = metrics or get_metrics()
+
+        self._stock = {}
+        self._demand = Counter()
+        self._failed_at = {}
+        self._wakeup = threading.Condition()
+        self._stopped = False
+        self._worker = None
+
+    @staticmethod
+    def _combo(cuisine, style, price_range):
+        return cuisine, style, price_range
+
+    def start(self):
+        """Start the refill worker if it is not running yet."""
+        with self._wakeup:
+            if self._worker is None or not self._worker.is_alive():
+                self._stopped = False
+                self._worker = threading.Thread(target=self._refill_loop, name="concept-pool", daemon=True)
+                self._worker.start()
+        return self
+
+    def stop(self, timeout=None):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def warm(self, combos):
+        """Seed demand so the given (cuisine, style, price_range) combinations get stocked."""
+        with self._wakeup:
+            for combo in combos:
+                self._demand[self._combo(*combo)] += 1
+            self._wakeup.notify()
+
+    def take(self, cuisine, style, price_range):
+        """Return an unseen pooled restaurant, or None when the pool has none ready."""
+        combo = self._combo(cuisine, style, price_range)
+        with self._wakeup:
+            self._demand[combo] += 1
+            stock = self._stock.get(combo)
+            restaurant = stock.popleft() if stock else None
+            # Either way the combination now needs topping up
+            self._wakeup.notify()
+
+        self.metrics.inc('pool_requests_total', result="hit" if restaurant is not None else "miss")
+        return restaurant
+
+    def available(self, cuisine, style, price_range):
+        with self._wakeup:
+            return len(self._stock.get(self._combo(cuisine, style, price_range), ()))
+
+    def _next_combo(self):
+        """Most requested combination that is below its target stock, or None."""
+        now = time.monotonic()
+        for combo, _ in self._demand.most_common(self.max_combos):
+            if len(self._stock.get(combo, ())) >= self.size:
+                continue
+            if now - self._failed_at.get(combo, float("-inf")) < self.retry_delay:
+                continue
+            return combo
+        return None
+
+    def _refill_loop(self):
+        while True:
+            with self._wakeup:
+                combo = self._next_combo()
+                while combo is None and not self._stopped:
+                    self._wakeup.wait(timeout=self.retry_delay)
+                    combo = self._next_combo()
+                if self._stopped:
+                    return
+
+            try:
+                # Refills never hold up people waiting on the UI
+                with scheduling("batch", session="pool"):
+                    restaurant = self.generator.generate_full_restaurant(*combo, force_fresh=True)
+            except Exception as e:
+                self.metrics.inc('pool_refill_errors_total', error=type(e).__name__)
+                with self._wakeup:
+                    self._failed_at[combo] = time.monotonic()
+                continue
+
+            with self._wakeup:
+                self._failed_at.pop(combo, None)
+                self._stock.setdefault(combo, deque()).append(restaurant)
+            self.metrics.inc('pool_refills_total')
+
+
+def pool_from_env(generator):
+    """Started ConceptPool sized by CONCEPTKITCHEN_POOL_SIZE, or None when it is unset or 0."""
+    size = int(os.getenv("CONCEPTKITCHEN_POOL_SIZE", "0"))
+    if size <= 0:
+        return None
+    pool = ConceptPool(generator, size=size, max_combos=int(os.getenv("CONCEPTKITCHEN_POOL_COMBOS", "20")))
+    return pool.start()
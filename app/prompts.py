@@ -0,0 +1,203 @@
+"""Prompt templates, built once per generator.
+
+"verbose" prompts spell out an example of the JSON they want. "compact"
+prompts describe the shape once in a system message, which is identical
+for every call of a kind so provider-side prompt caching can reuse it,
+and rely on the model's JSON mode for well-formed output.
+"""
+from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
+
+PROMPT_STYLES = ('verbose', 'compact')
+
+VERBOSE_CONCEPT_TEMPLATE = """Create a unique and compelling restaurant concept.
+
+            Cuisine: {cuisine}
+            Style: {style}
+            Price Range: {price_range} ($ = budget, $$ = moderate, $$$ = upscale, $$$$ = luxury)
+
+            Return a JSON object with EXACTLY this structure:
+            {{
+                "name": "Creative restaurant name",
+                "tagline": "Memorable tagline that captures the essence",
+                "concept": "2-3 sentence description of the restaurant's unique concept and atmosphere",
+                "unique_selling_points": [
+                    "First unique aspect",
+                    "Second unique aspect", 
+                    "Third unique aspect"
+                ],
+                "ambiance": "Detailed description of interior design, lighting, music, and overall vibe",
+                "target_audience": "Description of ideal customers",
+                "signature_dish": "Name and brief description of the restaurant's most famous dish"
+            }}
+
+            Be creative, specific, and ensure all content is relevant to {cuisine} cuisine.
+            Return ONLY valid JSON, no additional text."""
+
+VERBOSE_MENU_TEMPLATE = """Create a detailed menu for this restaurant:
+
+            Restaurant: {name}
+            Cuisine: {cuisine}
+            Concept: {concept}
+            Price Guidelines: 
+            - Appetizers ${app_min}-${app_max}
+            - Mains ${main_min}-${main_max}
+            - Desserts ${dessert_min}-${dessert_max}
+
+            Return a JSON object with EXACTLY this structure:
+            {{
+                "appetizers": [
+                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": ["vegetarian/vegan/gluten-free if applicable"]}},
+                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}},
+                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}}
+                ],
+                "mains": [
+                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}},
+                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}},
+                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}},
+                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}}
+                ],
+                "desserts": [
+                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}},
+                    {{"name": "Dish name", "description": "Enticing 10-15 word description", "price": "$XX", "dietary": []}}
+                ],
+                "beverages": [
+                    {{"name": "Drink name", "description": "Brief description", "price": "$XX", "dietary": []}},
+                    {{"name": "Drink name", "description": "Brief description", "price": "$XX", "dietary": []}}
+                ]
+            }}
+
+            Make all items authentic to {cuisine} cuisine. Return ONLY valid JSON."""
+
+VERBOSE_CANDIDATES_TEMPLATE = """Create {count} distinct restaurant concepts for the same brief.
+
+            Cuisine: {cuisine}
+            Style: {style}
+            Price Range: {price_range} ($ = budget, $$ = moderate, $$$ = upscale, $$$$ = luxury)
+
+            Return a JSON object with EXACTLY {count} concepts in this structure:
+            {{
+                "concepts": [
+                    {{
+                        "name": "Creative restaurant name",
+                        "tagline": "Memorable tagline that captures the essence",
+                        "concept": "2-3 sentence description of the restaurant's unique concept and atmosphere",
+                        "unique_selling_points": ["First unique aspect", "Second unique aspect", "Third unique aspect"],
+                        "ambiance": "Detailed description of interior design, lighting, music, and overall vibe",
+                        "target_audience": "Description of ideal customers",
+                        "signature_dish": "Name and brief description of the restaurant's most famous dish"
+                    }}
+                ]
+            }}
+
+            Give every concept a different name and a clearly different angle.
+            Be creative, specific, and ensure all content is relevant to {cuisine} cuisine.
+            Return ONLY valid JSON, no additional text."""
+
+VERBOSE_SECTION_TEMPLATE = """Create the {title} section of the menu for this restaurant:
+
+            Restaurant: {name}
+            Cuisine: {cuisine}
+            Concept: {concept}
+            Price Guideline: {price_guideline}
+
+            Return a JSON object with EXACTLY {count} items in this structure:
+            {{
+                "{section}": [
+                    {{"name": "{item_label}", "description": "{description_hint}", "price": "$XX", "dietary": ["vegetarian/vegan/gluten-free if applicable"]}}
+                ]
+            }}
+
+            Make all items authentic to {cuisine} cuisine. Return ONLY valid JSON."""
+
+# Minimal reply for the legacy name + menu items functions, the same in every style
+NAME_ITEMS_TEMPLATE = """Invent a restaurant. Reply with one JSON object and nothing else:
+{{"name": str, "tagline": str, "menu_items": [exactly {count} main course names]}}
+Cuisine: {cuisine}"""
+
+# One menu item, shared by the compact menu and section prompts
+COMPACT_ITEM_SHAPE = (
+    'item = {{"name": str, "description": str, "price": "$N" (whole dollars), '
+    '"dietary": [zero or more of "vegetarian", "vegan", "gluten-free"]}}'
+)
+
+COMPACT_CONCEPT_SYSTEM = """You create restaurant concepts. Reply with one JSON object and nothing else:
+{{"name": str, "tagline": str, "concept": str (2-3 sentences on concept and atmosphere), \
+"unique_selling_points": [3 str], "ambiance": str (interior, lighting, music, vibe), \
+"target_audience": str, "signature_dish": str (name and short description)}}
+Be creative and specific to the cuisine."""
+
+COMPACT_CONCEPT_HUMAN = """Cuisine: {cuisine}
+Style: {style}
+Price Range: {price_range} ($ budget, $$ moderate, $$$ upscale, $$$$ luxury)"""
+
+COMPACT_CANDIDATES_SYSTEM = """You create restaurant concepts. Reply with one JSON object and nothing else:
+{{"concepts": [concept]}}
+concept = {{"name": str, "tagline": str, "concept": str (2-3 sentences on concept and atmosphere), \
+"unique_selling_points": [3 str], "ambiance": str (interior, lighting, music, vibe), \
+"target_audience": str, "signature_dish": str (name and short description)}}
+Every concept gets a different name and a clearly different angle, specific to the cuisine."""
+
+COMPACT_CANDIDATES_HUMAN = """Concepts: exactly {count} concepts
+Cuisine: {cuisine}
+Style: {style}
+Price Range: {price_range} ($ budget, $$ moderate, $$$ upscale, $$$$ luxury)"""
+
+COMPACT_MENU_SYSTEM = """You write restaurant menus. Reply with one JSON object and nothing else:
+{shape}
+{item}
+Descriptions are 10-15 enticing words (brief for beverages). Keep every item authentic to the cuisine."""
+
+COMPACT_MENU_HUMAN = """Restaurant: {name}
+Cuisine: {cuisine}
+Concept: {concept}
+Prices: Appetizers ${app_min}-${app_max}, Mains ${main_min}-${main_max}, Desserts ${dessert_min}-${dessert_max}"""
+
+COMPACT_SECTION_SYSTEM = """You write one section of a restaurant menu. Reply with one JSON object and nothing else:
+{{{{"<section>": [items]}}}}
+{item}
+Keep every item authentic to the cuisine."""
+
+COMPACT_SECTION_HUMAN = """Section: "{section}" ({title}), exactly {count} items; description: {description_hint}
+Restaurant: {name}
+Cuisine: {cuisine}
+Concept: {concept}
+Price Guideline: {price_guideline}"""
+
+
+def _compact_menu_shape(menu_sections):
+    sections = ", ".join(
+        f'"{section}": [{count} items]' for section, (_, count, _, _, _) in menu_sections.items()
+    )
+    return "{{" + sections + "}}"
+
+
+def build_prompts(style, menu_sections):
+    """Return the 'concept', 'candidates', 'menu', 'section' and 'name_items' templates for a prompt style."""
+    if style == 'verbose':
+        return {
+            'concept': PromptTemplate.from_template(VERBOSE_CONCEPT_TEMPLATE),
+            'candidates': PromptTemplate.from_template(VERBOSE_CANDIDATES_TEMPLATE),
+            'menu': PromptTemplate.from_template(VERBOSE_MENU_TEMPLATE),
+            'section': PromptTemplate.from_template(VERBOSE_SECTION_TEMPLATE),
+            'name_items': PromptTemplate.from_template(NAME_ITEMS_TEMPLATE)
+        }
+
+    if style == 'compact':
+        # System messages come first and never vary within a kind, so they form a cacheable prefix
+        menu_system = COMPACT_MENU_SYSTEM.format(shape=_compact_menu_shape(menu_sections), item=COMPACT_ITEM_SHAPE)
+        section_system = COMPACT_SECTION_SYSTEM.format(item=COMPACT_ITEM_SHAPE)
+        return {
+            'concept': ChatPromptTemplate.from_messages([
+                ("system", COMPACT_CONCEPT_SYSTEM), ("human", COMPACT_CONCEPT_HUMAN)
+            ]),
+            'candidates': ChatPromptTemplate.from_messages([
+                ("system", COMPACT_CANDIDATES_SYSTEM), ("human", COMPACT_CANDIDATES_HUMAN)
+            ]),
+            'menu': ChatPromptTemplate.from_messages([("system", menu_system), ("human", COMPACT_MENU_HUMAN)]),
+            'section': ChatPromptTemplate.from_messages([
+                ("system", section_system), ("human", COMPACT_SECTION_HUMAN)
+            ]),
+            'name_items': PromptTemplate.from_template(NAME_ITEMS_TEMPLATE)
+        }
+
+    raise ValueError(f"Unknown prompt style: {style}")
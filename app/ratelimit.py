@@ -0,0 +1,230 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from metrics import get_metrics
+
+# Lower runs first
+PRIORITIES = {
+    'interactive': 0,
+    'batch': 1
+}
+
+# Rough completion size used to reserve tokens before the reply is known
+DEFAULT_OUTPUT_TOKENS = 800
+
+# (priority, session) of the work currently being done, if set
+_current_scheduling = contextvars.ContextVar("conceptkitchen_scheduling", default=("interactive", None))
+
+
+@contextmanager
+def scheduling(priority="interactive", session=None):
+    """Tag LLM calls made inside the block with a priority and a session for fair queuing."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {priority}")
+    token = _current_scheduling.set((priority, session))
+    try:
+        yield
+    finally:
+        _current_scheduling.reset(token)
+
+
+def current_scheduling():
+    return _current_scheduling.get()
+
+
+def estimate_tokens(text, output_tokens=DEFAULT_OUTPUT_TOKENS):
+    """Tokens a call will probably use: ~4 characters per prompt token plus the expected reply."""
+    return len(text) // 4 + output_tokens
+
+
+class QueueTimeout(RuntimeError):
+    """Raised when a call waits longer than the scheduler's max_wait for rate-limit budget."""
+
+
+class TokenBucket:
+    """Budget of `per_minute` units refilled continuously; may go negative to settle overdraws."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` is available (0 when it already is)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount):
+        """Give back (positive) or charge (negative) units once the real usage is known."""
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateScheduler:
+    """Process-wide RPM/TPM limiter that queues calls by priority and fairly across sessions.
+
+    Every call reserves one request and an estimated number of tokens.
+    Waiting calls are ordered by priority (interactive before batch), then
+    by start-time fair queuing across sessions, so one session with many
+    queued calls cannot starve the others. Once the reply arrives,
+    ``settle()`` corrects the token bucket with the real usage.
+    """
+
+    def __init__(self, rpm=None, tpm=None, max_wait=None, metrics=None):
+        self.requests = TokenBucket(rpm or float(os.getenv("GROQ_RPM", "30")))
+        self.tokens = TokenBucket(tpm or float(os.getenv("GROQ_TPM", "12000")))
+        self.max_wait = max_wait if max_wait is not None else float(os.getenv("GROQ_MAX_QUEUE_WAIT", "120"))
+        self.metrics = metrics or get_metrics()
+
+        self._lock = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0
+        self._session_finish = {}
+
+    def _enqueue(self, priority, session):
+        # Start-time fair queuing: a session's next call starts after its previous one
+        start = max(self._virtual_time, self._session_finish.get(session, 0))
+        self._session_finish[session] = start + 1
+        ticket = (PRIORITIES[priority], start, next(self._sequence))
+        heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _try_grant(self, ticket, tokens):
+        """Grant the ticket if it is at the head of the queue and the budget allows.
+
+        Returns 0 on success, otherwise how long to wait before trying again.
+        """
+        if self._queue[0] != ticket:
+            return None
+        now = time.monotonic()
+        wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+        if wait > 0:
+            return wait
+
+        heapq.heappop(self._queue)
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self._virtual_time = ticket[1]
+        if not self._queue:
+            # Idle: forget per-session history so it does not grow without bound
+            self._session_finish.clear()
+        self._lock.notify_all()
+        return 0
+
+    def _abandon(self, ticket):
+        """Drop a ticket that will never be granted, so it cannot block the head of the queue."""
+        if ticket in self._queue:
+            self._queue.remove(ticket)
+            heapq.heapify(self._queue)
+            self._lock.notify_all()
+
+    def _record(self, priority, waited):
+        self.metrics.observe('rate_limit_wait_seconds', waited, priority=priority)
+
+    def _timed_out(self, priority, ticket):
+        self._abandon(ticket)
+        self.metrics.inc('rate_limit_timeouts_total', priority=priority)
+        return QueueTimeout(f"Waited more than {self.max_wait:g}s for Groq rate-limit budget")
+
+    def try_acquire(self, tokens):
+        """Take budget for a call only if nothing is queued and it is available now; returns whether it was."""
+        with self._lock:
+            if self._queue:
+                return False
+            now = time.monotonic()
+            if self.requests.wait_time(1, now) > 0 or self.tokens.wait_time(tokens, now) > 0:
+                return False
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            return True
+
+    def acquire(self, tokens):
+        """Block until a call of about `tokens` tokens may be sent; returns seconds waited."""
+        priority, session = current_scheduling()
+        start = time.monotonic()
+        with self._lock:
+            ticket = self._enqueue(priority, session)
+            try:
+                while True:
+                    wait = self._try_grant(ticket, tokens)
+                    if wait == 0:
+                        break
+                    remaining = self.max_wait - (time.monotonic() - start)
+                    if remaining <= 0:
+                        raise self._timed_out(priority, ticket)
+                    self._lock.wait(timeout=min(remaining, wait) if wait is not None else remaining)
+            except BaseException:
+                self._abandon(ticket)
+                raise
+
+        waited = time.monotonic() - start
+        self._record(priority, waited)
+        return waited
+
+    async def aacquire(self, tokens):
+        """Async version of acquire; polls instead of blocking the event loop."""
+        priority, session = current_scheduling()
+        start = time.monotonic()
+        with self._lock:
+            ticket = self._enqueue(priority, session)
+
+        try:
+            while True:
+                with self._lock:
+                    wait = self._try_grant(ticket, tokens)
+                    if wait == 0:
+                        break
+                    remaining = self.max_wait - (time.monotonic() - start)
+                    if remaining <= 0:
+                        raise self._timed_out(priority, ticket)
+                await asyncio.sleep(min(remaining, wait if wait is not None else 0.05, 1.0))
+        except BaseException:
+            # Cancelled (hedge loser, request timeout) or timed out: give up the place in the queue
+            with self._lock:
+                self._abandon(ticket)
+            raise
+
+        waited = time.monotonic() - start
+        self._record(priority, waited)
+        return waited
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Correct the token bucket once a call's real usage is known."""
+        if actual_tokens is None:
+            return
+        with self._lock:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+            self._lock.notify_all()
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_rate_scheduler(model_name=None):
+    """Return the process-wide scheduler for a model, or None when GROQ_RATE_LIMIT is disabled.
+
+    Groq budgets are per model, so each model gets its own scheduler.
+    """
+    if os.getenv("GROQ_RATE_LIMIT", "1").lower() in ("0", "false", "no"):
+        return None
+    with _schedulers_lock:
+        if model_name not in _schedulers:
+            _schedulers[model_name] = RateScheduler()
+        return _schedulers[model_name]
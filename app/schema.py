@@ -0,0 +1,223 @@
+import re
+import json
+
+# Concept fields that must be non-empty strings
+CONCEPT_TEXT_FIELDS = ('name', 'tagline', 'concept', 'ambiance', 'target_audience', 'signature_dish')
+
+# How many trailing elements repair_json may drop from a truncated reply
+MAX_TRUNCATION_STEPS = 20
+
+_PRICE_NUMBER = re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?")
+# Prompt placeholders such as "$XX" or "$X.XX", where the model left the price to us
+_PRICE_PLACEHOLDER = re.compile(r"^\$?\s*[xX?]+(?:\.[xX?]+)?$")
+# A string literal (kept as is) or a comma right before a closing bracket (dropped)
+_TRAILING_COMMA = re.compile(r'("(?:[^"\\]|\\.)*")|,(\s*[}\]])')
+# Where a JSON object starts, as opposed to a brace in surrounding prose
+_OBJECT_START = re.compile(r'\{\s*["}]')
+_DECODER = json.JSONDecoder()
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+
+class SchemaError(ValueError):
+    """A reply that does not match the expected structure, even after repair.
+
+    ``sections`` names the menu sections that failed, and ``value`` holds
+    the cleaned parts that did validate, so callers can re-request only
+    what is missing.
+    """
+
+    def __init__(self, message, sections=(), value=None):
+        super().__init__(message)
+        self.sections = list(sections)
+        self.value = value
+
+
+def _close_truncated(text):
+    """Close strings, arrays and objects left open by a reply cut off mid-way."""
+    stack = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+
+    if in_string:
+        text += '"'
+    return text.rstrip().rstrip(",") + "".join(reversed(stack))
+
+
+def _strip_trailing_commas(text):
+    return _TRAILING_COMMA.sub(lambda match: match.group(1) or match.group(2), text)
+
+
+def _loads_object(text):
+    """The JSON object at the start of text, ignoring whatever follows it, or None."""
+    try:
+        value, _ = _DECODER.raw_decode(_strip_trailing_commas(text))
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def repair_json(text):
+    """Parse a near-JSON reply locally: fences, surrounding prose, trailing commas, truncation.
+
+    Raises ValueError when the text cannot be turned into a JSON object.
+    """
+    text = _FENCE.sub("", text.strip())
+    text = text.replace("“", '"').replace("”", '"')
+
+    match = _OBJECT_START.search(text)
+    if match is None:
+        raise ValueError("No JSON object in reply")
+    start = match.start()
+
+    # Decoding stops at the end of the object, so trailing prose (braces included) is ignored
+    value = _loads_object(text[start:])
+    if value is not None:
+        return value
+
+    # Truncated reply: close what is open, dropping the unfinished tail one element at a time
+    candidate = text[start:]
+    for _ in range(MAX_TRUNCATION_STEPS):
+        value = _loads_object(_close_truncated(candidate))
+        if value is not None:
+            return value
+        cut = candidate.rfind(",")
+        if cut <= 0:
+            break
+        candidate = candidate[:cut]
+    raise ValueError("Reply could not be repaired into a JSON object")
+
+
+def _text(value):
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (int, float)):
+        return str(value)
+    return ""
+
+
+def clean_concept(value):
+    """Validate and normalise a concept; raises SchemaError when a field is unusable."""
+    if not isinstance(value, dict):
+        raise SchemaError("Concept is not an object", sections=['concept'])
+
+    concept = dict(value)
+    missing = []
+    for field in CONCEPT_TEXT_FIELDS:
+        concept[field] = _text(value.get(field))
+        if not concept[field]:
+            missing.append(field)
+
+    points = value.get('unique_selling_points')
+    if isinstance(points, str):
+        points = [point.strip(" -•") for point in re.split(r"\n|;", points)]
+    concept['unique_selling_points'] = [_text(point) for point in points or [] if _text(point)]
+    if not concept['unique_selling_points']:
+        missing.append('unique_selling_points')
+
+    if missing:
+        raise SchemaError(f"Concept is missing {', '.join(missing)}", sections=['concept'])
+    return concept
+
+
+def clean_name_items(value, count):
+    """Validate the minimal name, tagline and menu item names reply."""
+    if not isinstance(value, dict):
+        raise SchemaError("Reply is not an object", sections=['name_items'])
+    name = _text(value.get('name'))
+    items = value.get('menu_items')
+    if isinstance(items, str):
+        items = items.split(",")
+    items = [_text(item) for item in items or [] if _text(item)]
+    if not name or not items:
+        raise SchemaError("Reply is missing the name or menu items", sections=['name_items'])
+    return {'name': name, 'tagline': _text(value.get('tagline')), 'menu_items': items[:count]}
+
+
+def clean_price(price, band=None):
+    """Normalise a price to "$N"; placeholders like "$XX" fall back to the middle of the band.
+
+    Returns None for a missing or otherwise unreadable price.
+    """
+    if isinstance(price, (int, float)) and not isinstance(price, bool):
+        return f"${round(price)}"
+    if not isinstance(price, str):
+        return None
+    match = _PRICE_NUMBER.search(price)
+    if match:
+        return f"${round(float(match.group().replace(',', '')))}"
+    if band and _PRICE_PLACEHOLDER.match(price.strip()):
+        return f"${round((band[0] + band[1]) / 2)}"
+    return None
+
+
+def clean_item(item, band=None):
+    """Normalise one menu item, or return None when it cannot be used."""
+    if not isinstance(item, dict):
+        return None
+    name = _text(item.get('name'))
+    price = clean_price(item.get('price'), band)
+    if not name or price is None:
+        return None
+
+    dietary = item.get('dietary') or []
+    if isinstance(dietary, str):
+        dietary = re.split(r"[,/]", dietary)
+    dietary = [_text(tag).lower() for tag in dietary if _text(tag)]
+    # Drop prompt placeholders such as "vegetarian/vegan/gluten-free if applicable"
+    dietary = [tag for tag in dietary if "if applicable" not in tag]
+
+    return {
+        'name': name,
+        'description': _text(item.get('description')),
+        'price': price,
+        'dietary': dietary
+    }
+
+
+def clean_section(section, items, count, band=None):
+    """Validate one section's items; raises SchemaError when fewer than count are usable."""
+    if isinstance(items, dict):
+        items = items.get(section, [])
+    if not isinstance(items, list):
+        raise SchemaError(f"Section {section} is not a list", sections=[section])
+
+    cleaned = [item for item in (clean_item(item, band) for item in items) if item is not None]
+    if len(cleaned) < count:
+        raise SchemaError(f"Section {section} has {len(cleaned)} of {count} usable items", sections=[section])
+    return cleaned[:count]
+
+
+def clean_menu(value, sections):
+    """Validate a whole menu against {section: (count, band)}.
+
+    Raises SchemaError listing the failing sections, with the sections that
+    did validate in ``value``.
+    """
+    if not isinstance(value, dict):
+        raise SchemaError("Menu is not an object", sections=list(sections), value={})
+
+    menu = {}
+    failed = []
+    for section, (count, band) in sections.items():
+        try:
+            menu[section] = clean_section(section, value.get(section), count, band)
+        except SchemaError:
+            failed.append(section)
+
+    if failed:
+        raise SchemaError(f"Menu sections failed validation: {', '.join(failed)}", sections=failed, value=menu)
+    return menu
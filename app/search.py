@@ -0,0 +1,259 @@
+import re
+import heapq
+import bisect
+import itertools
+import threading
+from collections import defaultdict
+
+# Concept fields indexed for full-text search
+CONCEPT_TEXT_FIELDS = ('name', 'tagline', 'concept', 'ambiance', 'target_audience', 'signature_dish')
+
+# Restaurant-level facets, read from the restaurant's metadata
+RESTAURANT_FACETS = ('cuisine', 'style', 'price_range')
+
+STOPWORDS = frozenset("a an and at for from in of on or the to with".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_PRICE_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def tokenize(text):
+    """Lowercase word tokens of a text, without stopwords."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def parse_price(price):
+    """Numeric value of a menu price such as "$18", or None."""
+    if isinstance(price, (int, float)) and not isinstance(price, bool):
+        return float(price)
+    match = _PRICE_NUMBER.search(price) if isinstance(price, str) else None
+    return float(match.group()) if match else None
+
+
+def _facet_value(value):
+    return value.strip().lower() if isinstance(value, str) else None
+
+
+def _concept_terms(concept):
+    text = " ".join(str(concept.get(field) or "") for field in CONCEPT_TEXT_FIELDS)
+    return set(tokenize(text + " " + " ".join(concept.get('unique_selling_points') or [])))
+
+
+def _item_terms(item):
+    return set(tokenize(f"{item.get('name', '')} {item.get('description', '')}"))
+
+
+class SearchIndex:
+    """In-memory inverted and facet indexes over generated restaurants and their menu items.
+
+    Concepts and menu items each get a term -> ids inverted index. Items
+    also have facet sets for dietary tags and menu section plus a sorted
+    price array searched with bisect, and restaurants have facet sets for
+    cuisine, style and price range. Every query intersects the smallest
+    candidate set first and checks the remaining conditions per id, so its
+    cost follows the most selective filter rather than the corpus size.
+    ``add`` updates all of it incrementally.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._item_ids = itertools.count()
+
+        self._restaurants = {}
+        self._restaurant_items = {}
+        self._concept_terms = defaultdict(set)
+        self._facets = {facet: defaultdict(set) for facet in RESTAURANT_FACETS}
+
+        # item id -> (restaurant id, section, position in the section, price)
+        self._items = {}
+        self._item_terms = defaultdict(set)
+        self._dietary = defaultdict(set)
+        self._sections = defaultdict(set)
+        # Restaurant facets copied down to items, so item queries never join through restaurants
+        self._item_facets = {facet: defaultdict(set) for facet in RESTAURANT_FACETS}
+        self._prices = []
+        self._price_ids = []
+
+    def __len__(self):
+        return len(self._restaurants)
+
+    @property
+    def item_count(self):
+        return len(self._items)
+
+    def add(self, restaurant, restaurant_id=None):
+        """Index a restaurant and its menu items; returns its id.
+
+        Adding under an existing id replaces the earlier restaurant.
+        """
+        with self._lock:
+            if restaurant_id is None:
+                restaurant_id = next(self._ids)
+                while restaurant_id in self._restaurants:
+                    restaurant_id = next(self._ids)
+            elif restaurant_id in self._restaurants:
+                self._remove(restaurant_id)
+
+            self._restaurants[restaurant_id] = restaurant
+            for term in _concept_terms(restaurant['concept']):
+                self._concept_terms[term].add(restaurant_id)
+
+            metadata = restaurant.get('metadata') or {}
+            facets = {facet: _facet_value(metadata.get(facet)) for facet in RESTAURANT_FACETS}
+            for facet, value in facets.items():
+                if value:
+                    self._facets[facet][value].add(restaurant_id)
+
+            item_ids = []
+            for section, items in (restaurant.get('menu') or {}).items():
+                for position, item in enumerate(items):
+                    item_ids.append(self._add_item(restaurant_id, section, position, item, facets))
+            self._restaurant_items[restaurant_id] = item_ids
+            return restaurant_id
+
+    def _add_item(self, restaurant_id, section, position, item, facets):
+        item_id = next(self._item_ids)
+        price = parse_price(item.get('price'))
+        self._items[item_id] = (restaurant_id, section, position, price)
+
+        for term in _item_terms(item):
+            self._item_terms[term].add(item_id)
+        for tag in item.get('dietary') or []:
+            self._dietary[_facet_value(tag)].add(item_id)
+        self._sections[section].add(item_id)
+        for facet, value in facets.items():
+            if value:
+                self._item_facets[facet][value].add(item_id)
+
+        if price is not None:
+            # Item ids only grow, so (price, id) pairs stay sorted
+            at = bisect.bisect_right(self._prices, price)
+            self._prices.insert(at, price)
+            self._price_ids.insert(at, item_id)
+        return item_id
+
+    def remove(self, restaurant_id):
+        """Drop a restaurant and its items; returns whether it was indexed."""
+        with self._lock:
+            if restaurant_id not in self._restaurants:
+                return False
+            self._remove(restaurant_id)
+            return True
+
+    def _remove(self, restaurant_id):
+        restaurant = self._restaurants.pop(restaurant_id)
+        for term in _concept_terms(restaurant['concept']):
+            self._concept_terms[term].discard(restaurant_id)
+        metadata = restaurant.get('metadata') or {}
+        facets = {facet: _facet_value(metadata.get(facet)) for facet in RESTAURANT_FACETS}
+        for facet, value in facets.items():
+            self._facets[facet][value].discard(restaurant_id)
+
+        for item_id in self._restaurant_items.pop(restaurant_id):
+            _, section, position, price = self._items.pop(item_id)
+            item = restaurant['menu'][section][position]
+            for term in _item_terms(item):
+                self._item_terms[term].discard(item_id)
+            for tag in item.get('dietary') or []:
+                self._dietary[_facet_value(tag)].discard(item_id)
+            self._sections[section].discard(item_id)
+            for facet, value in facets.items():
+                self._item_facets[facet][value].discard(item_id)
+            if price is not None:
+                at = bisect.bisect_left(self._prices, price)
+                while self._price_ids[at] != item_id:
+                    at += 1
+                del self._prices[at]
+                del self._price_ids[at]
+        return restaurant
+
+    def get(self, restaurant_id):
+        return self._restaurants.get(restaurant_id)
+
+    def ids(self):
+        with self._lock:
+            return list(self._restaurants)
+
+    @staticmethod
+    def _facet_sets(facets, cuisine, style, price_range):
+        return [facets[facet].get(_facet_value(value), set())
+                for facet, value in zip(RESTAURANT_FACETS, (cuisine, style, price_range)) if value is not None]
+
+    @staticmethod
+    def _intersect(sets):
+        """Intersection of the sets, smallest first, or None when there are none."""
+        if not sets:
+            return None
+        sets = sorted(sets, key=len)
+        return sets[0].intersection(*sets[1:])
+
+    @staticmethod
+    def _newest(ids, limit):
+        return heapq.nlargest(limit, ids) if limit is not None else sorted(ids, reverse=True)
+
+    def search_concepts(self, text=None, cuisine=None, style=None, price_range=None, limit=20):
+        """Restaurants whose concept text contains every word of text, newest first.
+
+        Returns light rows: id, name, tagline and the restaurant facets.
+        """
+        with self._lock:
+            sets = [self._concept_terms.get(term, set()) for term in tokenize(text or "")]
+            sets += self._facet_sets(self._facets, cuisine, style, price_range)
+            ids = self._intersect(sets)
+            if ids is None:
+                ids = self._restaurants.keys()
+
+            rows = []
+            for restaurant_id in self._newest(ids, limit):
+                restaurant = self._restaurants[restaurant_id]
+                metadata = restaurant.get('metadata') or {}
+                row = {'id': restaurant_id, 'name': restaurant['concept']['name'],
+                       'tagline': restaurant['concept'].get('tagline')}
+                row.update((facet, metadata.get(facet)) for facet in RESTAURANT_FACETS)
+                rows.append(row)
+            return rows
+
+    def search_items(self, text=None, dietary=(), section=None, min_price=None, max_price=None,
+                     cuisine=None, style=None, price_range=None, limit=20):
+        """Menu items matching every given condition, newest first.
+
+        dietary tags must all be present; prices are inclusive bounds. Each
+        result is the item plus restaurant_id, restaurant_name and section.
+        """
+        if isinstance(dietary, str):
+            dietary = [dietary]
+        with self._lock:
+            sets = [self._item_terms.get(term, set()) for term in tokenize(text or "")]
+            sets += [self._dietary.get(_facet_value(tag), set()) for tag in dietary]
+            if section is not None:
+                sets.append(self._sections.get(section, set()))
+            sets += self._facet_sets(self._item_facets, cuisine, style, price_range)
+
+            priced = min_price is not None or max_price is not None
+            if priced:
+                low = 0 if min_price is None else bisect.bisect_left(self._prices, min_price)
+                high = len(self._prices) if max_price is None else bisect.bisect_right(self._prices, max_price)
+                # The price band is just another candidate set when it is the most selective filter
+                if not sets or high - low < min(len(ids) for ids in sets):
+                    sets.append(set(self._price_ids[low:high]))
+                    priced = False
+
+            ids = self._intersect(sets)
+            if ids is None:
+                ids = self._items.keys()
+            if priced:
+                low_price = float("-inf") if min_price is None else min_price
+                high_price = float("inf") if max_price is None else max_price
+                ids = [item_id for item_id in ids
+                       if self._items[item_id][3] is not None and low_price <= self._items[item_id][3] <= high_price]
+
+            results = []
+            for item_id in self._newest(ids, limit):
+                restaurant_id, item_section, position, _ = self._items[item_id]
+                restaurant = self._restaurants[restaurant_id]
+                result = dict(restaurant['menu'][item_section][position])
+                result.update(restaurant_id=restaurant_id, restaurant_name=restaurant['concept']['name'],
+                              section=item_section)
+                results.append(result)
+            return results
@@ -0,0 +1,374 @@
+"""Async HTTP API over RestaurantConceptGenerator.
+
+Run from the app directory, for example:
+
+    python server.py --port 8080
+    python server.py --fake --latency 0.2    # no API key needed
+
+Endpoints (JSON bodies; style and price_range are optional):
+
+    POST /concept     {"cuisine": "Thai", "style": "Food Truck", "price_range": "$"}
+    POST /menu        {"restaurant_name": ..., "cuisine": ..., "concept": ..., "price_range": "$$"}
+    POST /restaurant  {"cuisine": "Thai", ...}
+    POST /pdf         a restaurant from /restaurant, or a spec to generate one; returns application/pdf
+    GET  /search/concepts  ?q=rooftop&cuisine=Thai&style=...&price_range=...&limit=20
+    GET  /search/items     ?q=...&dietary=vegan&section=mains&min_price=...&max_price=20&cuisine=Thai
+    GET  /restaurants/{id} a restaurant found by search
+    GET  /healthz
+    GET  /metrics     Prometheus text, or JSON with ?format=json
+
+Generation runs on a fixed number of async workers fed by a bounded
+queue: when the queue is full the request gets 429 with Retry-After
+instead of piling up, and a request not answered within the timeout
+(queueing included) gets 504.
+
+Search covers the shared history (history.HistoryStore): restaurants
+generated here are stored and indexed straight away, and entries written
+by the Streamlit app or by ``batch.py --history`` are picked up, and
+pruned or cleared ones dropped, every ``--refresh`` seconds.
+"""
+import os
+import time
+import sqlite3
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from aiohttp import web
+from chains import RestaurantConceptGenerator
+from fake_llm import FakeChatModel
+from history import HistoryStore
+from metrics import EXPORTERS
+from pdf_generator import RestaurantPDFGenerator, pdf_filename
+from ratelimit import QueueTimeout, scheduling
+from schema import SchemaError
+from search import SearchIndex
+
+
+class BadRequest(ValueError):
+    """The request body is missing a field or is not a JSON object."""
+
+
+def _render(restaurant):
+    """Process-pool worker: file name and PDF bytes for one restaurant."""
+    return pdf_filename(restaurant), RestaurantPDFGenerator().generate_pdf(restaurant).getvalue()
+
+
+def _error(status, message, **headers):
+    return web.json_response({'error': message}, status=status, headers=headers or None)
+
+
+async def _read_json(request, *required):
+    try:
+        body = await request.json()
+    except ValueError:
+        raise BadRequest("Body is not valid JSON")
+    if not isinstance(body, dict):
+        raise BadRequest("Body must be a JSON object")
+    missing = [field for field in required if not body.get(field)]
+    if missing:
+        raise BadRequest(f"Missing {', '.join(missing)}")
+    return body
+
+
+def _spec(body):
+    return {
+        'cuisine': body['cuisine'],
+        'style': body.get('style') or "Casual Dining",
+        'price_range': body.get('price_range') or "$$",
+        'force_fresh': bool(body.get('force_fresh'))
+    }
+
+
+class ConceptService:
+    """Bounded job queue drained by a fixed number of async workers."""
+
+    def __init__(self, generator, workers=4, queue_size=64, timeout=60.0, pdf_workers=None, history=None,
+                 refresh_interval=5.0):
+        self.generator = generator
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.pdf_workers = pdf_workers
+        self.metrics = generator.metrics
+        self.history = history or HistoryStore()
+        self.refresh_interval = refresh_interval
+        # Search index over the history, keyed by history entry id
+        self.index = SearchIndex()
+        self.queue = None
+        self.pdf_executor = None
+        self._tasks = []
+        self._indexed_through = 0
+
+    async def start(self, app):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        # SQLite calls stay off the event loop
+        await asyncio.get_event_loop().run_in_executor(None, self.sync_index)
+        self._tasks = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.ensure_future(self._refresh()))
+        # PDF rendering is CPU-bound, so it runs outside the event loop's process
+        self.pdf_executor = ProcessPoolExecutor(max_workers=self.pdf_workers or os.cpu_count())
+
+    async def stop(self, app):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.pdf_executor.shutdown()
+
+    async def _work(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            job, future, deadline = await self.queue.get()
+            try:
+                # Timed out or disconnected while still queued: skip it
+                if future.cancelled():
+                    continue
+                try:
+                    result = await asyncio.wait_for(job(), max(0, deadline - loop.time()))
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+            finally:
+                self.queue.task_done()
+
+    def sync_index(self):
+        """Index history entries added since the last sync and drop entries no longer in the history."""
+        for entry_id, restaurant in self.history.documents(self._indexed_through):
+            self.index.add(restaurant, entry_id)
+            self._indexed_through = entry_id
+        # Ids above this may have been stored and indexed by _remember since the ids were read
+        through = self._indexed_through
+        kept = self.history.ids()
+        for entry_id in self.index.ids():
+            if entry_id <= through and entry_id not in kept:
+                self.index.remove(entry_id)
+
+    async def _refresh(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await loop.run_in_executor(None, self.sync_index)
+            except sqlite3.Error:
+                # Locked or unreadable for now; the next pass catches up
+                self.metrics.inc('search_index_refresh_errors_total')
+
+    def _store(self, restaurant, owner):
+        self.index.add(restaurant, self.history.add(restaurant, owner))
+
+    async def _remember(self, request, restaurant):
+        """Add a generated restaurant to the history under the client's session and index it."""
+        owner = request.headers.get('X-Session-Id') or "api"
+        await asyncio.get_event_loop().run_in_executor(None, self._store, restaurant, owner)
+
+    async def submit(self, job):
+        """Queue job (a coroutine function) and wait for its result.
+
+        Raises asyncio.QueueFull when the queue is full and asyncio.TimeoutError
+        when the result is not ready within the timeout.
+        """
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self.queue.put_nowait((job, future, loop.time() + self.timeout))
+        return await asyncio.wait_for(future, self.timeout)
+
+    def _scheduled(self, request, make_coroutine):
+        """Run the call as interactive work, queued fairly per client session."""
+        session = request.headers.get('X-Session-Id') or request.remote
+
+        async def job():
+            with scheduling("interactive", session):
+                return await make_coroutine()
+
+        return job
+
+    async def concept(self, request):
+        spec = _spec(await _read_json(request, 'cuisine'))
+        result = await self.submit(self._scheduled(
+            request, lambda: self.generator.agenerate_complete_concept(**spec)))
+        return web.json_response(result)
+
+    async def menu(self, request):
+        body = await _read_json(request, 'restaurant_name', 'cuisine', 'concept')
+        result = await self.submit(self._scheduled(request, lambda: self.generator.agenerate_detailed_menu(
+            body['restaurant_name'],
+            body['cuisine'],
+            body['concept'],
+            body.get('price_range') or "$$",
+            force_fresh=bool(body.get('force_fresh'))
+        )))
+        return web.json_response(result)
+
+    async def restaurant(self, request):
+        spec = _spec(await _read_json(request, 'cuisine'))
+        result = await self.submit(self._scheduled(
+            request, lambda: self.generator.agenerate_full_restaurant(**spec)))
+        await self._remember(request, result)
+        return web.json_response(result)
+
+    async def pdf(self, request):
+        body = await _read_json(request)
+        if isinstance(body.get('concept'), dict) and isinstance(body.get('menu'), dict):
+            restaurant = body
+        elif body.get('cuisine'):
+            spec = _spec(body)
+            restaurant = await self.submit(self._scheduled(
+                request, lambda: self.generator.agenerate_full_restaurant(**spec)))
+            await self._remember(request, restaurant)
+        else:
+            raise BadRequest("Send a restaurant (concept and menu) or a spec with a cuisine")
+
+        loop = asyncio.get_event_loop()
+        try:
+            filename, pdf = await loop.run_in_executor(self.pdf_executor, _render, restaurant)
+        except (KeyError, TypeError, AttributeError):
+            raise BadRequest("Restaurant is missing fields needed for the PDF")
+        return web.Response(body=pdf, content_type="application/pdf",
+                            headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+    @staticmethod
+    def _price(query, name):
+        try:
+            return float(query[name]) if query.get(name) else None
+        except ValueError:
+            raise BadRequest(f"{name} must be a number")
+
+    @staticmethod
+    def _limit(query):
+        try:
+            return min(int(query.get('limit', 20)), 200)
+        except ValueError:
+            raise BadRequest("limit must be an integer")
+
+    async def search_concepts(self, request):
+        query = request.query
+        results = self.index.search_concepts(query.get('q'), query.get('cuisine'), query.get('style'),
+                                             query.get('price_range'), limit=self._limit(query))
+        return web.json_response({'results': results})
+
+    async def search_items(self, request):
+        query = request.query
+        results = self.index.search_items(
+            query.get('q'),
+            dietary=query.getall('dietary', []),
+            section=query.get('section'),
+            min_price=self._price(query, 'min_price'),
+            max_price=self._price(query, 'max_price'),
+            cuisine=query.get('cuisine'),
+            style=query.get('style'),
+            price_range=query.get('price_range'),
+            limit=self._limit(query)
+        )
+        return web.json_response({'results': results})
+
+    async def stored_restaurant(self, request):
+        try:
+            restaurant = self.index.get(int(request.match_info['restaurant_id']))
+        except ValueError:
+            restaurant = None
+        if restaurant is None:
+            return _error(404, "No such restaurant")
+        return web.json_response(restaurant)
+
+    async def healthz(self, request):
+        return web.json_response({
+            'status': "ok",
+            'queued': self.queue.qsize(),
+            'queue_size': self.queue_size,
+            'workers': self.workers,
+            'indexed': len(self.index)
+        })
+
+    async def metrics_endpoint(self, request):
+        exporter = EXPORTERS['json' if request.query.get('format') == "json" else 'prometheus']
+        return web.Response(body=self.metrics.export(exporter).encode(),
+                            headers={'Content-Type': exporter.content_type})
+
+    @web.middleware
+    async def errors(self, request, handler):
+        """Map failures to status codes and record per-route request metrics."""
+        start = time.perf_counter()
+        try:
+            response = await handler(request)
+        except BadRequest as e:
+            response = _error(400, str(e))
+        except asyncio.QueueFull:
+            response = _error(429, "Too many requests queued, try again shortly", **{'Retry-After': "1"})
+        except asyncio.TimeoutError:
+            response = _error(504, f"No result within {self.timeout:g}s")
+        except QueueTimeout as e:
+            response = _error(503, str(e), **{'Retry-After': "10"})
+        except SchemaError as e:
+            response = _error(502, f"Model reply failed validation: {e}")
+        except web.HTTPException:
+            raise
+        except Exception as e:
+            response = _error(500, f"{type(e).__name__}: {e}")
+
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else "unmatched"
+        self.metrics.inc('http_requests_total', route=route, status=response.status)
+        self.metrics.observe('http_request_seconds', time.perf_counter() - start, route=route)
+        return response
+
+
+# Where create_app keeps the ConceptService
+SERVICE = web.AppKey("service", ConceptService)
+
+
+def create_app(generator=None, workers=None, queue_size=None, timeout=None, pdf_workers=None, history=None,
+               refresh_interval=None):
+    """Build the aiohttp application.
+
+    Settings default to the CONCEPTKITCHEN_SERVER_* env vars, and the
+    history to HistoryStore.from_env().
+    """
+    service = ConceptService(
+        generator or RestaurantConceptGenerator(),
+        workers=workers or int(os.getenv("CONCEPTKITCHEN_SERVER_WORKERS", "4")),
+        queue_size=queue_size or int(os.getenv("CONCEPTKITCHEN_SERVER_QUEUE", "64")),
+        timeout=timeout or float(os.getenv("CONCEPTKITCHEN_SERVER_TIMEOUT", "60")),
+        pdf_workers=pdf_workers,
+        history=history or HistoryStore.from_env(),
+        refresh_interval=refresh_interval or float(os.getenv("CONCEPTKITCHEN_SERVER_INDEX_REFRESH", "5"))
+    )
+    app = web.Application(middlewares=[service.errors])
+    app[SERVICE] = service
+    app.on_startup.append(service.start)
+    app.on_cleanup.append(service.stop)
+    app.add_routes([
+        web.post('/concept', service.concept),
+        web.post('/menu', service.menu),
+        web.post('/restaurant', service.restaurant),
+        web.post('/pdf', service.pdf),
+        web.get('/search/concepts', service.search_concepts),
+        web.get('/search/items', service.search_items),
+        web.get('/restaurants/{restaurant_id}', service.stored_restaurant),
+        web.get('/healthz', service.healthz),
+        web.get('/metrics', service.metrics_endpoint)
+    ])
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ConceptKitchen HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="concurrent generations")
+    parser.add_argument("--queue-size", type=int, default=None, help="queued requests before answering 429")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per request, queueing included")
+    parser.add_argument("--refresh", type=float, default=None,
+                        help="seconds between search index syncs with the shared history")
+    parser.add_argument("--fake", action="store_true", help="use fake_llm.FakeChatModel instead of Groq")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake backend seconds per call")
+    args = parser.parse_args()
+
+    llm = FakeChatModel(latency=args.latency) if args.fake else None
+    app = create_app(RestaurantConceptGenerator(llm=llm), args.workers, args.queue_size, args.timeout,
+                     refresh_interval=args.refresh)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app modules are flat and import each other by name, as when run from app/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
@@ -0,0 +1,72 @@
+import io
+import json
+import pytest
+from batch import BatchError, load_checkpoint, read_specs, run_batch
+from chains import RestaurantConceptGenerator
+from fake_llm import FakeChatModel
+from history import HistoryStore
+from metrics import Metrics
+
+
+def _generator():
+    return RestaurantConceptGenerator(cache=False, llm=FakeChatModel(latency=0), metrics=Metrics())
+
+
+SPECS = [{'cuisine': "Thai"}, {'cuisine': "Thai"}, {'cuisine': "Greek", 'style': "Bistro"}, {'cuisine': "Thai"}]
+
+
+def _rows(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_read_specs_names_the_bad_line():
+    assert read_specs(io.StringIO('{"cuisine": "Thai"}\n\n{"cuisine": "Greek"}\n')) == \
+        [{'cuisine': "Thai"}, {'cuisine': "Greek"}]
+    with pytest.raises(BatchError, match="Line 2"):
+        read_specs(io.StringIO('{"cuisine": "Thai"}\n{"style": "Bistro"}\n'))
+
+
+def test_repeated_specs_get_distinct_restaurants(tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    summary = run_batch(_generator(), SPECS, output)
+
+    assert summary['generated'] == 4
+    thai = [row['restaurant']['concept'] for row in _rows(output) if row['spec'] == {'cuisine': "Thai"}]
+    assert len(thai) == 3
+    assert len({json.dumps(concept, sort_keys=True) for concept in thai}) == 3
+
+
+def test_resume_after_truncated_last_line(tmp_path):
+    output = tmp_path / "out.jsonl"
+    run_batch(_generator(), SPECS, str(output))
+    lines = output.read_text().splitlines(keepends=True)
+
+    # Crash mid-write: two complete rows and half of a third
+    output.write_text(lines[0] + lines[1] + lines[2][:40])
+    kept = {json.loads(line)['index'] for line in lines[:2]}
+    assert set(load_checkpoint(str(output), SPECS)) == kept
+
+    summary = run_batch(_generator(), SPECS, str(output))
+    assert summary['skipped'] == 2
+    assert summary['generated'] == 2
+    rows = _rows(str(output))
+    assert sorted(row['index'] for row in rows) == [0, 1, 2, 3]
+    assert [row['index'] for row in rows[:2]] == [json.loads(line)['index'] for line in lines[:2]]
+
+
+def test_checkpoint_from_other_specs_is_refused(tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    run_batch(_generator(), SPECS, output)
+    with pytest.raises(BatchError):
+        run_batch(_generator(), [{'cuisine': "Korean"}] * 4, output)
+
+
+def test_history_records_new_rows_only(tmp_path):
+    output = tmp_path / "out.jsonl"
+    history = HistoryStore()
+    run_batch(_generator(), SPECS[:2], str(output), history=history)
+    run_batch(_generator(), SPECS, str(output), history=history)
+
+    assert history.count("batch") == 4
+    assert [restaurant for _, restaurant in history.documents()] == [row['restaurant'] for row in _rows(output)]
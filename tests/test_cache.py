@@ -0,0 +1,54 @@
+import logging
+import cache
+from cache import ResponseCache
+
+
+def _disk_hit(store, key):
+    """Read key from disk, bypassing the memory level."""
+    store._memory.clear()
+    return store.get(key)
+
+
+def _accessed_at(store, key):
+    return store._db.execute("SELECT accessed_at FROM responses WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_disk_hits_write_access_times_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'ACCESS_FLUSH_BATCH', 3)
+    store = ResponseCache(path=str(tmp_path / "cache.db"))
+    for key in "abc":
+        store.set(key, key.upper())
+    stored_at = _accessed_at(store, "a")
+
+    assert _disk_hit(store, "a") == "A"
+    assert _disk_hit(store, "b") == "B"
+    assert _accessed_at(store, "a") == stored_at
+    assert store._db.in_transaction is False
+
+    _disk_hit(store, "c")
+    assert _accessed_at(store, "a") > stored_at
+    assert store._accessed == {}
+
+
+def test_eviction_sees_pending_access_times(tmp_path):
+    store = ResponseCache(path=str(tmp_path / "cache.db"), max_disk_entries=2)
+    store.set("old", "1")
+    store.set("new", "2")
+    _disk_hit(store, "old")
+    store.set("newest", "3")
+
+    store._memory.clear()
+    assert store.get("old") == "1"
+    assert store.get("new") is None
+
+
+def test_failed_disk_write_is_logged_and_kept_in_memory(tmp_path, caplog):
+    store = ResponseCache(path=str(tmp_path / "cache.db"))
+    store.set("a", "A")
+    store._db.execute("PRAGMA query_only = ON")
+
+    with caplog.at_level(logging.WARNING, logger="cache"):
+        store.set("b", "B")
+    assert "Could not write to the response cache" in caplog.text
+    assert store.get("b") == "B"
+    assert store._disk_count == 1
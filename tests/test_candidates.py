@@ -0,0 +1,70 @@
+import asyncio
+from cache import ResponseCache
+from candidates import CandidateStore, rank_candidates
+from chains import RestaurantConceptGenerator
+from fake_llm import FakeChatModel
+from metrics import Metrics
+
+THAI = ("Thai", "Casual Dining", "$$")
+
+
+def _concept(name, points=3, **fields):
+    return dict({'name': name, 'tagline': "Fresh every day", 'concept': "A small room with a big grill.",
+                 'signature_dish': "Grilled fish", 'unique_selling_points': ["Point"] * points}, **fields)
+
+
+def _names(concepts):
+    return [concept['name'] for concept in concepts]
+
+
+def test_ranking_sinks_names_close_to_history_and_to_each_other():
+    candidates = [_concept("Golden Lotus"), _concept("Golden Lotus Too"), _concept("Ember Room")]
+    assert _names(rank_candidates(candidates)) == ["Golden Lotus", "Ember Room", "Golden Lotus Too"]
+    assert _names(rank_candidates(candidates, history=["Golden Lotus"]))[0] == "Ember Room"
+
+
+def test_ranking_prefers_complete_concepts_within_length_limits():
+    short = _concept("Basil House", points=1)
+    wordy = _concept("Saffron Table", tagline="x" * 200)
+    complete = _concept("Night Market")
+    assert _names(rank_candidates([short, wordy, complete])) == ["Night Market", "Saffron Table", "Basil House"]
+
+
+def test_store_hands_out_each_spare_once_and_remembers_it():
+    store = CandidateStore(max_per_combo=2)
+    assert store.take(THAI) is None and not store.requested_before(THAI)
+
+    store.put(THAI, [_concept("A"), _concept("B"), _concept("C")])
+    assert store.requested_before(THAI)
+    assert store.available(THAI) == 2
+    assert _names([store.take(THAI), store.take(THAI)]) == ["B", "C"]
+    assert store.take(THAI) is None
+    assert list(store.history) == ["B", "C"]
+
+
+def test_next_idea_serves_spares_before_asking_for_new_ones(tmp_path):
+    llm = FakeChatModel()
+    generator = RestaurantConceptGenerator(cache=ResponseCache(path=str(tmp_path / "cache.db")), llm=llm,
+                                           metrics=Metrics(), candidates=3)
+
+    served = [generator.generate_complete_concept(*THAI) for _ in range(3)]
+    assert sum(llm._prompt_calls.values()) == 1
+    assert len(set(_names(served))) == 3
+
+    # With the spares used up a cached answer would only repeat them, so new ideas are requested
+    fourth = generator.generate_complete_concept(*THAI)
+    assert sum(llm._prompt_calls.values()) == 2
+    assert fourth['name'] not in _names(served)
+    assert list(generator.candidates.history)[:4] == _names(served) + [fourth['name']]
+
+
+def test_async_next_idea_uses_the_same_spares():
+    llm = FakeChatModel()
+    generator = RestaurantConceptGenerator(cache=False, llm=llm, metrics=Metrics(), candidates=2)
+
+    async def run():
+        return [await generator.agenerate_complete_concept(*THAI) for _ in range(2)]
+
+    first, second = asyncio.run(run())
+    assert sum(llm._prompt_calls.values()) == 1
+    assert first['name'] != second['name']
@@ -0,0 +1,64 @@
+import asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from clients import ClientPool
+
+
+async def _hello(request):
+    return web.Response(text="ok")
+
+
+async def _fetch(client):
+    """Make a keep-alive request to a local server; returns the server for stopping later."""
+    app = web.Application()
+    app.router.add_get("/", _hello)
+    server = TestServer(app)
+    await server.start_server()
+    response = await client.get(str(server.make_url("/")))
+    assert response.text == "ok"
+    return server
+
+
+def test_close_closes_connections_of_an_idle_loop():
+    pool = ClientPool()
+    client = pool.async_http_client()
+    loop = asyncio.new_event_loop()
+    try:
+        server = loop.run_until_complete(_fetch(client))
+        transport = pool._async_transport._transports[loop]
+        assert transport._pool.connections
+
+        pool.close()
+        assert transport._pool.connections == []
+        assert pool._async_http_client is None
+        loop.run_until_complete(server.close())
+    finally:
+        loop.close()
+
+
+def test_close_from_inside_a_running_loop():
+    pool = ClientPool()
+    client = pool.async_http_client()
+
+    async def run():
+        server = await _fetch(client)
+        transport = pool._async_transport._transports[asyncio.get_running_loop()]
+        pool.close()
+        await asyncio.sleep(0.05)
+        assert transport._pool.connections == []
+        await server.close()
+
+    asyncio.run(run())
+
+
+def test_close_skips_loops_that_are_gone():
+    pool = ClientPool()
+    client = pool.async_http_client()
+
+    async def run():
+        server = await _fetch(client)
+        await server.close()
+
+    asyncio.run(run())
+    pool.close()
+    assert pool._async_transport is None
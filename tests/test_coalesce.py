@@ -0,0 +1,142 @@
+import time
+import asyncio
+import threading
+import pytest
+from chains import RestaurantConceptGenerator
+from coalesce import SingleFlight
+from fake_llm import FakeChatModel
+from metrics import Metrics
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def call():
+        calls.append(1)
+        release.wait(2)
+        return "reply"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", call))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while len(calls) < 1:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [("reply", False)] + [("reply", True)] * 3
+    assert len(flight) == 0
+
+
+def test_errors_reach_every_caller_and_are_not_kept():
+    async def run():
+        flight = SingleFlight()
+        calls = []
+
+        async def fail():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            raise ValueError("bad reply")
+
+        results = await asyncio.gather(*(flight.ado("key", fail) for _ in range(3)), return_exceptions=True)
+        assert len(calls) == 1
+        assert all(isinstance(result, ValueError) for result in results)
+
+        async def succeed():
+            return "reply"
+
+        # The failure is forgotten: the next caller makes a new call
+        assert await flight.ado("key", succeed) == ("reply", False)
+        assert len(flight) == 0
+
+    asyncio.run(run())
+
+
+def test_sync_and_async_callers_coalesce():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def call():
+        started.set()
+        time.sleep(0.1)
+        return "reply"
+
+    thread_result = []
+    thread = threading.Thread(target=lambda: thread_result.append(flight.do("key", call)))
+    thread.start()
+    started.wait(2)
+
+    async def never():
+        raise AssertionError("should have shared the threaded call")
+
+    assert asyncio.run(flight.ado("key", never)) == ("reply", True)
+    thread.join()
+    assert thread_result == [("reply", False)]
+
+
+def test_follower_takes_over_from_a_cancelled_leader():
+    async def run():
+        flight = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return "reply"
+
+        leader = asyncio.ensure_future(flight.ado("key", call))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.ado("key", call))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await follower == ("reply", False)
+        assert len(calls) == 2
+
+    asyncio.run(run())
+
+
+def _generator(latency):
+    return RestaurantConceptGenerator(cache=False, llm=FakeChatModel(latency=latency), metrics=Metrics())
+
+
+def test_abandoned_stream_hands_its_call_to_a_waiting_caller():
+    generator = _generator(0.3)
+    stream = generator.stream_full_restaurant("Thai")
+    next(stream)
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(generator.generate_complete_concept("Thai")))
+    waiter.start()
+    time.sleep(0.1)
+    stream.close()
+    waiter.join(5)
+
+    assert results and results[0]['name']
+
+
+def test_stream_takes_over_from_a_cancelled_async_leader():
+    generator = _generator(0.3)
+
+    async def run():
+        leader = asyncio.ensure_future(generator.agenerate_complete_concept("Thai"))
+        await asyncio.sleep(0.05)
+        loop = asyncio.get_event_loop()
+        follower = loop.run_in_executor(None, lambda: list(generator.stream_full_restaurant("Thai")))
+        await asyncio.sleep(0.1)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    snapshots = asyncio.run(run())
+    assert snapshots[-1]['concept']['name']
+    assert snapshots[-1]['menu']
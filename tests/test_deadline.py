@@ -0,0 +1,72 @@
+import time
+import pytest
+from chains import MENU_SECTIONS, RestaurantConceptGenerator
+from fake_llm import FakeChatModel
+from metrics import Metrics
+
+
+class _SlowSectionModel(FakeChatModel):
+    """Fake model that answers the prompt naming `slow` section after `slow_latency` seconds."""
+
+    slow: str = ""
+    slow_latency: float = 0.0
+    error: str = ""
+
+    def _reply(self, messages):
+        text, delay, usage = super()._reply(messages)
+        prompt = self._prompt_text(messages)
+        if self.error and self.error in prompt:
+            raise ValueError("model refused")
+        if self.slow and f'"{self.slow}"' in prompt:
+            delay = self.slow_latency
+        return text, delay, usage
+
+
+def _generator(llm):
+    return RestaurantConceptGenerator(cache=False, llm=llm, metrics=Metrics())
+
+
+def test_budget_returns_what_finished_and_keeps_generating():
+    generator = _generator(_SlowSectionModel(latency=0.02, slow="desserts", slow_latency=0.6))
+    start = time.perf_counter()
+    pending = generator.generate_within(0.3, "Thai")
+    assert time.perf_counter() - start < 0.5
+
+    assert not pending.complete
+    assert pending.missing_sections() == ['desserts']
+    snapshot = pending.snapshot()
+    assert snapshot['concept']['name']
+    assert list(snapshot['menu']) == [section for section in MENU_SECTIONS if section != 'desserts']
+    with pytest.raises(TimeoutError):
+        pending.result(timeout=0)
+
+    # The rest lands in the background
+    restaurant = pending.result(timeout=2)
+    assert pending.complete and pending.missing_sections() == []
+    assert list(restaurant['menu']) == list(MENU_SECTIONS)
+
+
+def test_budget_shorter_than_the_concept_returns_an_empty_snapshot():
+    pending = _generator(FakeChatModel(latency=0.3)).generate_within(0.05, "Thai")
+
+    snapshot = pending.snapshot()
+    assert snapshot['concept'] == {} and snapshot['menu'] == {}
+    assert snapshot['metadata']['cuisine'] == "Thai"
+    assert pending.missing_sections() == list(MENU_SECTIONS)
+    assert pending.result(timeout=3)['concept']['name']
+
+
+def test_generous_budget_returns_the_whole_restaurant():
+    pending = _generator(FakeChatModel(latency=0.01)).generate_within(2, "Thai")
+
+    assert pending.complete and pending.error is None
+    assert list(pending.result()['menu']) == list(MENU_SECTIONS)
+
+
+def test_failed_generation_is_reported_by_result():
+    pending = _generator(_SlowSectionModel(error='"mains"')).generate_within(2, "Thai")
+
+    assert pending.complete
+    assert isinstance(pending.error, ValueError)
+    with pytest.raises(ValueError):
+        pending.result()
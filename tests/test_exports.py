@@ -0,0 +1,95 @@
+import json
+import threading
+import pytest
+import exports
+from benchmark import SAMPLE_RESTAURANT
+from exports import ExportCache, restaurant_fingerprint
+
+
+class _Renderers:
+    """Stand-in renderers noting each render; 'slow' waits for `release`, names in `failing` fail once."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.failing = set()
+
+    def renderer(self, kind):
+        def render(restaurant):
+            name = restaurant['concept']['name']
+            self.calls.append((kind, name))
+            if kind == 'slow':
+                self.release.wait(2)
+            if name in self.failing:
+                self.failing.discard(name)
+                raise ValueError("render failed")
+            return f"{kind}:{name}".encode()
+        return render
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    renderers = _Renderers()
+    monkeypatch.setattr(exports, 'RENDERERS', {kind: renderers.renderer(kind) for kind in ('pdf', 'json', 'slow')})
+    return renderers
+
+
+def _restaurant(name):
+    return {'concept': {'name': name}, 'menu': {}}
+
+
+def test_fingerprint_depends_on_content_only():
+    first = {'concept': {'name': "Ember", 'tagline': "Hot"}, 'menu': {}}
+    second = {'menu': {}, 'concept': {'tagline': "Hot", 'name': "Ember"}}
+    assert restaurant_fingerprint(first) == restaurant_fingerprint(second)
+    assert restaurant_fingerprint(first) != restaurant_fingerprint(_restaurant("Ember"))
+
+
+def test_identical_restaurants_share_one_render(renders):
+    cache = ExportCache()
+    assert cache.get(_restaurant("Ember"), 'pdf') is None
+
+    futures = [cache.request(_restaurant("Ember"), 'pdf') for _ in range(3)]
+    assert len({id(future) for future in futures}) == 1
+    assert futures[0].result(2) == b"pdf:Ember"
+    assert cache.get(_restaurant("Ember"), 'pdf') == b"pdf:Ember"
+
+    assert cache.request(_restaurant("Ember"), 'json').result(2) == b"json:Ember"
+    assert renders.calls == [('pdf', "Ember"), ('json', "Ember")]
+
+
+def test_get_does_not_wait_for_a_running_render(renders):
+    cache = ExportCache()
+    future = cache.request(_restaurant("Ember"), 'slow')
+    assert cache.get(_restaurant("Ember"), 'slow') is None
+    renders.release.set()
+    assert future.result(2) == b"slow:Ember"
+    assert cache.get(_restaurant("Ember"), 'slow') == b"slow:Ember"
+
+
+def test_failed_render_is_retried(renders):
+    cache = ExportCache()
+    renders.failing.add("Ember")
+    with pytest.raises(ValueError):
+        cache.request(_restaurant("Ember"), 'pdf').result(2)
+    assert cache.get(_restaurant("Ember"), 'pdf') is None
+
+    assert cache.request(_restaurant("Ember"), 'pdf').result(2) == b"pdf:Ember"
+    assert len(renders.calls) == 2
+
+
+def test_least_recently_used_export_is_dropped(renders):
+    cache = ExportCache(max_entries=2)
+    for name in ("A", "B"):
+        cache.request(_restaurant(name), 'json').result(2)
+    assert cache.get(_restaurant("A"), 'json') == b"json:A"
+
+    cache.request(_restaurant("C"), 'json').result(2)
+    assert cache.get(_restaurant("A"), 'json') == b"json:A"
+    assert cache.get(_restaurant("B"), 'json') is None
+
+
+def test_real_renderers():
+    cache = ExportCache()
+    assert cache.request(SAMPLE_RESTAURANT, 'pdf').result(10).startswith(b"%PDF")
+    assert json.loads(cache.request(SAMPLE_RESTAURANT, 'json').result(10)) == SAMPLE_RESTAURANT
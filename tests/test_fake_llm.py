@@ -0,0 +1,23 @@
+from fake_llm import FakeChatModel
+
+
+def _replies(model, prompts):
+    return [model.invoke(prompt).content for prompt in prompts]
+
+
+def test_replies_are_reproducible_per_seed_and_prompt():
+    prompts = ["Cuisine: Thai", "Cuisine: Greek", "Cuisine: Thai"]
+    first = _replies(FakeChatModel(seed=1), prompts)
+
+    assert first == _replies(FakeChatModel(seed=1), prompts)
+    # A repeated prompt gets a new reply
+    assert first[0] != first[2]
+    assert first != _replies(FakeChatModel(seed=2), prompts)
+
+
+def test_other_models_do_not_shift_the_sequence():
+    model = FakeChatModel(seed=1)
+    expected = _replies(FakeChatModel(seed=1), ["Cuisine: Thai"] * 2)
+    FakeChatModel(seed=1).invoke("Cuisine: Thai")
+    model.invoke("Cuisine: Greek")
+    assert _replies(model, ["Cuisine: Thai"] * 2) == expected
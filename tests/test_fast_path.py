@@ -0,0 +1,76 @@
+import json
+import pytest
+import chains
+from chains import RestaurantConceptGenerator
+from fake_llm import FakeChatModel
+from metrics import Metrics
+from schema import SchemaError, clean_name_items
+
+
+class _ScriptedModel(FakeChatModel):
+    """Fake model whose first replies are replaced by `script`."""
+
+    script: list = []
+
+    def _reply(self, messages):
+        text, delay, usage = super()._reply(messages)
+        if self.script:
+            text = self.script.pop(0)
+        return text, delay, usage
+
+
+def _calls(llm):
+    return sum(llm._prompt_calls.values())
+
+
+def test_name_items_is_one_small_call():
+    llm = FakeChatModel()
+    generator = RestaurantConceptGenerator(cache=False, llm=llm, metrics=Metrics())
+    result = generator.generate_name_items("Thai", count=5)
+
+    assert _calls(llm) == 1
+    assert set(result) == {'name', 'tagline', 'menu_items'}
+    assert result['name'] and len(result['menu_items']) == 5
+
+
+def test_unusable_name_items_reply_is_requested_again():
+    llm = _ScriptedModel(script=[json.dumps({'name': "", 'menu_items': []})])
+    generator = RestaurantConceptGenerator(cache=False, llm=llm, metrics=Metrics())
+    result = generator.generate_name_items("Thai")
+
+    assert _calls(llm) == 2
+    assert result['name'] and result['menu_items']
+    key = ('llm_rerequests_total', (('reason', "SchemaError"), ('stage', "name_items")))
+    assert generator.metrics._counters[key] == 1
+
+
+def test_clean_name_items():
+    value = {'name': " Ember ", 'menu_items': "Soup, Curry, , Rice, Noodles"}
+    assert clean_name_items(value, 3) == {'name': "Ember", 'tagline': "", 'menu_items': ["Soup", "Curry", "Rice"]}
+    with pytest.raises(SchemaError):
+        clean_name_items({'name': "Ember"}, 3)
+
+
+def test_legacy_functions_make_one_call_on_the_fast_tier(monkeypatch):
+    monkeypatch.setenv("CONCEPTKITCHEN_CACHE_DISABLED", "1")
+    monkeypatch.setattr(chains, 'FAST_MODEL', "fast-model")
+    monkeypatch.setattr(chains, '_fast_generator', None)
+    monkeypatch.setattr(chains, 'get_llm', lambda model_name, temperature: FakeChatModel(model_name=model_name))
+    monkeypatch.setattr(chains, 'get_rate_scheduler', lambda model_name: False)
+
+    result = chains.generate_restaurant_name_items("Thai")
+    fast = chains.get_fast_generator()
+    assert fast.llm.model_name == "fast-model"
+    assert _calls(fast.llm) == 1
+    assert result['restaurant_name'] and len(result['menu_items'].split(", ")) == 7
+
+    result = chains.generate_restaurant_name_items_parallel("Thai")
+    assert set(result) == {'restaurant_name', 'tagline', 'menu_items'}
+    assert chains.get_fast_generator() is fast
+
+
+def test_fast_tier_is_the_shared_generator_unless_configured(monkeypatch):
+    monkeypatch.setattr(chains, 'FAST_MODEL', chains.DEFAULT_MODEL)
+    shared = RestaurantConceptGenerator(cache=False, llm=FakeChatModel(), metrics=Metrics())
+    monkeypatch.setattr(chains, '_shared_generator', shared)
+    assert chains.get_fast_generator() is shared
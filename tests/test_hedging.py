@@ -0,0 +1,142 @@
+import time
+import asyncio
+from chains import RestaurantConceptGenerator
+from fake_llm import FakeChatModel
+from hedging import Hedger, LatencyWindow
+from metrics import Metrics
+from ratelimit import RateScheduler
+
+
+def _hedger(delay=0.05):
+    """A hedger that hedges every stage after `delay` seconds."""
+    window = LatencyWindow()
+    window.add("stage", delay)
+    return Hedger(percentile=50, min_samples=1, max_retries=0, window=window, metrics=Metrics())
+
+
+def test_async_hedge_win_cancels_the_slow_attempt():
+    async def run():
+        hedger = _hedger()
+        started, cancelled = [], []
+
+        async def call():
+            started.append(len(started))
+            try:
+                # The first attempt hangs; the hedge answers at once
+                await asyncio.sleep(10 if len(started) == 1 else 0)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return len(started)
+
+        result = await asyncio.wait_for(hedger.acall(call, "stage"), 2)
+        await asyncio.sleep(0)
+        return result, started, cancelled
+
+    result, started, cancelled = asyncio.run(run())
+    assert result == 2
+    assert len(started) == 2
+    assert cancelled == [True]
+
+
+def test_hedge_is_skipped_without_spare_budget():
+    hedger = _hedger()
+    calls = []
+
+    def call():
+        calls.append(1)
+        time.sleep(0.15)
+        return "reply"
+
+    assert hedger.call(call, "stage", may_hedge=lambda: False) == "reply"
+    assert len(calls) == 1
+    assert hedger.metrics._counters[('llm_hedges_total', (('outcome', "skipped"), ('stage', "stage")))] == 1
+
+
+def test_reserve_runs_per_attempt_outside_the_latency_window():
+    hedger = Hedger(percentile=0, max_retries=0, metrics=Metrics())
+    reserved = []
+
+    def reserve():
+        reserved.append(1)
+        time.sleep(0.2)
+
+    assert hedger.call(lambda: "reply", "stage", reserve=reserve) == "reply"
+    assert reserved == [1]
+    assert hedger.window.percentile("stage", 100) < 0.1
+
+
+def test_async_reserve_is_awaited_before_the_attempt():
+    async def run():
+        hedger = Hedger(percentile=0, max_retries=0, metrics=Metrics())
+        order = []
+
+        async def reserve():
+            order.append("reserve")
+            await asyncio.sleep(0.2)
+
+        async def call():
+            order.append("call")
+            return "reply"
+
+        return await hedger.acall(call, "stage", reserve=reserve), order, hedger
+
+    result, order, hedger = asyncio.run(run())
+    assert result == "reply"
+    assert order == ["reserve", "call"]
+    assert hedger.window.percentile("stage", 100) < 0.1
+
+
+class _SettleRecordingScheduler(RateScheduler):
+    """Scheduler noting every budget it hands out and every settlement."""
+
+    def __init__(self):
+        super().__init__(rpm=600, tpm=10 ** 9, metrics=Metrics())
+        self.taken = []
+        self.settled = []
+
+    def acquire(self, tokens):
+        self.taken.append(tokens)
+        return super().acquire(tokens)
+
+    async def aacquire(self, tokens):
+        self.taken.append(tokens)
+        return await super().aacquire(tokens)
+
+    def try_acquire(self, tokens):
+        granted = super().try_acquire(tokens)
+        if granted:
+            self.taken.append(tokens)
+        return granted
+
+    def settle(self, estimated_tokens, actual_tokens):
+        self.settled.append((estimated_tokens, actual_tokens))
+        super().settle(estimated_tokens, actual_tokens)
+
+
+def _hedged_generator(scheduler):
+    hedger = _hedger()
+    hedger.window.add("concept", 0.05)
+    return RestaurantConceptGenerator(cache=False, llm=FakeChatModel(latency=0.2), metrics=Metrics(),
+                                      scheduler=scheduler, hedger=hedger)
+
+
+def test_hedge_reservations_are_settled():
+    scheduler = _SettleRecordingScheduler()
+    generator = _hedged_generator(scheduler)
+    generator.generate_complete_concept("Thai")
+
+    assert len(scheduler.taken) == 2
+    assert [estimated for estimated, _ in scheduler.settled] == scheduler.taken
+    # One attempt answered and is settled with its usage; the other gives back its reply estimate
+    actual = sorted(spent for _, spent in scheduler.settled)
+    assert actual[0] < scheduler.taken[0] and actual[0] != actual[1]
+
+
+def test_async_hedge_reservations_are_settled():
+    scheduler = _SettleRecordingScheduler()
+    generator = _hedged_generator(scheduler)
+    asyncio.run(generator.agenerate_complete_concept("Thai"))
+
+    assert len(scheduler.taken) == 2
+    assert [estimated for estimated, _ in scheduler.settled] == scheduler.taken
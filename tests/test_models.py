@@ -0,0 +1,57 @@
+import copy
+import pytest
+from models import MenuItem, Restaurant
+
+
+RESTAURANT = {
+    'concept': {
+        'name': "Ember Courtyard",
+        'tagline': "Fire, smoke and friends",
+        'concept': "Open-fire Thai cooking",
+        'ambiance': "Lanterns",
+        'target_audience': "Groups",
+        'signature_dish': "Charred duck",
+        'unique_selling_points': ["Open kitchen", "Late hours"]
+    },
+    'menu': {
+        'mains': [
+            {'name': "Duck", 'description': "Charred", 'price': "$28.50", 'dietary': ["spicy", "gluten-free"]},
+            {'name': "Catch", 'description': "", 'price': "$XX", 'dietary': ["pescatarian, line-caught", "vegan"]},
+            {'name': "Special", 'description': "Ask us", 'price': "Market price", 'dietary': []},
+            {'name': "Water", 'description': "", 'price': None, 'dietary': ["Vegan"]}
+        ],
+        'desserts': [{'name': "Sorbet", 'description': "Mango", 'price': "$9", 'dietary': ["vegan", "dairy-free"]}]
+    },
+    'metadata': {'cuisine': "Thai", 'style': "Bistro", 'price_range': "$$"}
+}
+
+
+@pytest.mark.parametrize("encode, decode", [
+    (lambda restaurant: restaurant.to_dict(), Restaurant.from_dict),
+    (Restaurant.to_json, Restaurant.from_json),
+    (Restaurant.to_bytes, Restaurant.from_bytes)
+])
+def test_round_trips_are_lossless(encode, decode):
+    restaurant = Restaurant.from_dict(copy.deepcopy(RESTAURANT))
+    decoded = decode(encode(restaurant))
+    assert decoded == restaurant
+    assert decoded.to_dict() == RESTAURANT
+
+
+def test_numeric_prices_become_dollar_strings():
+    item = MenuItem.from_dict({'name': "Tea", 'price': 4.5, 'dietary': []})
+    assert item.price_cents == 450
+    assert item.to_dict()['price'] == "$4.50"
+
+
+def test_tags_keep_their_order_and_set_flags():
+    item = MenuItem.from_dict(RESTAURANT['menu']['mains'][1])
+    assert item.tags == ("pescatarian, line-caught", "vegan")
+    assert item.has("vegan") and not item.has("spicy")
+    assert item.has("pescatarian, line-caught")
+    assert MenuItem.from_dict(RESTAURANT['menu']['mains'][3]).has("vegan")
+
+
+def test_binary_rejects_other_data():
+    with pytest.raises(ValueError):
+        Restaurant.from_bytes(b"XX\x01" + bytes(8))
@@ -0,0 +1,68 @@
+import io
+import re
+import zipfile
+import pytest
+from benchmark import SAMPLE_RESTAURANT
+from models import Restaurant
+from pdf_generator import render_many, write_catalog, write_catalog_parts
+
+_PAGE = re.compile(rb"/Type /Page\b(?!s)")
+
+
+def _pages(pdf):
+    return len(_PAGE.findall(pdf))
+
+
+def _restaurant(name):
+    return dict(SAMPLE_RESTAURANT, concept=dict(SAMPLE_RESTAURANT['concept'], name=name))
+
+
+def test_catalog_reads_an_iterator_and_starts_each_restaurant_on_a_page():
+    pulled = []
+
+    def restaurants():
+        for i in range(3):
+            pulled.append(i)
+            yield _restaurant(f"Place {i}")
+
+    sink = io.BytesIO()
+    assert write_catalog(restaurants(), sink) == 3
+    pdf = sink.getvalue()
+    assert pdf.startswith(b"%PDF")
+    assert pulled == [0, 1, 2]
+
+    single = io.BytesIO()
+    write_catalog([_restaurant("Place 0")], single)
+    assert _pages(pdf) == 3 * _pages(single.getvalue())
+
+
+def test_empty_catalog_is_still_a_pdf():
+    sink = io.BytesIO()
+    assert write_catalog([], sink) == 0
+    assert sink.getvalue().startswith(b"%PDF")
+
+
+def test_catalog_parts_split_the_restaurants(tmp_path):
+    paths = write_catalog_parts((_restaurant(f"Place {i}") for i in range(5)), str(tmp_path), per_part=2)
+    assert [path.rsplit("/", 1)[-1] for path in paths] == ["catalog_0001.pdf", "catalog_0002.pdf",
+                                                           "catalog_0003.pdf"]
+    pages = [_pages(open(path, "rb").read()) for path in paths]
+    assert pages[0] == pages[1] == 2 * pages[2]
+    assert write_catalog_parts([], str(tmp_path / "empty")) == []
+
+
+def test_render_many_keeps_duplicate_names_apart(tmp_path):
+    restaurants = [_restaurant("Ember"), Restaurant.from_dict(_restaurant("Ember")), _restaurant("Lantern")]
+    zip_path = str(tmp_path / "pdfs.zip")
+    names = render_many(restaurants, workers=2, output_dir=str(tmp_path / "pdfs"), zip_path=zip_path)
+
+    assert names == ["Ember_concept.pdf", "Ember_concept_2.pdf", "Lantern_concept.pdf"]
+    with zipfile.ZipFile(zip_path) as archive:
+        assert archive.namelist() == names
+        assert all(archive.read(name).startswith(b"%PDF") for name in names)
+    assert sorted(path.name for path in (tmp_path / "pdfs").iterdir()) == sorted(names)
+
+
+def test_render_many_needs_a_destination():
+    with pytest.raises(ValueError):
+        render_many([SAMPLE_RESTAURANT])
@@ -0,0 +1,93 @@
+import time
+from chains import RestaurantConceptGenerator
+from fake_llm import FakeChatModel
+from metrics import Metrics
+from pool import ConceptPool, pool_from_env
+from ratelimit import current_scheduling
+
+THAI = ("Thai", "Casual Dining", "$$")
+ITALIAN = ("Italian", "Fine Dining", "$$$")
+
+
+class _RecordingGenerator:
+    """Stand-in generator noting each request and the scheduling it ran under."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def generate_full_restaurant(self, cuisine, style, price_range, force_fresh=False):
+        self.calls.append(((cuisine, style, price_range), force_fresh, current_scheduling()))
+        if self.fail:
+            raise ValueError("model refused")
+        return {'concept': {'name': f"{cuisine} {len(self.calls)}"}}
+
+
+def _wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _counter(pool, name, **labels):
+    return pool.metrics._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+
+def test_pool_refills_after_a_miss_and_serves_each_restaurant_once():
+    generator = RestaurantConceptGenerator(cache=False, llm=FakeChatModel(), metrics=Metrics())
+    pool = ConceptPool(generator, size=2, metrics=Metrics()).start()
+    try:
+        assert pool.take(*THAI) is None
+        _wait_for(lambda: pool.available(*THAI) == 2)
+
+        first, second = pool.take(*THAI), pool.take(*THAI)
+        assert first['concept']['name'] and second['concept']['name']
+        assert first != second
+        assert _counter(pool, 'pool_requests_total', result="miss") == 1
+        assert _counter(pool, 'pool_requests_total', result="hit") == 2
+    finally:
+        pool.stop(timeout=2)
+
+
+def test_refills_are_fresh_batch_work_for_the_most_requested_combos():
+    generator = _RecordingGenerator()
+    pool = ConceptPool(generator, size=1, max_combos=1, metrics=Metrics())
+    pool.warm([ITALIAN, THAI, THAI])
+    pool.start()
+    try:
+        _wait_for(lambda: pool.available(*THAI) == 1)
+        time.sleep(0.05)
+    finally:
+        pool.stop(timeout=2)
+
+    assert pool.available(*ITALIAN) == 0
+    assert generator.calls == [(THAI, True, ("batch", "pool"))]
+
+
+def test_failed_refill_is_not_retried_straight_away():
+    generator = _RecordingGenerator(fail=True)
+    pool = ConceptPool(generator, size=1, retry_delay=30, metrics=Metrics())
+    pool.warm([THAI])
+    pool.start()
+    try:
+        _wait_for(lambda: _counter(pool, 'pool_refill_errors_total', error="ValueError") == 1)
+        assert pool.take(*THAI) is None
+        time.sleep(0.05)
+    finally:
+        pool.stop(timeout=2)
+
+    assert len(generator.calls) == 1
+
+
+def test_pool_is_off_unless_sized(monkeypatch):
+    monkeypatch.delenv("CONCEPTKITCHEN_POOL_SIZE", raising=False)
+    assert pool_from_env(_RecordingGenerator()) is None
+
+    monkeypatch.setenv("CONCEPTKITCHEN_POOL_SIZE", "1")
+    pool = pool_from_env(_RecordingGenerator())
+    try:
+        assert pool.size == 1
+        assert pool._worker.is_alive()
+    finally:
+        pool.stop(timeout=2)
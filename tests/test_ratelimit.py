@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import pytest
+from metrics import Metrics
+from ratelimit import QueueTimeout, RateScheduler, scheduling
+
+
+def _drained(rpm=600, max_wait=2.0):
+    """A scheduler with no request budget left; it refills one request every 60/rpm seconds."""
+    scheduler = RateScheduler(rpm=rpm, tpm=10 ** 9, max_wait=max_wait, metrics=Metrics())
+    scheduler.requests.level = 0
+    return scheduler
+
+
+def test_cancelled_async_waiter_leaves_the_queue():
+    async def run():
+        scheduler = _drained(rpm=6)
+        waiter = asyncio.ensure_future(scheduler.aacquire(10))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert scheduler._queue == []
+        scheduler.requests.level = scheduler.requests.capacity
+        assert await scheduler.aacquire(10) < 0.5
+
+    asyncio.run(run())
+
+
+def test_timed_out_waiter_does_not_block_the_next_one():
+    scheduler = _drained(rpm=6, max_wait=0.1)
+    with pytest.raises(QueueTimeout):
+        scheduler.acquire(10)
+
+    assert scheduler._queue == []
+    scheduler.requests.level = scheduler.requests.capacity
+    assert scheduler.acquire(10) < 0.5
+
+
+def test_interrupted_sync_waiter_leaves_the_queue():
+    scheduler = _drained(rpm=6)
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupt(timeout=None):
+        raise Interrupted()
+
+    scheduler._lock.wait = interrupt
+    with pytest.raises(Interrupted):
+        scheduler.acquire(10)
+    assert scheduler._queue == []
+
+
+def _grant_order(requests):
+    """Queue (priority, session) requests on a drained scheduler; returns the order they are granted in."""
+    scheduler = _drained(rpm=1200)
+    order = []
+
+    async def waiter(index, priority, session):
+        with scheduling(priority, session):
+            await scheduler.aacquire(10)
+        order.append(index)
+
+    async def run():
+        await asyncio.gather(*(waiter(index, *request) for index, request in enumerate(requests)))
+
+    asyncio.run(run())
+    return order
+
+
+def test_interactive_calls_go_before_queued_batch_calls():
+    order = _grant_order([("batch", "a"), ("batch", "a"), ("interactive", "b")])
+    assert order[0] == 2
+
+
+def test_sessions_share_the_queue_fairly():
+    # Session a queues three calls before session b queues one; b should not wait behind all of a's
+    order = _grant_order([("interactive", "a")] * 3 + [("interactive", "b")])
+    assert order.index(3) == 1
+
+
+def test_concurrent_threads_are_all_granted():
+    scheduler = RateScheduler(rpm=1200, tpm=10 ** 9, max_wait=5, metrics=Metrics())
+    scheduler.requests.level = 5
+    errors = []
+
+    def worker():
+        try:
+            scheduler.acquire(10)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert scheduler._queue == []
@@ -0,0 +1,66 @@
+import pytest
+from schema import SchemaError, clean_item, clean_price, clean_section, repair_json
+
+
+def test_repair_json_ignores_braces_in_surrounding_prose():
+    text = 'Sure! Fill in {name} below:\n{"name": "Ember", "menu": {"a": 1}}\nHope that helps {:)}'
+    assert repair_json(text) == {'name': "Ember", 'menu': {'a': 1}}
+
+
+def test_repair_json_strips_fences_and_trailing_commas():
+    text = '```json\n{"items": [1, 2,], "name": "Ember",}\n```'
+    assert repair_json(text) == {'items': [1, 2], 'name': "Ember"}
+
+
+def test_repair_json_keeps_commas_inside_strings():
+    text = '{"description": "rice, beans,]", "tags": ["a", "b",],}'
+    assert repair_json(text) == {'description': "rice, beans,]", 'tags': ["a", "b"]}
+
+
+def test_repair_json_closes_a_truncated_reply():
+    text = '{"concept": {"name": "Ember"}, "menu": [{"name": "Soup"}, {"name": "Sal'
+    value = repair_json(text)
+    assert value['concept'] == {'name': "Ember"}
+    assert value['menu'][0] == {'name': "Soup"}
+
+
+def test_repair_json_without_an_object():
+    with pytest.raises(ValueError):
+        repair_json("I cannot help with {that}.")
+
+
+@pytest.mark.parametrize("price, expected", [
+    ("$18", "$18"),
+    (18.4, "$18"),
+    ("$1,200", "$1200"),
+    ("$1,250.60", "$1251"),
+    ("about $12.50 each", "$12"),
+    ("$XX", "$15"),
+    ("$X.XX", "$15"),
+    ("", None),
+    ("market price", None),
+    (None, None),
+    (True, None)
+])
+def test_clean_price(price, expected):
+    assert clean_price(price, band=(10, 20)) == expected
+
+
+def test_clean_item_rejects_a_missing_price():
+    assert clean_item({'name': "Soup"}, band=(10, 20)) is None
+    assert clean_item({'name': "Soup", 'price': None}, band=(10, 20)) is None
+
+
+def test_clean_item_fills_placeholder_prices_from_the_band():
+    item = clean_item({'name': " Soup ", 'price': "$XX", 'dietary': "Vegan/GF, vegetarian if applicable"},
+                      band=(10, 20))
+    assert item == {'name': "Soup", 'description': "", 'price': "$15", 'dietary': ["vegan", "gf"]}
+
+
+def test_clean_section_counts_only_usable_items():
+    items = [{'name': "Soup", 'price': "$8"}, {'name': "Salad"}, "not an item"]
+    with pytest.raises(SchemaError) as error:
+        clean_section('appetizers', items, 2)
+    assert error.value.sections == ['appetizers']
+    assert clean_section('appetizers', items, 1) == [
+        {'name': "Soup", 'description': "", 'price': "$8", 'dietary': []}]
@@ -0,0 +1,100 @@
+import asyncio
+from aiohttp.test_utils import TestClient, TestServer
+from chains import RestaurantConceptGenerator
+from fake_llm import FakeChatModel
+from history import HistoryStore
+from metrics import Metrics
+from search import SearchIndex
+from server import SERVICE, create_app
+
+
+def _restaurant(name, cuisine, style, price_range, items):
+    return {
+        'concept': {'name': name, 'tagline': f"{name} tagline", 'concept': f"A {style} for {cuisine} food",
+                    'unique_selling_points': ["rooftop seating"] if "Roof" in name else []},
+        'menu': {'mains': [{'name': item, 'description': "", 'price': price, 'dietary': dietary}
+                           for item, price, dietary in items]},
+        'metadata': {'cuisine': cuisine, 'style': style, 'price_range': price_range}
+    }
+
+
+def _index():
+    index = SearchIndex()
+    index.add(_restaurant("Roof Garden", "Thai", "Bistro", "$$", [
+        ("Green Curry", "$14", ["vegan", "spicy"]), ("Pad Thai", "$12", ["vegetarian"]), ("Duck", "$28", [])]))
+    index.add(_restaurant("Street Wok", "Thai", "Food Truck", "$", [
+        ("Basil Tofu", "$9", ["vegan"]), ("Market Fish", "MP", [])]))
+    index.add(_restaurant("Olive Row", "Greek", "Bistro", "$$", [("Moussaka", "$20", ["vegetarian"])]))
+    return index
+
+
+def _names(results):
+    return [result['name'] for result in results]
+
+
+def test_concept_facets_and_text():
+    index = _index()
+    assert _names(index.search_concepts(cuisine="thai")) == ["Street Wok", "Roof Garden"]
+    assert _names(index.search_concepts(style="Bistro", price_range="$$")) == ["Olive Row", "Roof Garden"]
+    assert _names(index.search_concepts("rooftop", cuisine="Thai")) == ["Roof Garden"]
+    assert index.search_concepts("rooftop", cuisine="Greek") == []
+
+
+def test_item_price_ranges_are_inclusive():
+    index = _index()
+    assert _names(index.search_items(min_price=12, max_price=20)) == ["Moussaka", "Pad Thai", "Green Curry"]
+    assert _names(index.search_items(max_price=9)) == ["Basil Tofu"]
+    assert _names(index.search_items(min_price=28)) == ["Duck"]
+    # Unparseable prices never match a price filter
+    assert "Market Fish" not in _names(index.search_items(min_price=0))
+
+
+def test_item_facets_combine_with_price():
+    index = _index()
+    assert _names(index.search_items(dietary="vegan", cuisine="Thai")) == ["Basil Tofu", "Green Curry"]
+    assert _names(index.search_items(dietary=["vegan", "spicy"])) == ["Green Curry"]
+    assert _names(index.search_items(dietary="vegan", max_price=10)) == ["Basil Tofu"]
+    assert _names(index.search_items(dietary="vegetarian", style="Bistro", min_price=15)) == ["Moussaka"]
+    assert _names(index.search_items("curry", section="mains", price_range="$$")) == ["Green Curry"]
+    assert index.search_items(section="desserts") == []
+
+
+def test_remove_and_replace_update_every_index():
+    index = _index()
+    index.remove(1)
+    assert index.search_items(dietary="spicy") == []
+    assert _names(index.search_items(max_price=15)) == ["Basil Tofu"]
+
+    index.add(_restaurant("Roof Garden", "Thai", "Bistro", "$$", [("Som Tam", "$8", ["vegan"])]), restaurant_id=2)
+    assert _names(index.search_concepts(cuisine="Thai")) == ["Roof Garden"]
+    assert _names(index.search_items(max_price=10)) == ["Som Tam"]
+
+
+def test_server_indexes_the_shared_history():
+    history = HistoryStore()
+    history.add(_restaurant("Roof Garden", "Thai", "Bistro", "$$", [("Green Curry", "$14", ["vegan"])]), "browser")
+
+    async def run():
+        generator = RestaurantConceptGenerator(cache=False, llm=FakeChatModel(latency=0), metrics=Metrics())
+        app = create_app(generator, workers=1, pdf_workers=1, history=history, refresh_interval=0.05)
+        async with TestClient(TestServer(app)) as client:
+            service = app[SERVICE]
+            assert len(service.index) == 1
+
+            response = await client.post("/restaurant", json={'cuisine': "Greek"}, headers={'X-Session-Id': "s1"})
+            assert response.status == 200
+            assert history.count("s1") == 1
+            assert len(service.index) == 2
+
+            # Written by another process, then cleared by its owner
+            batch_id = history.add(_restaurant("Olive Row", "Greek", "Bistro", "$$", []), "batch")
+            await asyncio.sleep(0.3)
+            response = await client.get(f"/restaurants/{batch_id}")
+            assert (await response.json())['concept']['name'] == "Olive Row"
+
+            history.clear("browser")
+            await asyncio.sleep(0.3)
+            response = await client.get("/search/concepts", params={'cuisine': "Thai"})
+            assert (await response.json())['results'] == []
+
+    asyncio.run(run())
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from chains import RestaurantConceptGenerator
+from clients import ClientPool
+from fake_llm import FakeChatModel
+from history import HistoryStore
+from metrics import Metrics
+from ratelimit import RateScheduler
+from server import create_app
+
+
+class _ThreadRecordingCache:
+    """In-memory cache that notes which threads it was called on."""
+
+    def __init__(self):
+        self.threads = set()
+        self.values = {}
+
+    def get(self, key):
+        self.threads.add(threading.current_thread())
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.threads.add(threading.current_thread())
+        self.values[key] = value
+
+
+def _app(llm, timeout=5.0, **kwargs):
+    generator = RestaurantConceptGenerator(llm=llm, metrics=Metrics(), **kwargs)
+    return create_app(generator, workers=2, timeout=timeout, pdf_workers=1, history=HistoryStore())
+
+
+def test_timed_out_request_does_not_block_later_ones():
+    async def run():
+        llm = FakeChatModel(latency=1.0)
+        scheduler = RateScheduler(rpm=600, tpm=10 ** 9, metrics=Metrics())
+        async with TestClient(TestServer(_app(llm, timeout=0.2, cache=False, scheduler=scheduler))) as client:
+            response = await client.post("/concept", json={'cuisine': "Thai"})
+            assert response.status == 504
+
+            llm.latency = 0
+            response = await client.post("/concept", json={'cuisine': "Thai"})
+            assert response.status == 200
+            assert scheduler._queue == []
+
+    asyncio.run(run())
+
+
+def test_cache_is_used_off_the_event_loop():
+    cache = _ThreadRecordingCache()
+
+    async def run():
+        async with TestClient(TestServer(_app(FakeChatModel(latency=0), cache=cache))) as client:
+            for _ in range(2):
+                response = await client.post("/concept", json={'cuisine': "Thai"})
+                assert response.status == 200
+
+    asyncio.run(run())
+    assert cache.values
+    assert threading.main_thread() not in cache.threads
+
+
+def test_async_http_client_works_across_event_loops():
+    client = ClientPool().async_http_client()
+
+    async def hello(request):
+        return web.Response(text="ok")
+
+    async def fetch():
+        app = web.Application()
+        app.router.add_get("/", hello)
+        async with TestServer(app) as server:
+            # Keep-alive connections from an earlier loop must not be reused here
+            for _ in range(2):
+                response = await client.get(str(server.make_url("/")))
+                assert response.text == "ok"
+
+    asyncio.run(fetch())
+    asyncio.run(fetch())
@@ -0,0 +1,101 @@
+import json
+import httpx
+import pytest
+from chains import MENU_SECTIONS, RestaurantConceptGenerator
+from fake_llm import FakeChatModel
+from hedging import Hedger
+from metrics import Metrics
+
+CONCEPT_PROMPT = "restaurant concept"
+MENU_PROMPT = "detailed menu"
+
+
+class _ScriptedModel(FakeChatModel):
+    """Fake model whose first replies to prompts containing `marker` are rewritten by `script`."""
+
+    marker: str = ""
+    script: list = []
+
+    def _reply(self, messages):
+        text, delay, usage = super()._reply(messages)
+        if self.script and self.marker in self._prompt_text(messages):
+            text = self.script.pop(0)(text)
+        return text, delay, usage
+
+
+def _fail(error):
+    def rewrite(text):
+        raise error
+    return rewrite
+
+
+def _generator(llm=None):
+    metrics = Metrics()
+    return RestaurantConceptGenerator(cache=False, llm=llm or FakeChatModel(chunk_size=16), metrics=metrics,
+                                      hedger=Hedger(percentile=0, max_retries=1, backoff_base=0, metrics=metrics))
+
+
+def _counter(generator, name, **labels):
+    return generator.metrics._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+
+def test_stream_fills_in_the_concept_then_the_menu():
+    generator = _generator()
+    snapshots = list(generator.stream_full_restaurant("Thai", price_range="$$"))
+
+    assert len(snapshots) > 2
+    assert all(set(snapshot) == {'concept', 'menu', 'metadata'} for snapshot in snapshots)
+    assert snapshots[0]['menu'] == {}
+    # Once the menu starts arriving the concept no longer changes
+    first_menu = next(i for i, snapshot in enumerate(snapshots) if snapshot['menu'])
+    assert all(snapshot['concept'] == snapshots[-1]['concept'] for snapshot in snapshots[first_menu:])
+
+    final = snapshots[-1]
+    assert final['metadata'] == {'cuisine': "Thai", 'style': "Casual Dining", 'price_range': "$$"}
+    assert final['concept']['name'] and final['concept']['unique_selling_points']
+    assert list(final['menu']) == list(MENU_SECTIONS)
+    assert all(final['menu'][section] for section in MENU_SECTIONS)
+
+
+def test_invalid_streamed_concept_is_requested_again():
+    llm = _ScriptedModel(marker=CONCEPT_PROMPT, script=[lambda text: json.dumps({'name': "Half"})])
+    generator = _generator(llm)
+    final = list(generator.stream_full_restaurant("Thai"))[-1]
+
+    assert llm.script == []
+    assert final['concept']['name'] != "Half"
+    assert final['concept']['tagline']
+    assert _counter(generator, 'llm_rerequests_total', stage="concept", reason="SchemaError") == 1
+
+
+def test_invalid_streamed_menu_section_is_repaired_alone():
+    llm = _ScriptedModel(marker=MENU_PROMPT, script=[lambda text: json.dumps(dict(json.loads(text), desserts=[]))])
+    generator = _generator(llm)
+    final = list(generator.stream_full_restaurant("Thai"))[-1]
+
+    assert all(final['menu'][section] for section in MENU_SECTIONS)
+    assert _counter(generator, 'llm_rerequests_total', stage="menu.desserts", reason="SchemaError") == 1
+    assert _counter(generator, 'llm_rerequests_total', stage="menu.mains", reason="SchemaError") == 0
+
+
+def test_transient_error_before_any_output_is_retried():
+    llm = _ScriptedModel(marker=CONCEPT_PROMPT, script=[_fail(httpx.ConnectError("connection reset"))])
+    generator = _generator(llm)
+    final = list(generator.stream_full_restaurant("Thai"))[-1]
+
+    assert llm.script == []
+    assert final['concept']['name']
+    assert _counter(generator, 'llm_retries_total', stage="concept", error="ConnectError") == 1
+
+
+def test_stream_error_reaches_the_caller():
+    llm = _ScriptedModel(marker=MENU_PROMPT, script=[_fail(ValueError("model refused"))])
+    generator = _generator(llm)
+    snapshots = []
+    with pytest.raises(ValueError):
+        for snapshot in generator.stream_full_restaurant("Thai"):
+            snapshots.append(snapshot)
+
+    # The concept was already shown; nothing is left in flight for later callers
+    assert snapshots and snapshots[-1]['concept']['name']
+    assert len(generator.inflight) == 0